@@ -0,0 +1,24 @@
+"""
+Startup and interaction benchmarks for the Omniscient Desktop UI.
+
+Run from frontend/ui_desktop:
+
+    python -m benchmarks                      # run everything, print the results
+    python -m benchmarks --save baseline      # record benchmarks/baselines/baseline.json
+    python -m benchmarks --compare baseline   # compare against a recorded baseline
+    python -m benchmarks --only import        # only benchmarks whose name contains "import"
+
+The suite runs headless. Benchmarks that need a Tk window use a withdrawn
+root; without a display an Xvfb server is started if one is installed,
+otherwise those benchmarks are reported as skipped. Network benchmarks
+talk to a local stub server (benchmarks/stub_server.py), never to the
+real providers.
+
+--compare exits with status 1 if any benchmark got slower than the
+baseline by more than --threshold (default 20 %), so it can gate CI.
+
+Backend load tests (sizing connection pools and retry policies):
+
+    python -m benchmarks.mock_backend --latency 40 --error-rate 0.01   # local mock API
+    python -m benchmarks.loadgen --clients 32 --requests 5000          # throughput, p50/p95/p99
+"""
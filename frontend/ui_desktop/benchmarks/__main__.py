@@ -0,0 +1,94 @@
+"""
+Command line entry point: python -m benchmarks [--save NAME] [--compare NAME] ...
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks import cases
+from benchmarks.harness import (BENCHMARKS, Skipped, compare, ensure_display, format_comparison, format_results,
+                                load_results, save_results)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Omniscient Desktop UI benchmarks")
+    parser.add_argument("--only", action="append", default=[],
+                        help="Only run benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    parser.add_argument("--save", metavar="NAME", help="Store the results as baseline NAME (or a .json path)")
+    parser.add_argument("--compare", metavar="NAME", help="Compare the results against baseline NAME")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as regression (default: 0.2 = 20 %%)")
+    parser.add_argument("--no-display", action="store_true", help="Skip benchmarks that need a Tk window")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    selected = [(name, fn, needs_display) for name, fn, needs_display in BENCHMARKS
+                if not args.only or any(part in name for part in args.only)]
+    display_error = "disabled with --no-display" if args.no_display else None
+    xvfb = None
+    if display_error is None and any(needs_display for _, _, needs_display in selected):
+        try:
+            xvfb = ensure_display()
+            cases.show_windows = xvfb is not None
+        except Skipped as e:
+            display_error = str(e)
+
+    results = {}
+    try:
+        for name, fn, needs_display in selected:
+            if needs_display and display_error:
+                results[name] = {"skipped": display_error}
+                continue
+            print(f"running {name} ...", file=sys.stderr)
+            try:
+                results[name] = fn(args.repeat)
+            except Skipped as e:
+                results[name] = {"skipped": str(e)}
+                if needs_display:
+                    display_error = str(e)
+    finally:
+        cases.close()
+        if xvfb is not None:
+            xvfb.terminate()
+    return results
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(level=logging.WARNING)
+    baseline = None
+    if args.compare:
+        baseline = load_results(args.compare)
+
+    # Settings, caches and logs created by the frames go to a scratch directory.
+    with tempfile.TemporaryDirectory(prefix="omniscient-bench-") as workdir:
+        previous = os.getcwd()
+        os.chdir(workdir)
+        try:
+            results = run(args)
+        finally:
+            os.chdir(previous)
+
+    print(format_results(results))
+    if args.save:
+        print(f"\nSaved baseline to {save_results(results, args.save)}")
+    if baseline is not None:
+        if args.only:
+            # Benchmarks that were not selected are not "missing".
+            baseline = {name: value for name, value in baseline.items() if name in results}
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"\nComparison with {args.compare}:")
+        print(format_comparison(rows))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+The benchmark cases. Each one measures a hot path of the desktop UI.
+
+Import and first-paint benchmarks start a fresh interpreter per run so
+that they measure cold imports; all other benchmarks run in-process.
+"""
+
+import ipaddress
+import os
+import random
+import time
+
+from benchmarks.harness import Skipped, benchmark, measure, run_python, summarize
+from benchmarks.stub_server import StubGeoServer
+
+UI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESULT_SET_SIZES = {"1k": 1000, "10k": 10000, "100k": 100000}
+SEARCH_QUERY = "Max Mustermann"
+STUB_LATENCY = 0.005  # Seconds per stub request, roughly a LAN round trip
+SCAN_NETWORKS = {"24": "8.8.8.0/24", "22": "8.8.8.0/22"}
+
+# Set by the runner when the windows live on a private Xvfb display and may be shown.
+show_windows = False
+_root = None
+
+
+# ------------------------- Helpers -------------------------
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = UI_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _cold(code, repeat):
+    """
+    Runs code in repeat fresh interpreters; code prints its own duration.
+    Runs in the current (scratch) directory so no files end up in the repo.
+    """
+    samples = [float(run_python(code, cwd=os.getcwd(), env=_env()).split()[-1]) for _ in range(repeat)]
+    return summarize(samples)
+
+
+def tk_root():
+    """
+    Shared root window for in-process UI benchmarks.
+    """
+    global _root
+    if _root is None:
+        import customtkinter as ctk
+        try:
+            _root = ctk.CTk()
+        except Exception as e:
+            raise Skipped(f"Tk is not available: {e}")
+        _root.geometry("1200x800")
+        if not show_windows:
+            _root.withdraw()
+        _root.update()
+    return _root
+
+
+def pump(root, until, timeout=60):
+    """
+    Runs the Tk event loop until until() is true.
+    """
+    deadline = time.monotonic() + timeout
+    while not until():
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark did not finish in time")
+        root.update()
+        time.sleep(0.001)
+
+
+def synthetic_results(count, seed=42):
+    """
+    Result dicts shaped like the search pipeline's, with a realistic share
+    of URLs that match the query.
+    """
+    rng = random.Random(seed)
+    first_names = ["max", "anna", "paul", "lena", "jonas", "mia", "felix", "emma"]
+    last_names = ["mustermann", "schmidt", "mueller", "weber", "fischer", "wagner", "becker"]
+    sites = ["linkedin.com/in", "facebook.com", "twitter.com", "example.org/profile", "xing.com/profile"]
+    results = []
+    for i in range(count):
+        name = f"{rng.choice(first_names)}-{rng.choice(last_names)}-{i}"
+        results.append({
+            "url": f"https://{rng.choice(sites)}/{name}",
+            "source": rng.choice(["Interne Datenbank", "Web-Suche", "Soziale Netzwerke"]),
+            "description": f"Profil von {name.replace('-', ' ')}",
+        })
+    return results
+
+
+class BenchContext:
+    """
+    Minimal TaskContext for calling task functions directly.
+    """
+    cancelled = False
+
+    def __init__(self):
+        self.progress = []
+
+    def check_cancelled(self):
+        pass
+
+    def report_progress(self, *args):
+        self.progress.append(args)
+
+    def wait(self, seconds):
+        time.sleep(seconds)
+
+
+def _stub_provider(server):
+    """
+    Installs an ip-api provider pointed at the stub server with an empty
+    in-memory cache and no quota, and returns a function that restores
+    the previous provider and cache.
+    """
+    from services import geo_cache, geo_providers
+    from services.geo_batch import BatchGeolocator
+    from services.rate_limiter import TokenBucket
+
+    previous = (geo_providers._provider, geo_cache._cache)
+    geo_cache._cache = geo_cache.GeoCache(path=None)
+    batch = BatchGeolocator(limiter=TokenBucket(1e6, 1e6), url=server.url + "/batch")
+    geo_providers._provider = geo_providers.IpApiProvider(url=server.url + "/json/{ip}", batch=batch)
+
+    def restore():
+        geo_providers._provider, geo_cache._cache = previous
+    return restore
+
+
+# ------------------------- Startup -------------------------
+@benchmark("import/main")
+def bench_import_main(repeat):
+    code = ("import time; t = time.perf_counter(); import main; "
+            "print(time.perf_counter() - t)")
+    return _cold(code, repeat)
+
+
+@benchmark("import/ui_components")
+def bench_import_ui_components(repeat):
+    results = {}
+    for name in sorted(os.listdir(os.path.join(UI_DIR, "ui_components"))):
+        if not name.endswith(".py") or name == "__init__.py":
+            continue
+        module = "ui_components." + name[:-3]
+        code = (f"import time; t = time.perf_counter(); import {module}; "
+                "print(time.perf_counter() - t)")
+        try:
+            results[name[:-3]] = _cold(code, repeat)
+        except RuntimeError as e:
+            # e.g. a legacy module with a dependency that is not installed
+            results[name[:-3]] = {"skipped": str(e)}
+    return results
+
+
+@benchmark("startup/first_paint", needs_display=True)
+def bench_first_paint(repeat):
+    # mainloop() is replaced by a single update() so that the process measures
+    # interpreter start -> imports -> window built and painted, then exits.
+    code = (
+        "import time; t = time.perf_counter()\n"
+        "import customtkinter as ctk\n"
+        "def painted(self):\n"
+        "    self.update()\n"
+        "    print(time.perf_counter() - t)\n"
+        "    self.destroy()\n"
+        "ctk.CTk.mainloop = painted\n"
+        "import main\n"
+        "main.main()\n"
+    )
+    return _cold(code, repeat)
+
+
+# ------------------------- Frames -------------------------
+@benchmark("frames/construct", needs_display=True)
+def bench_frame_construction(repeat):
+    from ui_components.feature_registry import FeatureRegistry
+
+    root = tk_root()
+    registry = FeatureRegistry()
+    results = {}
+    for name in registry.names():
+        frame_class = registry.load(name)  # Import cost is measured separately
+
+        def construct():
+            frame = frame_class(root)
+            frame.pack(fill="both", expand=True)
+            root.update_idletasks()
+            return frame
+
+        results[name] = measure(construct, repeat=repeat, teardown=lambda frame: frame.destroy())
+    return results
+
+
+# ------------------------- Name search -------------------------
+@benchmark("name_search/sort_results_by_accuracy")
+def bench_sort_results(repeat):
+    from ui_components.name_search import NameSearchFrame
+
+    results = {}
+    for label, count in RESULT_SET_SIZES.items():
+        data = synthetic_results(count)
+        # The method does not touch the widget, so no frame (and no display) is needed.
+        results[label] = measure(lambda: NameSearchFrame.sort_results_by_accuracy(None, SEARCH_QUERY, data),
+                                 repeat=repeat)
+    return results
+
+
+@benchmark("name_search/show_search_results", needs_display=True)
+def bench_show_search_results(repeat):
+    from config.app_config import SEARCH_RESULTS_PAGE_SIZE
+    from services.ranking import rank_results
+    from ui_components.name_search import NameSearchFrame
+
+    root = tk_root()
+    frame = NameSearchFrame(root)
+    frame.pack(fill="both", expand=True)
+    root.update()
+    results = {}
+    try:
+        for label, count in RESULT_SET_SIZES.items():
+            ranked = rank_results(SEARCH_QUERY, synthetic_results(count), k=SEARCH_RESULTS_PAGE_SIZE)
+
+            def render():
+                frame.show_search_results(ranked)
+                root.update_idletasks()
+
+            results[label] = measure(render, repeat=repeat, teardown=lambda _: frame.results_list.clear())
+    finally:
+        frame.destroy()
+    return results
+
+
+# ------------------------- Geolocation -------------------------
+@benchmark("geolocation/scan_network_range")
+def bench_scan_network_range(repeat):
+    from ui_components.geolocation import scan_network_range
+
+    results = {}
+    with StubGeoServer(latency=STUB_LATENCY) as server:
+        restore = _stub_provider(server)
+        try:
+            for label, cidr in SCAN_NETWORKS.items():
+                network = ipaddress.ip_network(cidr)
+
+                def scan():
+                    from services import geo_cache
+                    geo_cache._cache.clear()  # Every run goes to the (stub) network
+                    return scan_network_range(BenchContext(), network)
+
+                results[label] = measure(scan, repeat=repeat)
+        finally:
+            restore()
+    return results
+
+
+@benchmark("geolocation/lookup_network_range", needs_display=True)
+def bench_lookup_network_range(repeat):
+    from ui_components.geolocation import GeolocationFrame
+
+    root = tk_root()
+    frame = GeolocationFrame(root)
+    frame.pack(fill="both", expand=True)
+    root.update()
+    results = {}
+    with StubGeoServer(latency=STUB_LATENCY) as server:
+        restore = _stub_provider(server)
+        try:
+            for label, cidr in SCAN_NETWORKS.items():
+                def lookup():
+                    from services import geo_cache
+                    geo_cache._cache.clear()
+                    frame.query_entry.delete(0, "end")
+                    frame.query_entry.insert(0, cidr)
+                    # Button click -> background scan -> results streamed into the console
+                    frame.lookup_network_range()
+                    pump(root, lambda: frame.current_task is None)
+                    frame.result_box.flush()
+                    root.update_idletasks()
+
+                results[label] = measure(lookup, repeat=repeat)
+        finally:
+            restore()
+            frame.destroy()
+    return results
+
+
+def close():
+    """
+    Destroys the shared root window.
+    """
+    global _root
+    if _root is not None:
+        _root.destroy()
+        _root = None
@@ -0,0 +1,205 @@
+"""
+Timing, result storage and baseline comparison for the benchmark suite.
+"""
+
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# (name, function, needs_display) in registration order
+BENCHMARKS = []
+
+
+class Skipped(Exception):
+    """
+    Raised by a benchmark that cannot run in this environment.
+    """
+
+
+def benchmark(name, needs_display=False):
+    """
+    Registers a benchmark function. The function returns a dict of
+    measurements ({"median": seconds, ...}) or a dict of such dicts for
+    parametrized benchmarks ({"1k": {...}, "10k": {...}}).
+    """
+    def register(fn):
+        BENCHMARKS.append((name, fn, needs_display))
+        return fn
+    return register
+
+
+def summarize(samples):
+    """
+    Returns the statistics recorded for a list of durations in seconds.
+    """
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+    }
+
+
+def measure(fn, repeat=5, warmup=1, setup=None, teardown=None):
+    """
+    Times fn() repeat times after warmup untimed runs. setup() runs before
+    every call and is not timed; its return value is passed to fn.
+    teardown(result) runs after every call with fn's return value, untimed.
+    """
+    samples = []
+    for i in range(warmup + repeat):
+        arg = setup() if setup is not None else None
+        started = time.perf_counter()
+        result = fn(arg) if setup is not None else fn()
+        elapsed = time.perf_counter() - started
+        if teardown is not None:
+            teardown(result)
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def run_python(code, cwd, timeout=120, env=None):
+    """
+    Runs code in a fresh interpreter (cold imports) and returns its stdout.
+    """
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+                            timeout=timeout, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return result.stdout
+
+
+# ------------------------- Display -------------------------
+def ensure_display():
+    """
+    Makes a display available for Tk: an existing one, or a freshly started
+    Xvfb. Returns the Xvfb process (to be terminated later), or None.
+    Raises Skipped if no display can be provided.
+    """
+    if sys.platform in ("win32", "darwin") or os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise Skipped("no display and Xvfb is not installed")
+    display = ":%d" % (90 + os.getpid() % 100)
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    if process.poll() is not None:
+        raise Skipped("Xvfb could not be started")
+    os.environ["DISPLAY"] = display
+    return process
+
+
+# ------------------------- Baselines -------------------------
+def baseline_path(name):
+    if os.sep in name or name.endswith(".json"):
+        return name
+    return os.path.join(BASELINE_DIR, name + ".json")
+
+
+def metadata():
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_results(results, name):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(name):
+    with open(baseline_path(name), "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def flatten(results):
+    """
+    Turns nested results into {"group/case": stats}; skipped entries are left out.
+    """
+    flat = {}
+    for name, value in results.items():
+        if "skipped" in value:
+            continue
+        if "median" in value:
+            flat[name] = value
+        else:
+            for case, stats in value.items():
+                if "skipped" not in stats:
+                    flat[f"{name}/{case}"] = stats
+    return flat
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Compares median times. Returns (rows, regressions) where every row is
+    (name, baseline_median, current_median, relative_change, status).
+    """
+    rows = []
+    regressions = []
+    old = flatten(baseline)
+    new = flatten(current)
+    for name in sorted(set(old) | set(new)):
+        if name not in new:
+            rows.append((name, old[name]["median"], None, None, "missing"))
+            continue
+        if name not in old:
+            rows.append((name, None, new[name]["median"], None, "new"))
+            continue
+        before, after = old[name]["median"], new[name]["median"]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows, regressions
+
+
+def _ms(value):
+    return "-" if value is None else f"{value * 1000:.2f}"
+
+
+def format_results(results):
+    lines = [f"{'benchmark':<48} {'median ms':>10} {'min ms':>10} {'p95 ms':>10} {'runs':>5}"]
+    for name, value in results.items():
+        if "skipped" in value:
+            lines.append(f"{name:<48} skipped: {value['skipped']}")
+        elif "median" not in value:
+            for case, stats in value.items():
+                if "skipped" in stats:
+                    lines.append(f"{name + '/' + case:<48} skipped: {stats['skipped']}")
+    for name, stats in flatten(results).items():
+        lines.append(f"{name:<48} {_ms(stats['median']):>10} {_ms(stats['min']):>10} "
+                     f"{_ms(stats['p95']):>10} {stats['runs']:>5}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<48} {'baseline ms':>12} {'current ms':>12} {'change':>8}  status"]
+    for name, before, after, change, status in rows:
+        change_text = "-" if change is None else f"{change * 100:+.1f}%"
+        lines.append(f"{name:<48} {_ms(before):>12} {_ms(after):>12} {change_text:>8}  {status}")
+    return "\n".join(lines)
@@ -0,0 +1,179 @@
+"""
+Load generator for BackendConnector.
+
+Drives the connector with N concurrent clients (threads sharing one
+HttpClient, like the UI's background workers) and reports throughput,
+latency percentiles, outcomes and the number of retries the client sent:
+
+    python -m benchmarks.mock_backend --latency 40 --throttle-rate 0.05 &
+    python -m benchmarks.loadgen --clients 32 --requests 5000 --pool-size 8
+
+Without --url a mock backend with the given --mock-* options is started
+in-process. Latencies include the client's retries and backoff, i.e. they
+are what a user would wait for. Use --json to write the report to a file.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmarks.harness import metadata
+from benchmarks.mock_backend import MockBackend
+from config.app_config import BACKEND_LOOKUP_KINDS, HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_MAX_RETRIES
+from services.backend_connector import BackendConnector, BackendError
+from services.http_client import HttpClient
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_load(url, clients=16, requests=1000, duration=None, pool_size=HTTP_MAX_CONNECTIONS_PER_HOST,
+             retries=HTTP_MAX_RETRIES, kinds=BACKEND_LOOKUP_KINDS, adaptive=True):
+    """
+    Sends lookups from `clients` threads until `requests` lookups were made
+    (or `duration` seconds passed, if given) and returns the report dict.
+    """
+    client = HttpClient(max_retries=retries, pool_size=pool_size, adaptive=adaptive)
+    connector = BackendConnector(url=url, client=client)
+    counter = itertools.count()
+    deadline = time.monotonic() + duration if duration else None
+    latencies = []
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def worker():
+        local_latencies = []
+        local_outcomes = Counter()
+        while True:
+            n = next(counter)
+            if deadline is not None:
+                if time.monotonic() >= deadline:
+                    break
+            elif n >= requests:
+                break
+            kind = kinds[n % len(kinds)]
+            started = time.perf_counter()
+            try:
+                connector.lookup(kind, f"query-{n}")
+                local_outcomes["ok"] += 1
+            except BackendError as e:
+                local_outcomes[f"http_{e.status_code}" if e.status_code else "connection_error"] += 1
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            outcomes.update(local_outcomes)
+
+    threads = [threading.Thread(target=worker, name=f"loadgen-{i}") for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "meta": metadata(),
+        "config": {"url": url, "clients": clients, "requests": requests, "duration": duration,
+                   "pool_size": pool_size, "retries": retries, "adaptive": adaptive},
+        "requests": total,
+        "elapsed": elapsed,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "success_rate": outcomes["ok"] / total if total else 0.0,
+        "outcomes": dict(outcomes),
+        "retries_sent": client.retries_sent,
+        "limits": client.limiter.snapshot() if client.limiter is not None else [],
+        "latency": {
+            "mean": sum(latencies) / total if total else None,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+def format_report(report):
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.1f} ms"
+
+    config = report["config"]
+    latency = report["latency"]
+    lines = [
+        f"target       {config['url']}",
+        f"clients      {config['clients']} (pool size {config['pool_size']}, retries {config['retries']})",
+        f"requests     {report['requests']} in {report['elapsed']:.2f} s",
+        f"throughput   {report['throughput']:.1f} req/s",
+        f"success      {report['success_rate'] * 100:.2f} %  "
+        + ", ".join(f"{name}={count}" for name, count in sorted(report["outcomes"].items())),
+        f"retries      {report['retries_sent']}",
+        *(f"limit        {state['host']}: {state['limit']:.2f} (+{state['increases']} / -{state['decreases']})"
+          for state in report["limits"]),
+        f"latency      p50 {ms(latency['p50'])}  p95 {ms(latency['p95'])}  p99 {ms(latency['p99'])}  "
+        f"max {ms(latency['max'])}",
+    ]
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description="Load test BackendConnector")
+    parser.add_argument("--url", help="Backend URL (default: start a mock backend in-process)")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--requests", type=int, default=1000, help="Total lookups (default: 1000)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of --requests")
+    parser.add_argument("--pool-size", type=int, default=HTTP_MAX_CONNECTIONS_PER_HOST,
+                        help=f"Connections per host (default: {HTTP_MAX_CONNECTIONS_PER_HOST})")
+    parser.add_argument("--retries", type=int, default=HTTP_MAX_RETRIES,
+                        help=f"Client retries per lookup (default: {HTTP_MAX_RETRIES})")
+    parser.add_argument("--no-adaptive", action="store_true", help="Disable the adaptive per-host limit")
+    parser.add_argument("--mock-latency", type=float, default=20.0, help="In-process mock: mean latency in ms")
+    parser.add_argument("--mock-jitter", type=float, default=5.0, help="In-process mock: latency jitter in ms")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0, help="In-process mock: share of 500s")
+    parser.add_argument("--mock-throttle-rate", type=float, default=0.0, help="In-process mock: share of 429s")
+    parser.add_argument("--mock-rps-limit", type=int, default=None, help="In-process mock: lookups/s before 429s")
+    parser.add_argument("--mock-retry-after", type=int, default=1, help="In-process mock: Retry-After of 429s")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Retries and failures are counted in the report; logging each one would only flood the console.
+    logging.basicConfig(level=logging.CRITICAL)
+
+    def load(url):
+        return run_load(url, clients=args.clients, requests=args.requests, duration=args.duration,
+                        pool_size=args.pool_size, retries=args.retries, adaptive=not args.no_adaptive)
+
+    if args.url:
+        report = load(args.url)
+    else:
+        backend = MockBackend(latency_ms=args.mock_latency, jitter_ms=args.mock_jitter,
+                              error_rate=args.mock_error_rate, throttle_rate=args.mock_throttle_rate,
+                              rps_limit=args.mock_rps_limit, retry_after=args.mock_retry_after)
+        with backend.running():
+            report = load(backend.url)
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Local stand-in for the Omniscient backend, for development and load tests.
+
+A small asyncio HTTP/1.1 server (standard library only, keep-alive
+supported) that implements the API used by BackendConnector:
+
+    GET /api                      health check ({"status": "ok"})
+    GET /api/lookup/<kind>?q=...  fake lookup result for kind in BACKEND_LOOKUP_KINDS
+    GET /api/_stats               request counters of the mock itself
+
+Latency, error rate and rate limiting are configurable, so connection pool
+sizes and retry policies can be tuned without touching production:
+
+    python -m benchmarks.mock_backend --port 8000 --latency 40 --jitter 20 \\
+        --error-rate 0.01 --throttle-rate 0.02 --rps-limit 200
+
+Errors are answered with 500, throttled requests with 429 and a
+Retry-After header. The server can also be embedded, e.g. in tests:
+
+    with MockBackend(latency_ms=10).running() as backend:
+        BackendConnector(url=backend.url).lookup("email", "max@example.org")
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from config.app_config import BACKEND_LOOKUP_KINDS
+
+logger = logging.getLogger(__name__)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+           500: "Internal Server Error"}
+
+
+class MockBackend:
+    """
+    Configurable fake backend.
+
+    Args:
+        latency_ms: Mean response latency in milliseconds.
+        jitter_ms: Latency is drawn uniformly from latency_ms +- jitter_ms.
+        error_rate: Share of lookups answered with 500.
+        throttle_rate: Share of lookups answered with 429.
+        rps_limit: Lookups per second above which requests get 429 (None: unlimited).
+        retry_after: Value of the Retry-After header on 429 responses.
+        seed: Seed for reproducible error and latency patterns.
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=20.0, jitter_ms=0.0, error_rate=0.0,
+                 throttle_rate=0.0, rps_limit=None, retry_after=1, seed=None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rps_limit = rps_limit
+        self.retry_after = retry_after
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/api"
+
+    # ------------------------- Behaviour -------------------------
+    def _latency(self):
+        latency = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, latency) / 1000.0
+
+    def _over_limit(self):
+        if self.rps_limit is None:
+            return False
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+        return self._window_count > self.rps_limit
+
+    async def handle(self, method, target):
+        """
+        Returns (status, payload, extra headers) for one request.
+        """
+        parts = urlsplit(target)
+        path = unquote(parts.path).rstrip("/")
+        if method != "GET":
+            return 400, {"error": "only GET is supported"}, {}
+        if path == "/api":
+            return 200, {"status": "ok"}, {}
+        if path == "/api/_stats":
+            return 200, dict(self.stats), {}
+        prefix = "/api/lookup/"
+        if not path.startswith(prefix) or path[len(prefix):] not in BACKEND_LOOKUP_KINDS:
+            return 404, {"error": "unknown endpoint"}, {}
+        kind = path[len(prefix):]
+        query = parse_qs(parts.query).get("q", [""])[0]
+
+        if self._over_limit() or self._random.random() < self.throttle_rate:
+            self.stats["throttled"] += 1
+            return 429, {"error": "rate limit exceeded"}, {"Retry-After": str(self.retry_after)}
+        await asyncio.sleep(self._latency())
+        if self._random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return 500, {"error": "simulated failure"}, {}
+        self.stats["ok"] += 1
+        return 200, fake_lookup(kind, query), {}
+
+    # ------------------------- HTTP -------------------------
+    async def _serve_connection(self, reader, writer):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                self.stats["requests"] += 1
+                status, payload, extra = await self.handle(method, target)
+                body = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                        "Content-Type: application/json",
+                        f"Content-Length: {len(body)}",
+                        "Connection: " + ("keep-alive" if keep_alive else "close")]
+                head.extend(f"{name}: {value}" for name, value in extra.items())
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown with the connection still kept alive.
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Mock backend listening on %s", self.url)
+        return self._server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    @contextlib.contextmanager
+    def running(self):
+        """
+        Runs the server on its own event loop in a background thread.
+        """
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+            # Close kept-alive connections that are still open.
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+        thread = threading.Thread(target=run, name="mock-backend", daemon=True)
+        thread.start()
+        started.wait()
+        try:
+            yield self
+        finally:
+            def stop():
+                self._server.close()
+                loop.stop()
+            loop.call_soon_threadsafe(stop)
+            thread.join()
+            loop.close()
+
+
+def fake_lookup(kind, query):
+    """
+    Deterministic fake answer for a lookup.
+    """
+    rng = random.Random(f"{kind}:{query}")
+    return {
+        "kind": kind,
+        "query": query,
+        "matches": [
+            {"id": rng.randrange(10 ** 8), "confidence": round(rng.random(), 3),
+             "source": rng.choice(["registry", "social", "breach", "web"])}
+            for _ in range(rng.randint(0, 5))
+        ],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_backend",
+                                     description="Local mock of the Omniscient backend API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=20.0, help="Mean latency in ms (default: 20)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency jitter in ms (+-)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of lookups answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of lookups answered with 429")
+    parser.add_argument("--rps-limit", type=int, default=None, help="Lookups per second before 429s")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    backend = MockBackend(host=args.host, port=args.port, latency_ms=args.latency, jitter_ms=args.jitter,
+                          error_rate=args.error_rate, throttle_rate=args.throttle_rate, rps_limit=args.rps_limit,
+                          retry_after=args.retry_after, seed=args.seed)
+    try:
+        asyncio.run(backend.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Local stand-in for the ip-api.com endpoints used by the benchmarks.
+
+Answers GET /json/<ip> and POST /batch with deterministic fake results in
+ip-api's schema, optionally after an artificial latency. The server runs
+in a background thread on a free port of 127.0.0.1:
+
+    with StubGeoServer(latency=0.01) as server:
+        provider = IpApiProvider(url=server.url + "/json/{ip}")
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_result(ip):
+    """
+    Deterministic fake geolocation result for an IP address.
+    """
+    last = int(ip.rsplit(".", 1)[-1]) if "." in ip else 0
+    return {
+        "status": "success",
+        "query": ip,
+        "country": "Germany",
+        "regionName": "Berlin",
+        "city": "Berlin",
+        "lat": 52.5 + last / 1000,
+        "lon": 13.4 + last / 1000,
+        "isp": "Stub ISP",
+        "org": "Stub Org",
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real endpoint
+
+    def do_GET(self):
+        if not self.path.startswith("/json/"):
+            self._send(404, {"status": "fail", "message": "not found"})
+            return
+        self.server.record()
+        self._send(200, fake_result(self.path[len("/json/"):]))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path.split("?")[0] != "/batch":
+            self._send(404, {"status": "fail", "message": "not found"})
+            return
+        self.server.record()
+        queries = json.loads(body or b"[]")
+        self._send(200, [fake_result(q if isinstance(q, str) else q.get("query", "")) for q in queries])
+
+    def _send(self, status, payload):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        # ip-api's rate limit headers; the stub never runs out.
+        self.send_header("X-Rl", "1000")
+        self.send_header("X-Ttl", "60")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubGeoServer(ThreadingHTTPServer):
+    """
+    ip-api stand-in; use as a context manager to start and stop it.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-geo-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
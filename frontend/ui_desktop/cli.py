@@ -0,0 +1,203 @@
+"""
+Headless command line interface to the lookup engines.
+
+Run from frontend/ui_desktop:
+
+    python -m cli geo --input ips.txt --output results.jsonl
+    cat macs.txt | python -m cli mac --format csv > vendors.csv
+    python -m cli range --input networks.txt --output hosts.csv.gz
+    python -m cli blocks --input networks.txt --output blocks.csv
+    python -m cli import --input inventory.csv --output results.csv
+
+Input is read line by line from a file or stdin ("-", the default);
+blank lines and # comments are skipped. Results are written and flushed
+row by row as JSONL or CSV (chosen by --format or the output file's
+extension), so large inputs never have to fit into memory and an
+interrupted run keeps everything resolved so far. The lookups share the
+geo cache, provider failover, rate limits and adaptive concurrency limits
+with the desktop UI. "import" takes mixed IPs, networks and MACs, also
+from CSV columns (services/bulk_import.py). Logs and the summary go to
+stderr.
+"""
+
+import argparse
+import ipaddress
+import logging
+import sys
+import time
+
+from config.app_config import NETWORK_SCAN_MAX_ADDRESSES, RANGE_MAX_BLOCKS, TASK_WORKERS
+from config.logging_config import setup_logging, shutdown_logging
+from services.batch import BatchContext, chunked, read_inputs, run_batch
+from services.bulk_import import BULK_FIELDS, ImportStats, bulk_rows, read_lines
+from services.export import RowStream, stream_format
+from services.geo_batch import MAX_BATCH_SIZE
+from services.geolocation_engine import GEO_FIELDS, MAC_FIELDS, host_count, lookup_ips, lookup_mac, mac_result
+from services.range_engine import BLOCK_FIELDS, scan_blocks
+
+logger = logging.getLogger("cli")
+
+
+# ------------------------- Commands -------------------------
+def geo_rows(ctx, queries, concurrency):
+    """
+    Yields geolocation rows for a stream of IP addresses. Addresses are
+    looked up in blocks so that the provider's bulk path (ip-api batch
+    endpoint, local range index) is used.
+    """
+    def lookup_block(block):
+        return [row for results in lookup_ips(block, wait=ctx.wait) for row in results]
+
+    for block, rows, error in run_batch(ctx, lookup_block, chunked(queries, MAX_BATCH_SIZE), concurrency):
+        if error is not None:
+            rows = [{"query": query, "status": "fail", "message": str(error)} for query in block]
+        yield from rows
+
+
+def mac_rows(ctx, queries, concurrency):
+    """
+    Yields vendor rows for a stream of MAC addresses.
+    """
+    for query, answer, error in run_batch(ctx, lambda query: lookup_mac(query, wait=ctx.wait), queries, concurrency):
+        if error is not None:
+            yield {"query": query, "status": "fail", "vendor": None, "message": str(error)}
+        else:
+            yield mac_result(query, *answer)
+
+
+def range_rows(ctx, networks, concurrency, max_addresses):
+    """
+    Yields geolocation rows for all hosts of a stream of networks (CIDR).
+    Invalid and oversized networks are reported as "fail" rows.
+    """
+    def hosts():
+        for text in networks:
+            try:
+                network = ipaddress.ip_network(text, strict=False)
+            except ValueError:
+                invalid.append({"query": text, "status": "fail", "message": "Ungültiges Netzwerkformat."})
+                continue
+            if max_addresses and host_count(network) > max_addresses:
+                invalid.append({"query": text, "status": "fail",
+                                "message": f"Netzwerk zu groß (maximal {max_addresses} Adressen)."})
+                continue
+            yield from (str(ip) for ip in network.hosts())
+
+    invalid = []
+    for row in geo_rows(ctx, hosts(), concurrency):
+        yield from _drain(invalid)
+        yield row
+    yield from _drain(invalid)
+
+
+def block_rows(ctx, networks, concurrency, max_blocks):
+    """
+    Yields one summary row per allocation block of a stream of networks
+    (CIDR, any size); networks are scanned concurrently.
+    """
+    def scan(text):
+        network = ipaddress.ip_network(text, strict=False)
+        return list(scan_blocks(network, wait=ctx.wait, max_blocks=max_blocks))
+
+    for text, rows, error in run_batch(ctx, scan, networks, concurrency):
+        if error is not None:
+            message = "Ungültiges Netzwerkformat." if isinstance(error, ValueError) else str(error)
+            rows = [{"block": text, "status": "fail", "message": message}]
+        yield from rows
+
+
+def _drain(rows):
+    while rows:
+        yield rows.pop(0)
+
+
+COMMANDS = {
+    # name: (help, fieldnames)
+    "geo": ("Geolokation von IP-Adressen", GEO_FIELDS),
+    "mac": ("Hersteller von MAC-Adressen", MAC_FIELDS),
+    "range": ("Geolokation aller Hosts von Netzwerken (CIDR)", GEO_FIELDS),
+    "blocks": ("Geolokation von Netzwerken (CIDR) pro Vergabeblock, ohne Größenbeschränkung", BLOCK_FIELDS),
+    "import": ("Gemischte Liste aus IP-, Netzwerk- und MAC-Adressen (Text oder CSV)", BULK_FIELDS),
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Omniscient lookups without the desktop UI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (help_text, _) in COMMANDS.items():
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("--input", "-i", default="-", help="Input file, one entry per line (default: stdin)")
+        command.add_argument("--output", "-o", default="-", help="Output file, .gz compresses (default: stdout)")
+        command.add_argument("--format", "-f", choices=("jsonl", "csv"),
+                             help="Output format (default: by the output file's extension, else jsonl)")
+        command.add_argument("--concurrency", "-c", type=int, default=TASK_WORKERS,
+                             help=f"Lookups (or address blocks) in flight at once (default: {TASK_WORKERS})")
+        command.add_argument("--log-level", default="WARNING", help="Log level on stderr (default: WARNING)")
+        if name in ("range", "import"):
+            command.add_argument("--max-addresses", type=int, default=NETWORK_SCAN_MAX_ADDRESSES,
+                                 help=f"Largest network accepted, 0 for no limit "
+                                      f"(default: {NETWORK_SCAN_MAX_ADDRESSES})")
+        if name == "blocks":
+            command.add_argument("--max-blocks", type=int, default=RANGE_MAX_BLOCKS,
+                                 help=f"Lookups per network (default: {RANGE_MAX_BLOCKS})")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def run(args):
+    ctx = BatchContext()
+    fieldnames = COMMANDS[args.command][1]
+    binary = args.command == "import"
+    if args.input == "-":
+        source = sys.stdin.buffer if binary else sys.stdin
+    else:
+        source = open(args.input, "rb") if binary else open(args.input, encoding="utf-8")
+    started = time.perf_counter()
+    failed = 0
+    try:
+        if binary:
+            stats = ImportStats()
+            rows = bulk_rows(ctx, read_lines(source, stats), stats, args.concurrency, args.max_addresses)
+        elif args.command == "geo":
+            rows = geo_rows(ctx, read_inputs(source), args.concurrency)
+        elif args.command == "mac":
+            rows = mac_rows(ctx, read_inputs(source), args.concurrency)
+        elif args.command == "blocks":
+            rows = block_rows(ctx, read_inputs(source), args.concurrency, args.max_blocks)
+        else:
+            rows = range_rows(ctx, read_inputs(source), args.concurrency, args.max_addresses)
+        with RowStream(args.output, args.format or stream_format(args.output), fieldnames) as stream:
+            for row in rows:
+                stream.write(row)
+                if row.get("status") != "success":
+                    failed += 1
+    finally:
+        if source not in (sys.stdin, sys.stdin.buffer):
+            source.close()
+    elapsed = time.perf_counter() - started
+    print(f"{stream.written} rows ({failed} failed) in {elapsed:.1f} s "
+          f"({stream.written / elapsed if elapsed else 0:.1f} rows/s)", file=sys.stderr)
+    if binary:
+        print(f"{stats.duplicates} duplicates skipped, {stats.invalid} invalid entries", file=sys.stderr)
+    return 1 if failed and failed == stream.written else 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging(level=args.log_level.upper(), log_dir=None)
+    try:
+        return run(args)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
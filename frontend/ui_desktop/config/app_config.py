@@ -5,9 +5,142 @@ This file contains global settings such as application title, window dimensions,
 and backend configuration. Edit the values as needed.
 """
 
+import os
+
 APP_TITLE = "Omniscient Desktop UI"
 APP_WIDTH = 1024
 APP_HEIGHT = 768
 
 # URL for backend connectivity. Modify this endpoint for different environments.
-BACKEND_URL = "http://localhost:8000/api"
\ No newline at end of file
+BACKEND_URL = "http://localhost:8000/api"
+BACKEND_TIMEOUT = 5                     # Seconds for backend requests (connect and read)
+BACKEND_LOOKUP_KINDS = ("name", "email", "phone", "ip", "mac")  # GET {BACKEND_URL}/lookup/<kind>?q=...
+
+# User settings (services/settings_store.py)
+SETTINGS_FILE = "settings.json"
+SETTINGS_SAVE_DELAY_SECONDS = 0.5       # Quiet period before changes are written to disk
+
+# Feature frames (ui_components/feature_registry.py)
+DEFAULT_FEATURE = "Name Search"         # Feature shown on startup
+FEATURE_PREWARM = ("Geolocation", "Settings")  # Imported in the background after startup
+FEATURE_PREWARM_DELAY_MS = 1500         # Delay after the first paint before pre-warming
+FRAME_CACHE_SIZE = 6                    # Feature frames kept alive between navigation clicks
+
+# Log consoles (ui_components/custom_widgets.py)
+CONSOLE_MAX_LINES = 5000                # Lines kept per console; older lines are dropped
+CONSOLE_FLUSH_INTERVAL_MS = 100         # Console widgets are redrawn at most this often
+
+# Logging (config/logging_config.py); the root level is the "log_level" setting
+LOG_DIR = "logs"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024    # Size at which the log file is rotated (and gzipped)
+LOG_FILE_BACKUPS = 5                    # Rotated log files kept
+LOG_JSON_ENABLED = False                # Additionally write logs/omniscient.jsonl
+LOG_MODULE_LEVELS = {                   # Per-logger levels, e.g. to silence chatty libraries
+    "urllib3": "WARNING",
+    "PIL": "WARNING",
+    "asyncio": "WARNING",
+}
+
+# Outbound HTTP (services/http_client.py)
+HTTP_USER_AGENT = "Omniscient-Desktop"
+HTTP_CONNECT_TIMEOUT = 5                # Seconds to establish a connection
+HTTP_READ_TIMEOUT = 15                  # Seconds to wait for response data
+HTTP_MAX_RETRIES = 2                    # Retries for connection errors and 429/5xx responses
+HTTP_BACKOFF_FACTOR = 0.5               # Base of the exponential backoff in seconds
+HTTP_MAX_RETRY_AFTER = 30               # Upper bound for a server's Retry-After
+HTTP_POOL_MAX_HOSTS = 10                # Hosts with a kept-alive connection pool
+HTTP_MAX_CONNECTIONS_PER_HOST = 8       # Parallel connections per host
+
+# Adaptive per-host concurrency (services/adaptive_limiter.py); per-host
+# bounds can be pinned in the "adaptive_limits" setting.
+ADAPTIVE_LIMITS_ENABLED = True
+ADAPTIVE_LIMIT_INITIAL = 2              # Parallel requests to a host before anything was learned
+ADAPTIVE_LIMIT_MIN = 1
+ADAPTIVE_LIMIT_MAX = HTTP_MAX_CONNECTIONS_PER_HOST
+ADAPTIVE_LIMIT_BACKOFF = 0.5            # Factor applied to the limit on 429/503, errors and latency spikes
+ADAPTIVE_DECREASE_INTERVAL = 1.0        # Minimum seconds between two decreases of one host
+ADAPTIVE_LATENCY_SPIKE_FACTOR = 3.0     # Response slower than this multiple of the typical latency = spike
+ADAPTIVE_LATENCY_ALPHA = 0.1            # Weight of the newest response in the typical latency
+HTTP2_ENABLED = False                   # Use HTTP/2 (requires "httpx[http2]")
+
+# Background task execution (services/task_executor.py)
+TASK_WORKERS = 8                # Number of worker threads shared by all frames
+TASK_POLL_INTERVAL_MS = 50      # Interval in which results are handed to the Tk main loop
+TASK_TIMEOUT_SECONDS = 30       # Default timeout for a single lookup
+
+# Name search (services/search_pipeline.py)
+SEARCH_SOURCE_TIMEOUT_SECONDS = 15      # Timeout of a single search source
+SEARCH_RESULTS_PAGE_SIZE = 500          # Best-ranked results shown at once; scrolling to the end shows more
+
+# Result export (services/export.py)
+EXPORT_CHUNK_SIZE = 1000                # Rows written per chunk between progress updates
+
+# IP geolocation providers
+IP_API_URL = "http://ip-api.com/json/{ip}"
+IP_API_BATCH_URL = "http://ip-api.com/batch"
+IP_API_BATCH_REQUESTS_PER_MINUTE = 15   # Published free-tier quota of the batch endpoint
+IPINFO_URL = "https://ipinfo.io/{ip}/json"
+IPINFO_TOKEN = ""                       # Optional ipinfo.io access token (higher quota)
+PUBLIC_IP_URLS = ("https://api.ipify.org", "https://ipinfo.io/ip")  # Echo services for the own IP, in order
+NETWORK_SCAN_MAX_ADDRESSES = 4096       # Largest network range (a /20) accepted by the range scan
+
+# Block-wise range scans (services/range_engine.py)
+RDAP_URL = "https://rdap.org/ip/{ip}"   # RDAP bootstrap redirector: allocation block of an address
+RANGE_FALLBACK_PREFIX = {4: 24, 6: 48}  # Block size assumed when neither the database nor RDAP knows the block
+RANGE_MAX_BLOCKS = 256                  # Lookups per scan; the rest of the range is reported as not scanned
+
+# Bulk import of IP/MAC lists (services/bulk_import.py)
+BULK_IMPORT_CONCURRENCY = 4             # Address blocks and MAC lookups in flight at once
+BULK_PROGRESS_INTERVAL_SECONDS = 0.25   # Minimum interval between two progress updates
+
+# Provider failover and hedging (services/geo_failover.py)
+GEO_PROVIDER_ORDER = ("ip-api", "ipinfo")  # Online providers, preferred first
+GEO_HEDGE_ENABLED = True                # Ask the next provider if the first is slower than its p90
+GEO_HEDGE_DEFAULT_DELAY = 1.0           # Hedge delay in seconds until enough latencies were observed
+GEO_HEDGE_MIN_SAMPLES = 20              # Observed lookups before the p90 is used as hedge delay
+GEO_HEDGE_MIN_DELAY = 0.1               # Lower bound of the hedge delay in seconds
+GEO_HEALTH_ALPHA = 0.2                  # Weight of the newest outcome in a provider's health score
+GEO_HEALTH_MIN_SCORE = 0.5              # Providers below this score are only asked after healthy ones
+GEO_THROTTLE_COOLDOWN = 60              # Seconds a provider is demoted after a 429 without Retry-After
+
+# Geolocation cache (services/geo_cache.py)
+CACHE_DIR = "cache"
+GEO_CACHE_FILE = os.path.join(CACHE_DIR, "geo_cache.sqlite3")
+GEO_CACHE_MAX_ENTRIES = 20000           # Entries kept in memory (LRU)
+GEO_CACHE_MAX_DISK_ENTRIES = 500000     # Entries kept in the SQLite file
+GEO_CACHE_NEGATIVE_TTL = 3600           # Seconds a failed lookup is remembered
+GEO_CACHE_TTLS = {                      # Seconds a result stays valid, per provider
+    "ip-api": 3 * 24 * 3600,
+    "ipinfo": 3 * 24 * 3600,
+    "public-ip": 5 * 60,                # The own public IP may change at any time
+    "macvendors": 90 * 24 * 3600,       # OUI assignments practically never change
+    "rdap": 7 * 24 * 3600,              # Allocation blocks of the regional registries
+}
+
+# Static map images (services/map_images.py)
+MAP_IMAGE_URL = ("http://staticmap.openstreetmap.de/staticmap.php?center={lat},{lon}"
+                 "&zoom={zoom}&size={width}x{height}&markers={lat},{lon},red")
+MAP_IMAGE_ZOOM = 14
+MAP_IMAGE_SIZE = (600, 400)             # Width and height in pixels
+MAP_IMAGE_COORD_PRECISION = 3           # Decimal places of the map center (~100 m); nearby maps are shared
+MAP_IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "maps")
+MAP_IMAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Disk cache size; least recently used maps are removed first
+MAP_IMAGE_MEMORY_ENTRIES = 16           # Decoded maps kept in memory
+
+# Metrics (utils/metrics.py) and the diagnostics panel
+METRICS_EXPORT_PATH = os.path.join("metrics", "omniscient.prom")  # Prometheus textfile; JSON export uses .json
+METRICS_EXPORT_INTERVAL_SECONDS = 0     # Write METRICS_EXPORT_PATH periodically (0 = only on demand)
+DIAGNOSTICS_REFRESH_MS = 1000           # Refresh interval of the diagnostics panel while it is visible
+
+# Offline MAC vendor registry (services/oui_index.py); fill with
+# "python -m services.oui_index --download"
+OUI_DATA_DIR = os.path.join("data", "oui")
+
+# IP geolocation backend (services/geo_providers.py): "auto" uses a local
+# database if one of the files below exists, otherwise the online providers
+# of GEO_PROVIDER_ORDER with failover and hedging.
+GEO_PROVIDER = "auto"                   # "auto", "online", "ip-api", "ipinfo", "mmdb" or "csv"
+GEOIP_MMDB_PATH = os.path.join("data", "geoip", "GeoLite2-City.mmdb")
+GEOIP_CSV_PATH = os.path.join("data", "geoip", "ip_ranges.csv")
+GEOIP_CSV_VERSION = None                # Family (4 or 6) of integer bounds in a CSV without "version" column
@@ -0,0 +1,153 @@
+"""
+Central logging setup for the Omniscient Desktop UI.
+
+Call setup_logging() once at startup. All loggers propagate to a single
+QueueHandler on the root logger; a QueueListener thread does the actual
+formatting and writing, so logging from the Tk thread or a worker only
+costs a queue put, even at DEBUG. Output targets:
+
+  * the console (stderr),
+  * a size-rotated log file whose rotated copies are gzip-compressed,
+  * optionally a JSON-lines file for structured processing (LOG_JSON_ENABLED).
+
+The root level follows the "log_level" setting, also when it is changed
+at runtime. Individual loggers get their own levels from LOG_MODULE_LEVELS
+and the optional "log_module_levels" setting (e.g. {"services.http_client": "DEBUG"}).
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+
+from config.app_config import (LOG_DIR, LOG_FILE_BACKUPS, LOG_FILE_MAX_BYTES, LOG_FORMAT, LOG_JSON_ENABLED,
+                               LOG_MODULE_LEVELS)
+from services.settings_store import get_settings_store
+
+_listener = None
+_unsubscribers = []
+_atexit_registered = False
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a queue inside this process. The stock prepare() formats
+    every record in the calling thread to make it picklable; here the record
+    is passed on untouched and formatted by the listener thread instead.
+    """
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line.
+    """
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _rotating_file_handler(path, formatter):
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS,
+                                                   encoding="utf-8", delay=True)
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(formatter)
+    return handler
+
+
+def _level(value, default=logging.INFO):
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    return level if isinstance(level, int) else default
+
+
+def set_module_levels(levels):
+    """
+    Sets per-logger levels, e.g. {"urllib3": "WARNING"}.
+    """
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(_level(level))
+
+
+def setup_logging(level=None, log_dir=LOG_DIR, json_output=LOG_JSON_ENABLED, console=True):
+    """
+    Installs the queue-based logging pipeline. Without an explicit level the
+    "log_level" setting is used and followed when it changes.
+    Calling it again replaces the previous setup.
+    """
+    global _listener, _atexit_registered
+    shutdown_logging()
+    settings = get_settings_store()
+    handlers = []
+    text_formatter = logging.Formatter(LOG_FORMAT)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(text_formatter)
+        handlers.append(console_handler)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        handlers.append(_rotating_file_handler(os.path.join(log_dir, "omniscient.log"), text_formatter))
+        if json_output:
+            handlers.append(_rotating_file_handler(os.path.join(log_dir, "omniscient.jsonl"), JsonLinesFormatter()))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_LocalQueueHandler(log_queue))
+    root.setLevel(_level(level if level is not None else settings.get("log_level", "INFO")))
+
+    set_module_levels(LOG_MODULE_LEVELS)
+    set_module_levels(settings.get("log_module_levels") or {})
+    if level is None:
+        _unsubscribers.append(settings.subscribe(lambda key, value: root.setLevel(_level(value)), keys=("log_level",)))
+        _unsubscribers.append(settings.subscribe(lambda key, value: set_module_levels(value or {}),
+                                                 keys=("log_module_levels",)))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    if not _atexit_registered:
+        atexit.register(shutdown_logging)
+        _atexit_registered = True
+    return _listener
+
+
+def shutdown_logging():
+    """
+    Stops the listener after writing all queued records.
+    """
+    global _listener
+    while _unsubscribers:
+        _unsubscribers.pop()()
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
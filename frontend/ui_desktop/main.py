@@ -1,24 +1,27 @@
 import customtkinter as ctk
-import logging
 
-from ui_components.name_search import NameSearchFrame
-from ui_components.email_lookup import EmailLookupFrame
-from ui_components.phone_lookup import PhoneLookupFrame
-from ui_components.social_media_search import SocialMediaSearchFrame
-from ui_components.business_financial import BusinessFinancialFrame
-from ui_components.criminal_record import CriminalRecordFrame
-from ui_components.facial_recognition import FacialRecognitionFrame
-from ui_components.dark_web_monitoring import DarkWebMonitoringFrame
-from ui_components.geolocation import GeolocationFrame
-from ui_components.vehicle_lookup import VehicleLookupFrame
-from ui_components.alias_correlation import AliasCorrelationFrame
-from ui_components.settings import SettingsFrame
+from config.app_config import (DEFAULT_FEATURE, FEATURE_PREWARM, FEATURE_PREWARM_DELAY_MS,
+                               METRICS_EXPORT_INTERVAL_SECONDS, METRICS_EXPORT_PATH)
+from config.logging_config import setup_logging, shutdown_logging
+from services.adaptive_limiter import save_learned_limits
+from services.settings_store import get_settings_store
+from services.task_executor import get_executor
+from ui_components.feature_registry import FeatureRegistry
+from ui_components.frame_manager import FrameManager
+from utils.metrics import PeriodicExporter
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 def main():
-    ctk.set_appearance_mode("System")
+    # Queue-based logging: console, rotating log file, level from the settings.
+    setup_logging()
+    # Optional metrics textfile for a Prometheus node_exporter.
+    exporter = None
+    if METRICS_EXPORT_INTERVAL_SECONDS > 0:
+        exporter = PeriodicExporter(METRICS_EXPORT_PATH, METRICS_EXPORT_INTERVAL_SECONDS).start()
+    settings = get_settings_store()
+    ctk.set_appearance_mode(settings.get("appearance_mode", "System"))
+    # Follow changes made in the settings frame (including reset and restore).
+    settings.subscribe(lambda key, value: ctk.set_appearance_mode(value), keys=("appearance_mode",))
     ctk.set_default_color_theme("blue")
     
     app = ctk.CTk()
@@ -39,42 +42,36 @@ def main():
     content_area = ctk.CTkFrame(main_frame, corner_radius=8)
     content_area.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
     
-    # Helper function to load a feature UI component into the content area
-    def load_feature(frame_class, title_text):
-        # Clear previous content in the content area.
-        for widget in content_area.winfo_children():
-            widget.destroy()
-        header = ctk.CTkLabel(content_area, text=title_text, font=("Arial", 18, "bold"))
-        header.pack(pady=(10, 20))
-        feature_frame = frame_class(content_area)
-        feature_frame.pack(fill="both", expand=True, padx=10, pady=10)
-    
-    # Mapping feature names to their corresponding UI component classes
-    features = [
-        ("Name Search", NameSearchFrame),
-        ("Email Lookup", EmailLookupFrame),
-        ("Phone Lookup", PhoneLookupFrame),
-        ("Social Media", SocialMediaSearchFrame),
-        ("Business & Financial", BusinessFinancialFrame),
-        ("Criminal Record", CriminalRecordFrame),
-        ("Facial Recognition", FacialRecognitionFrame),
-        ("Dark Web Monitoring", DarkWebMonitoringFrame),
-        ("Geolocation", GeolocationFrame),
-        ("Vehicle Lookup", VehicleLookupFrame),
-        ("Alias Correlation", AliasCorrelationFrame),
-        ("Settings", SettingsFrame)
-    ]
+    # Frame modules are imported on the first click only; constructed frames
+    # stay alive and are just hidden when another feature is selected.
+    registry = FeatureRegistry()
+    frame_manager = FrameManager(content_area, registry)
+
+    # Helper function to show a feature UI component in the content area
+    def load_feature(title_text):
+        frame_manager.show(title_text)
     
     # Create navigation buttons for each feature on the left panel.
-    for feature_name, frame_class in features:
+    for feature_name in registry.names():
         btn = ctk.CTkButton(nav_panel, text=feature_name,
-                            command=lambda fc=frame_class, ft=feature_name: load_feature(fc, ft))
+                            command=lambda ft=feature_name: load_feature(ft))
         btn.pack(pady=5, padx=10, fill="x")
     
     # Load the default (Name Search) feature on startup.
-    load_feature(NameSearchFrame, "Name Search")
+    load_feature(DEFAULT_FEATURE)
+    # Import likely next features once the first window has been painted.
+    app.after(FEATURE_PREWARM_DELAY_MS, lambda: registry.prewarm(FEATURE_PREWARM))
     
     app.mainloop()
+    # Do not let pending background lookups delay the shutdown.
+    get_executor().shutdown()
+    # Start the next session with the concurrency limits learned in this one.
+    save_learned_limits()
+    # Write settings changed during the last save delay.
+    settings.flush()
+    if exporter is not None:
+        exporter.stop()
+    shutdown_logging()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
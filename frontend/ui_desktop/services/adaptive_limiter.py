@@ -0,0 +1,291 @@
+"""
+Adaptive per-host concurrency limits (AIMD).
+
+Every upstream host gets a concurrency limit that is found automatically:
+
+- Additive increase: each healthy response while the host is busy adds
+  1/limit, i.e. the limit grows by one per round of requests.
+- Multiplicative decrease: a 429 or 503, a connection error or a latency
+  spike (ADAPTIVE_LATENCY_SPIKE_FACTOR times the host's typical latency)
+  multiplies the limit by ADAPTIVE_LIMIT_BACKOFF, at most once per
+  ADAPTIVE_DECREASE_INTERVAL so that a burst of 429s from requests that
+  were already in flight counts as one signal. For the same interval
+  after a decrease the limit does not grow again.
+
+The limit thus oscillates just below the throughput ceiling of each
+provider without per-provider tuning. Hosts can still be pinned through
+the "adaptive_limits" setting ({host: {"min": 1, "max": 4}}); the learned
+limits are saved there on exit so the next session starts where the last
+one ended.
+
+HttpClient acquires a slot around every request. Callers that talk to a
+host without HttpClient (e.g. the googlesearch package) use slot():
+
+    with get_adaptive_limiter().slot("www.google.com") as slot:
+        ...
+        slot.status = 429
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config.app_config import (ADAPTIVE_DECREASE_INTERVAL, ADAPTIVE_LATENCY_ALPHA, ADAPTIVE_LATENCY_SPIKE_FACTOR,
+                               ADAPTIVE_LIMIT_BACKOFF, ADAPTIVE_LIMIT_INITIAL, ADAPTIVE_LIMIT_MAX,
+                               ADAPTIVE_LIMIT_MIN)
+from services.settings_store import get_settings_store
+from services.task_executor import TaskCancelled
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUSES = (429, 503)
+# Latencies below this are never treated as a spike (local or cached answers).
+LATENCY_SPIKE_MIN_SECONDS = 0.05
+# Latency samples needed before spikes are detected.
+LATENCY_MIN_SAMPLES = 10
+# Waiting callers check for their own cancellation at this interval.
+POLL_INTERVAL_SECONDS = 0.05
+# Exceptions that end a slot from the caller's side: no signal about the host.
+ABANDONED = (GeneratorExit, TaskCancelled)
+
+
+class HostLimit:
+    """
+    AIMD state of one host. All methods are called with the limiter's lock held.
+    """
+    def __init__(self, host, initial, minimum, maximum):
+        self.host = host
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.waiting = deque()  # Tickets of threads waiting for a slot, oldest first
+        self.latency = None  # EWMA of healthy response times in seconds
+        self.samples = 0
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.throttled = 0
+
+    def has_capacity(self):
+        return self.in_flight < int(self.limit)
+
+    def on_response(self, seconds, status, now):
+        """
+        Adjusts the limit after one response (status None: no response).
+        Returns the reason of a decrease, or None.
+        """
+        if status in OVERLOAD_STATUSES:
+            self.throttled += 1
+            return self._decrease(now, f"status {status}")
+        if status is None:
+            return self._decrease(now, "connection error")
+        spike = (self.samples >= LATENCY_MIN_SAMPLES and seconds > LATENCY_SPIKE_MIN_SECONDS
+                 and seconds > ADAPTIVE_LATENCY_SPIKE_FACTOR * self.latency)
+        self.samples += 1
+        self.latency = seconds if self.latency is None else (
+            self.latency + ADAPTIVE_LATENCY_ALPHA * (seconds - self.latency))
+        if spike:
+            return self._decrease(now, f"latency spike ({seconds * 1000:.0f} ms)")
+        # Only grow while the limit is actually used, otherwise it would
+        # drift up to the maximum during light traffic. After a decrease the
+        # limit is held for a moment so the host can recover.
+        if (self.in_flight + 1 >= int(self.limit) and self.limit < self.maximum
+                and now - self.last_decrease >= ADAPTIVE_DECREASE_INTERVAL):
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self.increases += 1
+        return None
+
+    def _decrease(self, now, reason):
+        if now - self.last_decrease < ADAPTIVE_DECREASE_INTERVAL:
+            return None
+        self.last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * ADAPTIVE_LIMIT_BACKOFF)
+        self.decreases += 1
+        return reason
+
+    def as_dict(self):
+        return {
+            "host": self.host,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiting),
+            "min": self.minimum,
+            "max": self.maximum,
+            "latency": self.latency,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "throttled": self.throttled,
+        }
+
+
+class Slot:
+    """
+    Handed out by AdaptiveLimiter.slot(); set status to the response's status code.
+    """
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = 200
+
+
+class AdaptiveLimiter:
+    """
+    Thread-safe collection of per-host AIMD limits.
+
+    Args:
+        overrides: {host: {"min": ..., "max": ..., "limit": ...}} from the settings.
+    """
+    def __init__(self, initial=ADAPTIVE_LIMIT_INITIAL, minimum=ADAPTIVE_LIMIT_MIN, maximum=ADAPTIVE_LIMIT_MAX,
+                 overrides=None):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.overrides = dict(overrides or {})
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def _host(self, host):
+        # Lock held.
+        state = self._hosts.get(host)
+        if state is None:
+            override = self.overrides.get(host, {})
+            state = self._hosts[host] = HostLimit(host, override.get("limit", self.initial),
+                                                  override.get("min", self.minimum),
+                                                  override.get("max", self.maximum))
+        return state
+
+    # ------------------------- Slots -------------------------
+    def acquire(self, host, wait=time.sleep):
+        """
+        Blocks until the host has a free slot.
+
+        Args:
+            wait: Sleep function of the caller; background tasks pass
+                  TaskContext.wait so that cancellation ends the wait.
+        """
+        with self._condition:
+            state = self._host(host)
+            # First come, first served: without the queue a waiting thread
+            # could lose the race for a freed slot over and over.
+            ticket = object()
+            state.waiting.append(ticket)
+            try:
+                while state.waiting[0] is not ticket or not state.has_capacity():
+                    self._condition.wait(POLL_INTERVAL_SECONDS)
+                    # Outside the lock: raises TaskCancelled for a cancelled task.
+                    self._condition.release()
+                    try:
+                        wait(0)
+                    finally:
+                        self._condition.acquire()
+            except BaseException:
+                state.waiting.remove(ticket)
+                self._condition.notify_all()
+                raise
+            state.waiting.popleft()
+            state.in_flight += 1
+            if state.waiting:
+                self._condition.notify_all()
+
+    def release(self, host, seconds=None, status=None):
+        """
+        Frees the slot and feeds the outcome (status None for a connection
+        error) into the host's limit. Without seconds the request was
+        abandoned by the caller (cancelled, timed out) and only the slot is
+        freed.
+        """
+        reason = None
+        with self._condition:
+            state = self._host(host)
+            state.in_flight -= 1
+            if seconds is not None:
+                reason = state.on_response(seconds, status, time.monotonic())
+            limit = state.limit
+            self._condition.notify_all()
+        if reason:
+            logger.info("Concurrency limit for %s lowered to %d (%s)", host, int(limit), reason)
+            get_metrics().count("adaptive_limit_decreases", host=host)
+
+    @contextmanager
+    def slot(self, host, wait=time.sleep):
+        """
+        Holds one slot of host for the duration of the block. Exceptions
+        count as connection errors unless slot.status was set; a block left
+        through GeneratorExit or TaskCancelled (an abandoned generator, a
+        cancelled task) frees the slot without affecting the limit.
+        """
+        self.acquire(host, wait)
+        slot = Slot()
+        started = time.perf_counter()
+        try:
+            yield slot
+        except ABANDONED:
+            self.release(host)
+            raise
+        except BaseException:
+            if slot.status == 200:
+                slot.status = None
+            self.release(host, time.perf_counter() - started, slot.status)
+            raise
+        else:
+            self.release(host, time.perf_counter() - started, slot.status)
+
+    # ------------------------- Tuning -------------------------
+    def configure(self, overrides):
+        """
+        Applies {host: {"min": ..., "max": ...}} to current and future hosts.
+        """
+        with self._condition:
+            self.overrides = dict(overrides or {})
+            for host, override in self.overrides.items():
+                state = self._host(host)
+                state.minimum = override.get("min", self.minimum)
+                state.maximum = max(state.minimum, override.get("max", self.maximum))
+                state.limit = float(min(max(state.limit, state.minimum), state.maximum))
+            self._condition.notify_all()
+
+    def learned(self):
+        """
+        Returns the overrides plus the current limit of every host, in the
+        format of the "adaptive_limits" setting.
+        """
+        with self._condition:
+            result = {host: dict(override) for host, override in self.overrides.items()}
+            for host, state in self._hosts.items():
+                result.setdefault(host, {})["limit"] = round(state.limit, 2)
+            return result
+
+    def snapshot(self):
+        with self._condition:
+            return [state.as_dict() for _, state in sorted(self._hosts.items())]
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_adaptive_limiter():
+    """
+    Returns the limiter of the shared HttpClient, configured from the
+    "adaptive_limits" setting and following its changes.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            store = get_settings_store()
+            _limiter = AdaptiveLimiter(overrides=store.get("adaptive_limits", {}))
+            store.subscribe(lambda key, value: _limiter.configure(value), keys=("adaptive_limits",))
+        return _limiter
+
+
+def save_learned_limits():
+    """
+    Stores the learned limits in the settings (called on exit).
+    """
+    if _limiter is None:
+        return
+    get_settings_store().set("adaptive_limits", _limiter.learned())
@@ -1,12 +1,36 @@
-import requests
-from config.app_config import BACKEND_URL
+from config.app_config import BACKEND_LOOKUP_KINDS, BACKEND_TIMEOUT, BACKEND_URL
+from services.http_client import get_http_client
+from services.single_flight import get_single_flight
 from utils.logger import initialize_logger
 
+
+class BackendError(Exception):
+    """
+    Raised when the backend answers a lookup with an error status or not at all.
+    """
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
 class BackendConnector:
-    def __init__(self):
-        self.url = BACKEND_URL
+    """
+    Client for the Omniscient backend API.
+
+    Lookups are sent as GET {url}/lookup/{kind}?q=... over the shared
+    HttpClient, so they reuse its connection pool and retry policy
+    (including Retry-After on 429). For local development and load tests
+    see benchmarks/mock_backend.py.
+    """
+    def __init__(self, url=BACKEND_URL, client=None, timeout=BACKEND_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.client = client
+        self.timeout = timeout
         self.logger = initialize_logger()
 
+    def _client(self):
+        return self.client or get_http_client()
+
     def test_connection(self):
         """
         Attempts to connect to the backend.
@@ -14,7 +38,7 @@ class BackendConnector:
         otherwise logs the error and returns False.
         """
         try:
-            response = requests.get(self.url, timeout=5)
+            response = self._client().get(self.url, timeout=self.timeout, retries=0)
             if response.status_code == 200:
                 self.logger.info("Backend connection successful.")
                 return True
@@ -23,4 +47,34 @@ class BackendConnector:
                 return False
         except Exception as e:
             self.logger.error("Error connecting to backend: %s", e)
-            return False
\ No newline at end of file
+            return False
+
+    def lookup(self, kind, query, retries=None, wait=None):
+        """
+        Looks up a query (name, email, phone, IP or MAC address) and returns
+        the decoded JSON answer. Raises BackendError if the backend fails
+        after the client's retries. Identical lookups that are already
+        running share their request.
+
+        Args:
+            kind: One of BACKEND_LOOKUP_KINDS.
+            retries: Retries for 429/5xx and connection errors; defaults to the client's.
+            wait: Sleep function between retries (TaskContext.wait in background tasks).
+        """
+        if kind not in BACKEND_LOOKUP_KINDS:
+            raise ValueError(f"Unknown lookup kind: {kind}")
+        return get_single_flight().do(("backend", self.url, kind, query), self._lookup, kind, query, retries, wait,
+                                      wait=wait)
+
+    def _lookup(self, kind, query, retries, wait):
+        url = f"{self.url}/lookup/{kind}"
+        kwargs = {"wait": wait} if wait is not None else {}
+        try:
+            response = self._client().get(url, params={"q": query}, timeout=self.timeout, retries=retries, **kwargs)
+        except Exception as e:
+            self.logger.error("Backend lookup %s failed: %s", kind, e)
+            raise BackendError(f"Backend nicht erreichbar: {e}") from e
+        if response.status_code != 200:
+            self.logger.error("Backend lookup %s failed with status code: %s", kind, response.status_code)
+            raise BackendError(f"Backend-Fehler (Status {response.status_code})", response.status_code)
+        return response.json()
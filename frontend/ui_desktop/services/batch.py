@@ -0,0 +1,120 @@
+"""
+Headless execution of engine functions outside the Tk main loop.
+
+The task functions of the frames expect a TaskContext, which needs a
+running TaskExecutor. BatchContext offers the same interface (cancelled,
+check_cancelled, report_progress, wait) on its own, so the CLI and bulk
+jobs can call the engines and task functions without a window, and
+run_batch() runs many of them with a bounded number in flight.
+
+Usage::
+
+    ctx = BatchContext()
+    for item, result, error in run_batch(ctx, lookup, read_inputs(sys.stdin), concurrency=8):
+        ...
+"""
+
+import itertools
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for
+
+from services.task_executor import TaskCancelled
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class BatchContext:
+    """
+    Stand-in for TaskContext. Progress goes to the on_progress callback,
+    which is called on the worker thread.
+    """
+    def __init__(self, on_progress=None):
+        self.on_progress = on_progress
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, *args):
+        if self.on_progress is not None and not self.cancelled:
+            self.on_progress(*args)
+
+    def wait(self, seconds):
+        if self._cancel_event.wait(seconds):
+            raise TaskCancelled()
+
+
+def read_inputs(stream):
+    """
+    Yields the stripped lines of a text stream, skipping blank lines and
+    # comments. Reads lazily, so stdin can be piped in while results stream out.
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def chunked(items, size):
+    """
+    Yields lists of up to size items from any iterable.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(ctx, fn, items, concurrency):
+    """
+    Calls fn(item) for every item on up to concurrency threads and yields
+    (item, result, error) in completion order. At most concurrency items
+    are read ahead of the results, so items can be an endless stream.
+    Cancelling ctx stops submitting new items; running calls are awaited.
+    fn should use ctx.wait for waits so that cancellation reaches it.
+    """
+    iterator = iter(items)
+    pending = {}  # Future -> item
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="omniscient-batch") as pool:
+        try:
+            while True:
+                while len(pending) < concurrency and not ctx.cancelled:
+                    item = next(iterator, _END)
+                    if item is _END:
+                        break
+                    pending[pool.submit(fn, item)] = item
+                if not pending:
+                    return
+                done, _ = wait_for(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    result, error = None, future.exception()
+                    if error is None:
+                        result = future.result()
+                    elif isinstance(error, TaskCancelled):
+                        raise error
+                    else:
+                        logger.debug("Batch item %r failed: %s", item, error)
+                    yield item, result, error
+        except BaseException:
+            # Also on KeyboardInterrupt or an abandoned generator: wake up
+            # running calls that wait through ctx.wait and let them finish fast.
+            # (A TaskContext is cancelled through its TaskHandle instead.)
+            if isinstance(ctx, BatchContext):
+                ctx.cancel()
+            raise
+
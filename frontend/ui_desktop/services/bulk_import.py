@@ -0,0 +1,241 @@
+"""
+Bulk import of mixed IP addresses, networks (CIDR) and MAC addresses.
+
+The input file (plain text or CSV) is parsed line by line while the
+lookups are running: every field that is an IP address, a network or a
+MAC address is taken, other fields (names, comments, a header row) are
+ignored. Duplicates are dropped, networks are expanded to their hosts,
+IP addresses go to the provider's bulk path in blocks and MAC addresses
+to the vendor lookup, both through services/geolocation_engine.py. Rows
+are written to the output file as soon as they are resolved, so neither
+the input nor the results have to fit into memory.
+
+Progress is estimated from the bytes of the input consumed so far, which
+needs no separate counting pass over the file.
+
+Usage::
+
+    summary = import_file(ctx, "hosts.csv", "results.csv")
+"""
+
+import ipaddress
+import logging
+import os
+import re
+import time
+
+from config.app_config import BULK_IMPORT_CONCURRENCY, BULK_PROGRESS_INTERVAL_SECONDS, NETWORK_SCAN_MAX_ADDRESSES
+from services.batch import run_batch
+from services.export import RowStream, stream_format
+from services.geo_batch import MAX_BATCH_SIZE
+from services.geo_providers import GeolocationLookupError
+from services.geolocation_engine import (GEO_FIELDS, MAC_PATTERN, host_count, lookup_ips, lookup_mac, mac_result,
+                                         normalize_mac)
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns of the result file: the geolocation columns plus type and vendor.
+BULK_FIELDS = ("query", "type") + GEO_FIELDS[1:] + ("vendor",)
+FIELD_SEPARATORS = re.compile(r"[,;\s]+")
+
+
+class ImportStats:
+    """
+    Counters of a running import; updated on the thread that consumes the rows.
+    """
+    def __init__(self, size=None):
+        self.size = size  # Bytes of the input, None for streams
+        self.bytes_read = 0
+        self.lines = 0
+        self.entries = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.rows = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def fraction(self):
+        if not self.size:
+            return None
+        return min(1.0, self.bytes_read / self.size)
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """
+        Estimated seconds until the import is done, or None.
+        """
+        fraction = self.fraction
+        if not fraction:
+            return None
+        return self.elapsed * (1.0 - fraction) / fraction
+
+    def as_dict(self):
+        return {"lines": self.lines, "entries": self.entries, "duplicates": self.duplicates,
+                "invalid": self.invalid, "rows": self.rows, "failed": self.failed, "elapsed": self.elapsed,
+                "rate": self.rate, "fraction": self.fraction, "eta": self.eta}
+
+
+def classify(field):
+    """
+    Returns ("ip", address), ("network", ip_network) or ("mac", mac) for one
+    input field, or None if it is neither.
+    """
+    field = field.strip().strip("\"'")
+    if MAC_PATTERN.match(field):
+        return "mac", normalize_mac(field)
+    try:
+        if "/" in field:
+            return "network", ipaddress.ip_network(field, strict=False)
+        return "ip", str(ipaddress.ip_address(field))
+    except ValueError:
+        return None
+
+
+def read_lines(stream, stats):
+    """
+    Yields the decoded lines of a binary stream and counts the bytes read.
+    """
+    for number, raw in enumerate(stream):
+        stats.bytes_read += len(raw)
+        stats.lines += 1
+        line = raw.decode("utf-8", errors="replace")
+        if number == 0:
+            line = line.lstrip("\ufeff")
+        yield line
+
+
+def parse_entries(lines, stats, max_addresses=NETWORK_SCAN_MAX_ADDRESSES):
+    """
+    Yields ("ip", address), ("mac", mac) and ("invalid", row) entries for
+    the lines of the input, without duplicates. Networks are expanded to
+    their hosts.
+    """
+    seen = set()
+    first = True
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [field for field in FIELD_SEPARATORS.split(line) if field]
+        entries = [entry for entry in map(classify, fields) if entry is not None]
+        if not entries:
+            # A first line without any address is taken as the CSV header.
+            if not first:
+                stats.invalid += 1
+                yield "invalid", {"query": line, "type": "invalid", "status": "fail",
+                                  "message": "Keine IP-, Netzwerk- oder MAC-Adresse erkannt."}
+            first = False
+            continue
+        first = False
+        for kind, value in entries:
+            key = (kind, str(value))
+            if key in seen:
+                stats.duplicates += 1
+                continue
+            seen.add(key)
+            if kind != "network":
+                stats.entries += 1
+                yield kind, value
+                continue
+            if max_addresses and host_count(value) > max_addresses:
+                stats.invalid += 1
+                yield "invalid", {"query": str(value), "type": "network", "status": "fail",
+                                  "message": f"Netzwerk zu groß (maximal {max_addresses} Adressen)."}
+                continue
+            for host in value.hosts():
+                host_key = ("ip", str(host))
+                if host_key in seen:
+                    stats.duplicates += 1
+                    continue
+                seen.add(host_key)
+                stats.entries += 1
+                yield host_key
+
+
+def work_units(entries, block_size=MAX_BATCH_SIZE):
+    """
+    Groups IP addresses into blocks for the provider's bulk path; MAC
+    addresses and invalid entries stay single units.
+    """
+    block = []
+    for kind, value in entries:
+        if kind != "ip":
+            yield kind, value
+            continue
+        block.append(value)
+        if len(block) >= block_size:
+            yield "ips", block
+            block = []
+    if block:
+        yield "ips", block
+
+
+def resolve(ctx, unit):
+    """
+    Looks up one work unit; returns its result rows.
+    """
+    kind, value = unit
+    if kind == "invalid":
+        return [value]
+    if kind == "mac":
+        try:
+            row = mac_result(value, *lookup_mac(value, wait=ctx.wait))
+        except GeolocationLookupError as e:
+            row = {"query": value, "status": "fail", "message": str(e)}
+        return [dict(row, type="mac")]
+    return [dict(row, type="ip") for results in lookup_ips(value, wait=ctx.wait) for row in results]
+
+
+def bulk_rows(ctx, lines, stats, concurrency=BULK_IMPORT_CONCURRENCY, max_addresses=NETWORK_SCAN_MAX_ADDRESSES):
+    """
+    Yields result rows for the lines of an input while they are parsed.
+    Rows come in completion order, not in input order.
+    """
+    units = work_units(parse_entries(lines, stats, max_addresses))
+    for unit, rows, error in run_batch(ctx, lambda unit: resolve(ctx, unit), units, concurrency):
+        if error is not None:
+            queries = unit[1] if unit[0] == "ips" else [unit[1]]
+            rows = [{"query": query, "type": "ip" if unit[0] == "ips" else unit[0], "status": "fail",
+                     "message": str(error)} for query in queries]
+        for row in rows:
+            stats.rows += 1
+            if row.get("status") != "success":
+                stats.failed += 1
+            yield row
+
+
+def import_file(ctx, path, output_path, fmt=None, concurrency=BULK_IMPORT_CONCURRENCY,
+                max_addresses=NETWORK_SCAN_MAX_ADDRESSES):
+    """
+    Task function for the TaskExecutor: looks up every entry of the input
+    file and writes the results to output_path (CSV or JSON Lines) as they
+    complete. Reports ImportStats.as_dict() at most every
+    BULK_PROGRESS_INTERVAL_SECONDS. Returns the final stats as a dict.
+    A cancelled import keeps the rows written so far.
+    """
+    fmt = fmt or stream_format(output_path, default="csv")
+    stats = ImportStats(os.path.getsize(path))
+    last_report = 0.0
+    with get_metrics().timer("bulk_import", detail=os.path.basename(path)), \
+            open(path, "rb") as source, RowStream(output_path, fmt, BULK_FIELDS) as stream:
+        for row in bulk_rows(ctx, read_lines(source, stats), stats, concurrency, max_addresses):
+            ctx.check_cancelled()
+            stream.write(row)
+            now = time.monotonic()
+            if now - last_report >= BULK_PROGRESS_INTERVAL_SECONDS:
+                last_report = now
+                ctx.report_progress(stats.as_dict())
+    logger.info("Imported %s: %s rows (%s failed, %s duplicates, %s invalid) to %s", path, stats.rows,
+                stats.failed, stats.duplicates, stats.invalid, output_path)
+    return stats.as_dict()
@@ -0,0 +1,244 @@
+"""
+Streaming export of result rows.
+
+Rows are written in chunks from a TaskExecutor worker, so large exports
+neither block the Tk main loop nor build the whole file in memory.
+Supported formats:
+
+    csv      comma-separated values with a header row
+    jsonl    one JSON object per line
+    parquet  Apache Parquet with a string schema (needs the optional "pyarrow")
+
+CSV and JSON Lines can be compressed with gzip or zstd (zstd needs the
+optional "zstandard" package); Parquet uses the codec internally. The file
+is written under a temporary name and only moved into place once complete,
+so a cancelled export never leaves a truncated file behind.
+
+RowStream is the incremental counterpart for results that arrive over
+time (CLI runs, bulk imports): every row is written and flushed as soon
+as it is known, so a long run can be followed with tail -f and an
+interrupted run keeps everything resolved so far.
+"""
+
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import logging
+import os
+import sys
+
+from config.app_config import EXPORT_CHUNK_SIZE
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class ExportError(Exception):
+    """
+    Raised for unsupported formats or missing optional packages.
+    """
+
+
+def _installed(package):
+    # Checks for the optional packages without importing them; pyarrow alone
+    # would add a noticeable delay to the startup of the name search.
+    return importlib.util.find_spec(package) is not None
+
+
+def available_formats():
+    return [fmt for fmt in FORMAT_EXTENSIONS if fmt != "parquet" or _installed("pyarrow")]
+
+
+def available_compressions():
+    return [compression for compression in COMPRESSION_EXTENSIONS if compression != "zstd" or _installed("zstandard")]
+
+
+def export_filename(basename, fmt, compression=None):
+    """
+    Returns e.g. "results.jsonl.gz" for ("results", "jsonl", "gzip").
+    Parquet files keep their plain extension because compression is internal.
+    """
+    suffix = "" if fmt == "parquet" else COMPRESSION_EXTENSIONS[compression]
+    return basename + FORMAT_EXTENSIONS[fmt] + suffix
+
+
+def stream_format(path, default="jsonl"):
+    """
+    Returns "csv" or "jsonl" depending on the extension of path
+    (default for stdout and unknown extensions).
+    """
+    if path and path != "-":
+        name = path[:-3] if path.endswith(".gz") else path
+        for fmt in ("csv", "jsonl"):
+            if name.endswith(FORMAT_EXTENSIONS[fmt]):
+                return fmt
+    return default
+
+
+class RowStream:
+    """
+    Writes rows one by one as CSV or JSON Lines to a file or to stdout
+    ("-"), flushing after every row. Files ending in .gz are compressed
+    and not flushed per row (every flush would end a deflate block and
+    cost compression); they are complete once the stream is closed.
+
+    Usage::
+
+        with RowStream("results.csv", "csv", GEO_FIELDS) as stream:
+            for row in rows:
+                stream.write(row)
+    """
+    def __init__(self, path, fmt, fieldnames):
+        if fmt not in ("csv", "jsonl"):
+            raise ExportError(f"Format {fmt} kann nicht gestreamt werden.")
+        self.path = path
+        self.fmt = fmt
+        self.fieldnames = list(fieldnames)
+        self.written = 0
+        newline = "" if fmt == "csv" else None
+        if path == "-":
+            self._file = sys.stdout
+            self._owned = False
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            compression = "gzip" if path.endswith(".gz") else None
+            self._file = _open_text(path, compression, newline=newline)
+            self._owned = True
+        self._flush = path == "-" or not path.endswith(".gz")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._csv.writeheader()
+            if self._flush:
+                self._file.flush()
+
+    def write(self, row):
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps({name: row.get(name) for name in self.fieldnames}, ensure_ascii=False) + "\n")
+        if self._flush:
+            self._file.flush()
+        self.written += 1
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_rows(ctx, rows, path, fmt="csv", compression=None, fieldnames=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Task function for the TaskExecutor: writes the rows (dicts) to path and
+    reports (written, total) after every chunk. Returns the path.
+
+    Args:
+        rows: Sequence of dicts; pass a copy if the list may change meanwhile.
+        fieldnames: Columns to write; defaults to the keys of the first row.
+    """
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ExportError(f"Unbekanntes Exportformat: {fmt}")
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ExportError(f"Unbekannte Komprimierung: {compression}")
+    if fmt == "parquet" and not _installed("pyarrow"):
+        raise ExportError("Für Parquet-Export wird das Paket 'pyarrow' benötigt.")
+    if compression == "zstd" and fmt != "parquet" and not _installed("zstandard"):
+        raise ExportError("Für zstd-Komprimierung wird das Paket 'zstandard' benötigt.")
+    fieldnames = list(fieldnames or (rows[0].keys() if rows else []))
+
+    tmp_path = path + ".part"
+    try:
+        with get_metrics().timer("export", detail=f"{len(rows)} rows", format=fmt):
+            _write(ctx, rows, tmp_path, fmt, compression, fieldnames, chunk_size)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Covers TaskCancelled as well: never leave a partial file behind.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info("Exported %s rows to %s", len(rows), path)
+    return path
+
+
+def _write(ctx, rows, tmp_path, fmt, compression, fieldnames, chunk_size):
+    if fmt == "parquet":
+        _write_parquet(ctx, rows, tmp_path, fieldnames, compression, chunk_size)
+        return
+    with _open_text(tmp_path, compression, newline="" if fmt == "csv" else None) as f:
+        if fmt == "csv":
+            _write_csv(ctx, rows, f, fieldnames, chunk_size)
+        else:
+            _write_jsonl(ctx, rows, f, fieldnames, chunk_size)
+
+
+def _chunks(rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+def _write_csv(ctx, rows, f, fieldnames, chunk_size):
+    writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    written = 0
+    for chunk in _chunks(rows, chunk_size):
+        ctx.check_cancelled()
+        writer.writerows(chunk)
+        written += len(chunk)
+        ctx.report_progress(written, len(rows))
+
+
+def _write_jsonl(ctx, rows, f, fieldnames, chunk_size):
+    written = 0
+    for chunk in _chunks(rows, chunk_size):
+        ctx.check_cancelled()
+        f.write("".join(json.dumps({name: row.get(name) for name in fieldnames}, ensure_ascii=False) + "\n"
+                        for row in chunk))
+        written += len(chunk)
+        ctx.report_progress(written, len(rows))
+
+
+def _write_parquet(ctx, rows, path, fieldnames, compression, chunk_size):
+    import pyarrow
+    import pyarrow.parquet as parquet
+
+    schema = pyarrow.schema([(name, pyarrow.string()) for name in fieldnames])
+    written = 0
+    with parquet.ParquetWriter(path, schema, compression=compression or "snappy") as writer:
+        for chunk in _chunks(rows, chunk_size):
+            ctx.check_cancelled()
+            columns = {name: [_as_text(row.get(name)) for row in chunk] for name in fieldnames}
+            writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+            written += len(chunk)
+            ctx.report_progress(written, len(rows))
+
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+
+def _open_text(path, compression, newline=None):
+    if compression == "gzip":
+        raw = gzip.open(path, "wb")
+    elif compression == "zstd":
+        import zstandard
+        raw = zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    else:
+        raw = open(path, "wb")
+    return io.TextIOWrapper(raw, encoding="utf-8", newline=newline)
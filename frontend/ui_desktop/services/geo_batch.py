@@ -0,0 +1,114 @@
+"""
+Batch geolocation against the ip-api.com batch endpoint.
+
+Instead of one request per address, up to 100 addresses are sent per POST
+over the shared keep-alive HTTP client. A shared token bucket keeps the request
+rate within ip-api's published free-tier quota for the batch endpoint, and
+results are yielded batch by batch so callers can stream them to the UI.
+"""
+
+import logging
+import time
+
+from config.app_config import HTTP_MAX_RETRIES, IP_API_BATCH_URL, IP_API_BATCH_REQUESTS_PER_MINUTE
+from services.http_client import get_http_client
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# ip-api accepts at most 100 queries per batch request.
+MAX_BATCH_SIZE = 100
+# Only request the fields the UI actually shows to keep responses small.
+BATCH_FIELDS = "status,message,query,country,regionName,city,lat,lon,isp,org"
+
+# 429 is handled here through the token bucket, not by the client's generic retries.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# One bucket for the whole process: the quota is per client IP, not per scan.
+_batch_limiter = TokenBucket.per_minute(IP_API_BATCH_REQUESTS_PER_MINUTE)
+
+
+class BatchGeolocator:
+    """
+    Resolves many IP addresses through ip-api's batch endpoint.
+
+    Args:
+        max_throttled: Retries of a batch answered with 429; after that its
+                       addresses are returned as transient failures.
+    """
+    def __init__(self, client=None, limiter=None, batch_size=MAX_BATCH_SIZE, url=IP_API_BATCH_URL,
+                 max_throttled=HTTP_MAX_RETRIES):
+        self.client = client or get_http_client()
+        self.limiter = limiter or _batch_limiter
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.url = url
+        self.max_throttled = max_throttled
+
+    def lookup(self, ips, wait=time.sleep):
+        """
+        Yields one list of result dicts per batch, in input order.
+
+        Args:
+            ips: Iterable of IP address strings.
+            wait: Sleep function used for rate limiting; background tasks pass
+                  TaskContext.wait so that a cancelled scan stops waiting.
+        """
+        batch = []
+        for ip in ips:
+            batch.append(ip)
+            if len(batch) >= self.batch_size:
+                yield self._lookup_batch(batch, wait)
+                batch = []
+        if batch:
+            yield self._lookup_batch(batch, wait)
+
+    def _lookup_batch(self, batch, wait):
+        throttled = 0
+        while True:
+            self.limiter.acquire(wait=wait)
+            try:
+                response = self.client.post(self.url, params={"fields": BATCH_FIELDS}, json=batch,
+                                            retry_statuses=RETRY_STATUSES, wait=wait)
+            except Exception as e:
+                logger.error("Batch lookup failed: %s", e)
+                return _failed(batch, str(e))
+
+            if response.status_code == 429:
+                # X-Ttl tells us how many seconds until the quota window resets.
+                backoff = _int_header(response, "X-Ttl", 60)
+                self.limiter.drain(backoff)
+                if throttled >= self.max_throttled:
+                    # Do not block the worker (or a headless scan) indefinitely.
+                    logger.error("ip-api rate limit still reached after %s retries, giving up.", throttled)
+                    return _failed(batch, "Abfragelimit des Providers erreicht")
+                throttled += 1
+                logger.warning("ip-api rate limit reached, backing off for %s s.", backoff)
+                continue
+            if response.status_code != 200:
+                logger.error("Batch lookup failed with status code: %s", response.status_code)
+                return _failed(batch, "HTTP Fehler")
+
+            if _int_header(response, "X-Rl", 1) == 0:
+                # Last request of the current window; pause until it resets.
+                self.limiter.drain(_int_header(response, "X-Ttl", 60))
+            try:
+                results = response.json()
+            except ValueError as e:
+                logger.error("Batch lookup returned invalid JSON: %s", e)
+                return _failed(batch, "Ungültige Antwort des Providers")
+            if not isinstance(results, list) or len(results) != len(batch):
+                logger.error("Batch lookup returned an unexpected answer for %s addresses", len(batch))
+                return _failed(batch, "Ungültige Antwort des Providers")
+            return results
+
+
+def _failed(batch, message):
+    # Marked as transient so that callers do not cache these as negative results.
+    return [{"query": ip, "status": "fail", "message": message, "transient": True} for ip in batch]
+
+
+def _int_header(response, name, default):
+    try:
+        return int(response.headers.get(name, default))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,263 @@
+"""
+Persistent TTL cache for geolocation and MAC vendor lookups.
+
+Entries are keyed by (provider, key), where key is a normalized IP or MAC
+address. Every provider has its own time-to-live (see GEO_CACHE_TTLS in
+config/app_config.py). Recently used entries are kept in an in-memory LRU;
+all entries are also written to an SQLite file so that they survive a
+restart. Failed lookups can be stored as negative entries with a shorter
+TTL so that known-bad queries are not retried on every click.
+
+The access time of a disk entry is only needed to keep the file bounded
+at the next start, so cache hits do not write it one by one: it is
+collected in memory and written with the next store, every
+ACCESS_FLUSH_ENTRIES hits, or on flush() (called at exit).
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config.app_config import (GEO_CACHE_FILE, GEO_CACHE_MAX_DISK_ENTRIES, GEO_CACHE_MAX_ENTRIES,
+                               GEO_CACHE_NEGATIVE_TTL, GEO_CACHE_TTLS)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600
+ACCESS_FLUSH_ENTRIES = 1000  # Pending access times written in one transaction
+
+
+class CacheEntry:
+    """
+    A cached lookup result. Negative entries carry the error message of
+    the failed lookup instead of a value.
+    """
+    __slots__ = ("value", "negative", "expires")
+
+    def __init__(self, value, negative, expires):
+        self.value = value
+        self.negative = negative
+        self.expires = expires
+
+    @property
+    def message(self):
+        return self.value if self.negative else None
+
+
+class GeoCache:
+    """
+    Thread-safe two-level (memory LRU + SQLite) cache with per-provider TTLs.
+    """
+    def __init__(self, path=GEO_CACHE_FILE, max_entries=GEO_CACHE_MAX_ENTRIES,
+                 max_disk_entries=GEO_CACHE_MAX_DISK_ENTRIES, ttls=GEO_CACHE_TTLS,
+                 negative_ttl=GEO_CACHE_NEGATIVE_TTL):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttls = dict(ttls)
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self._memory = OrderedDict()
+        self._accessed = {}  # (provider, key) -> access time not yet written to disk
+        self._lock = threading.Lock()
+        self._db = self._open_db(path) if path else None
+
+    def _open_db(self, path):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " provider TEXT NOT NULL, key TEXT NOT NULL, value TEXT, negative INTEGER NOT NULL,"
+                " expires REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (provider, key))"
+            )
+            # Drop expired entries and keep the file bounded (least recently used first).
+            db.execute("DELETE FROM entries WHERE expires < ?", (time.time(),))
+            db.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY accessed DESC"
+                " LIMIT -1 OFFSET ?)", (self.max_disk_entries,)
+            )
+            db.commit()
+            return db
+        except Exception as e:
+            logger.error("Could not open geolocation cache %s, using memory only: %s", path, e)
+            return None
+
+    def ttl_for(self, provider):
+        return self.ttls.get(provider, DEFAULT_TTL)
+
+    def get(self, provider, key):
+        """
+        Returns the CacheEntry for (provider, key), or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((provider, key))
+            if entry is not None:
+                self._memory.move_to_end((provider, key))
+            elif self._db is not None:
+                entry = self._load(provider, key)
+            if entry is not None and entry.expires < now:
+                self._delete(provider, key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(provider, key, now)
+            if entry.negative:
+                self.negative_hits += 1
+            return entry
+
+    def put(self, provider, key, value):
+        """
+        Stores a successful lookup result.
+        """
+        self._store(provider, [(key, self._entry(provider, value, False))])
+
+    def put_negative(self, provider, key, message):
+        """
+        Stores a failed lookup (e.g. "reserved range", unknown vendor).
+        Only use this for definitive answers, not for network errors.
+        """
+        self._store(provider, [(key, self._entry(provider, message, True))])
+
+    def put_many(self, provider, items):
+        """
+        Stores several results in one transaction.
+
+        Args:
+            items: Iterable of (key, value, negative) tuples.
+        """
+        self._store(provider, [(key, self._entry(provider, value, negative)) for key, value, negative in items])
+
+    def flush(self):
+        """
+        Writes the pending access times of cache hits to disk.
+        """
+        with self._lock:
+            if self._db is not None and self._accessed:
+                try:
+                    self._write_accessed()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error("Could not update cache access times: %s", e)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current number of in-memory entries.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._memory),
+            }
+
+    # ------------------------- Internals (lock held) -------------------------
+    def _entry(self, provider, value, negative):
+        ttl = min(self.negative_ttl, self.ttl_for(provider)) if negative else self.ttl_for(provider)
+        return CacheEntry(value, negative, time.time() + ttl)
+
+    def _store(self, provider, entries):
+        with self._lock:
+            for key, entry in entries:
+                self._memory[(provider, key)] = entry
+                self._memory.move_to_end((provider, key))
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+            if self._db is not None and entries:
+                now = time.time()
+                try:
+                    self._write_accessed()
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                        [(provider, key, json.dumps(entry.value), int(entry.negative), entry.expires, now)
+                         for key, entry in entries]
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error("Could not persist %s cache entries: %s", provider, e)
+
+    def _load(self, provider, key):
+        try:
+            row = self._db.execute(
+                "SELECT value, negative, expires FROM entries WHERE provider = ? AND key = ?", (provider, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Could not read cache entry %s/%s: %s", provider, key, e)
+            return None
+        if row is None:
+            return None
+        entry = CacheEntry(json.loads(row[0]), bool(row[1]), row[2])
+        self._memory[(provider, key)] = entry
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        return entry
+
+    def _touch(self, provider, key, now):
+        # Keep the access time current so the size bound evicts least recently used entries.
+        if self._db is None:
+            return
+        self._accessed[(provider, key)] = now
+        if len(self._accessed) >= ACCESS_FLUSH_ENTRIES:
+            try:
+                self._write_accessed()
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error("Could not update cache access times: %s", e)
+
+    def _write_accessed(self):
+        # Part of the caller's transaction; dropped on errors, the times are only a hint.
+        accessed, self._accessed = self._accessed, {}
+        if accessed:
+            self._db.executemany("UPDATE entries SET accessed = ? WHERE provider = ? AND key = ?",
+                                 [(when, provider, key) for (provider, key), when in accessed.items()])
+
+    def _delete(self, provider, key):
+        self._memory.pop((provider, key), None)
+        self._accessed.pop((provider, key), None)
+        if self._db is not None:
+            try:
+                self._db.execute("DELETE FROM entries WHERE provider = ? AND key = ?", (provider, key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error("Could not delete cache entry %s/%s: %s", provider, key, e)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_geo_cache():
+    """
+    Returns the process-wide GeoCache, opening the SQLite file on first use.
+    Pending access times are written when the interpreter exits.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GeoCache()
+            atexit.register(_cache.flush)
+        return _cache
@@ -0,0 +1,219 @@
+"""
+Failover, hedging and health scoring across the online geolocation providers.
+
+FailoverProvider asks the providers of GEO_PROVIDER_ORDER in order:
+
+- Failover: if a provider does not answer (connection error, 429, 5xx),
+  the next one is asked. A definitive answer ("reserved range", 404) is
+  returned right away; another provider would not know better.
+- Hedging: if the provider has not answered within its observed p90
+  latency, the next provider is asked in parallel and whichever answers
+  first wins. The slower request still finishes in the background and
+  fills the cache. Until GEO_HEDGE_MIN_SAMPLES latencies were observed,
+  GEO_HEDGE_DEFAULT_DELAY is used.
+- Health scoring: every outcome updates an exponentially weighted score
+  per provider. Providers below GEO_HEALTH_MIN_SCORE, and providers that
+  answered 429 (for Retry-After or GEO_THROTTLE_COOLDOWN seconds), are
+  moved behind the healthy ones.
+
+All providers return the common result schema of services/geo_providers.py.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for
+
+from config.app_config import (GEO_HEALTH_ALPHA, GEO_HEALTH_MIN_SCORE, GEO_HEDGE_DEFAULT_DELAY, GEO_HEDGE_ENABLED,
+                               GEO_HEDGE_MIN_DELAY, GEO_HEDGE_MIN_SAMPLES, GEO_THROTTLE_COOLDOWN, TASK_WORKERS)
+from services.geo_providers import GeolocationLookupError, GeoProvider, ProviderUnavailable
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# A waiting lookup checks for the cancellation of its task at this interval.
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class ProviderHealth:
+    """
+    Health score (1.0 = every recent request answered) of one provider.
+    Not thread-safe on its own; FailoverProvider serializes access.
+    """
+    def __init__(self, alpha=GEO_HEALTH_ALPHA):
+        self.alpha = alpha
+        self.score = 1.0
+        self.throttled_until = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.throttles = 0
+
+    def record_success(self):
+        self.successes += 1
+        self.score += self.alpha * (1.0 - self.score)
+
+    def record_failure(self):
+        self.failures += 1
+        self.score -= self.alpha * self.score
+
+    def record_throttle(self, seconds):
+        self.throttles += 1
+        self.score -= self.alpha * self.score
+        self.throttled_until = max(self.throttled_until, time.monotonic() + seconds)
+
+    def throttled(self):
+        return time.monotonic() < self.throttled_until
+
+    def as_dict(self):
+        return {"score": round(self.score, 3), "throttled": self.throttled(), "successes": self.successes,
+                "failures": self.failures, "throttles": self.throttles}
+
+
+class FailoverProvider(GeoProvider):
+    """
+    Combines several online providers (HttpGeoProvider) into one.
+    """
+    name = "online"
+
+    def __init__(self, providers, hedge=GEO_HEDGE_ENABLED, default_delay=GEO_HEDGE_DEFAULT_DELAY,
+                 min_samples=GEO_HEDGE_MIN_SAMPLES, min_delay=GEO_HEDGE_MIN_DELAY, min_score=GEO_HEALTH_MIN_SCORE,
+                 cooldown=GEO_THROTTLE_COOLDOWN):
+        if not providers:
+            raise ValueError("FailoverProvider needs at least one provider")
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.min_score = min_score
+        self.cooldown = cooldown
+        self.health = {provider.name: ProviderHealth() for provider in self.providers}
+        self._lock = threading.Lock()
+        # Requests run here so that a hedged request does not occupy a TaskExecutor worker.
+        self._pool = ThreadPoolExecutor(max_workers=TASK_WORKERS * len(self.providers),
+                                        thread_name_prefix="geo-provider")
+
+    # ------------------------- Health -------------------------
+    def ordered(self):
+        """
+        Returns the providers in the order they should be asked: healthy
+        ones in configured order, then demoted ones by score.
+        """
+        with self._lock:
+            def rank(item):
+                index, provider = item
+                health = self.health[provider.name]
+                demoted = health.throttled() or health.score < self.min_score
+                return (demoted, health.throttled(), -health.score if demoted else 0.0, index)
+            return [provider for _, provider in sorted(enumerate(self.providers), key=rank)]
+
+    def _record(self, provider, error):
+        with self._lock:
+            health = self.health[provider.name]
+            was_healthy = health.score >= self.min_score and not health.throttled()
+            if isinstance(error, ProviderUnavailable):
+                if error.status_code == 429:
+                    health.record_throttle(error.retry_after or self.cooldown)
+                else:
+                    health.record_failure()
+            else:
+                # Answers, including definitive "not found" ones, count as healthy.
+                health.record_success()
+            demoted = health.score < self.min_score or health.throttled()
+        if was_healthy and demoted:
+            logger.warning("Geolocation provider %s demoted (score %.2f)", provider.name, health.score)
+        elif not was_healthy and not demoted:
+            logger.info("Geolocation provider %s healthy again", provider.name)
+
+    def stats(self):
+        with self._lock:
+            return {provider.name: self.health[provider.name].as_dict() for provider in self.providers}
+
+    # ------------------------- Hedging -------------------------
+    def hedge_delay(self, provider):
+        """
+        Seconds to wait for provider before asking the next one: its
+        observed p90 latency, or the default until enough samples exist.
+        """
+        p90, samples = get_metrics().percentile("geo_provider", 0.90, provider=provider.name)
+        if p90 is None or samples < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, p90)
+
+    def _attempt(self, provider, ip, wait):
+        try:
+            with get_metrics().timer("geo_provider", detail=ip, provider=provider.name):
+                data = provider.lookup(ip, wait=wait)
+        except GeolocationLookupError as e:
+            self._record(provider, e)
+            raise
+        # A cancelled attempt (TaskCancelled) says nothing about the provider.
+        self._record(provider, None)
+        return data
+
+    @staticmethod
+    def _wait_any(pending, timeout, wait):
+        # Waits in slices so that a cancelled task stops waiting: wait(0)
+        # raises TaskCancelled. Returns the finished futures, empty on timeout.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = POLL_INTERVAL_SECONDS if deadline is None else deadline - time.monotonic()
+            done, _ = wait_for(pending, timeout=max(0.0, min(remaining, POLL_INTERVAL_SECONDS)),
+                               return_when=FIRST_COMPLETED)
+            if done or (deadline is not None and time.monotonic() >= deadline):
+                return done
+            wait(0)
+
+    # ------------------------- Lookups -------------------------
+    def cached(self, ip):
+        for provider in self.providers:
+            data = provider.cached(ip)
+            if data is not None:
+                return data
+        return None
+
+    def lookup(self, ip, wait=time.sleep):
+        data = self.cached(ip)
+        if data is not None:
+            logger.info("IP %s answered from cache (%s).", ip, data.get("source"))
+            return data
+
+        metrics = get_metrics()
+        candidates = self.ordered()
+        pending = {}  # Future -> provider
+        last_error = None
+        launched = 0
+        while True:
+            if not pending:
+                if launched >= len(candidates):
+                    break
+                pending[self._pool.submit(self._attempt, candidates[launched], ip, wait)] = candidates[launched]
+                launched += 1
+            timeout = None
+            if self.hedge and launched < len(candidates):
+                timeout = self.hedge_delay(candidates[launched - 1])
+            done = self._wait_any(pending, timeout, wait)
+            if not done:
+                # Too slow: ask the next provider as well, first answer wins.
+                logger.info("Hedging lookup of %s: %s slower than %.2f s", ip, candidates[launched - 1].name,
+                            timeout)
+                metrics.count("geo_hedges", provider=candidates[launched].name)
+                pending[self._pool.submit(self._attempt, candidates[launched], ip, wait)] = candidates[launched]
+                launched += 1
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    data = future.result()
+                except ProviderUnavailable as e:
+                    metrics.count("geo_failovers", provider=provider.name)
+                    last_error = e
+                    continue
+                # A definitive GeolocationLookupError is raised as it is.
+                return data
+        raise last_error or GeolocationLookupError("Fehler beim IP-Lookup.")
+
+    def lookup_many(self, ips, wait=time.sleep):
+        # Range scans go to the healthiest provider as a whole (ip-api batches them).
+        yield from self.ordered()[0].lookup_many(ips, wait=wait)
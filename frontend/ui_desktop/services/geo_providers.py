@@ -0,0 +1,618 @@
+"""
+Pluggable IP geolocation providers.
+
+Every provider answers single lookups (lookup) and bulk lookups
+(lookup_many) and returns results in one schema, the field names used by
+ip-api.com and shown by GeolocationFrame:
+
+    query, status ("success"/"fail"), message, country, regionName, city,
+    zip, lat, lon, timezone, isp, org, source
+
+Available providers:
+
+    IpApiProvider       ip-api.com over the network (cached, batched)
+    IpInfoProvider      ipinfo.io over the network (cached)
+    MMDBProvider        local MaxMind-format database, memory-mapped
+                        (needs the optional "maxminddb" package)
+    LocalRangeProvider  local CSV of IP ranges, binary-searched in memory
+    FailoverProvider    online providers with failover, hedging and
+                        health scoring (services/geo_failover.py)
+
+get_geo_provider() picks the provider configured by GEO_PROVIDER in
+config/app_config.py. With "auto", a local database is used when one
+exists, so air-gapped machines work without any connectivity; otherwise
+the online providers of GEO_PROVIDER_ORDER are combined.
+"""
+
+import bisect
+import csv
+import ipaddress
+import logging
+import os
+import threading
+import time
+from array import array
+
+# Optional: Reader for MaxMind-format databases. Without it only the CSV
+# backend is available for offline lookups.
+try:
+    import maxminddb
+except ImportError:
+    maxminddb = None
+
+from config.app_config import (GEO_PROVIDER, GEO_PROVIDER_ORDER, GEOIP_CSV_PATH, GEOIP_CSV_VERSION, GEOIP_MMDB_PATH,
+                               IP_API_URL, IPINFO_TOKEN, IPINFO_URL, PUBLIC_IP_URLS)
+from services.geo_batch import BatchGeolocator
+from services.geo_cache import get_geo_cache
+from services.http_client import get_http_client
+from services.single_flight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+# Results of local lookups are handed out in chunks of this size so that
+# range scans can still stream into the UI.
+LOCAL_CHUNK_SIZE = 256
+
+
+class GeolocationLookupError(Exception):
+    """
+    Fehler bei einer Abfrage. Die Nachricht wird direkt im Statusfeld angezeigt.
+    """
+
+
+class ProviderUnavailable(GeolocationLookupError):
+    """
+    The provider did not answer (connection error, 429 or another error
+    status). Unlike a plain GeolocationLookupError, another provider may
+    still know the address.
+    """
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def fail_result(ip, message):
+    return {"query": ip, "status": "fail", "message": message}
+
+
+class GeoProvider:
+    """
+    Base class for geolocation providers.
+    """
+    name = "base"
+
+    def lookup(self, ip, wait=time.sleep):
+        """
+        Returns the result dict for one IP address or raises
+        GeolocationLookupError if the provider has no answer.
+
+        Args:
+            wait: Sleep function for retries and backoff; background tasks
+                  pass TaskContext.wait so that cancellation ends the lookup.
+        """
+        raise NotImplementedError
+
+    def block(self, ip_obj):
+        """
+        Returns (first, last, result): the integer bounds of the allocation
+        block the provider stores for the address, and the result valid for
+        the whole block. None if the provider has no block metadata (the
+        online providers); services/range_engine.py then asks RDAP.
+        """
+        return None
+
+    def lookup_many(self, ips, wait=time.sleep):
+        """
+        Yields lists of result dicts (including "fail" results) for the given
+        IP addresses. The default implementation resolves them one by one.
+        """
+        chunk = []
+        for ip in ips:
+            try:
+                chunk.append(self.lookup(ip, wait=wait))
+            except GeolocationLookupError as e:
+                chunk.append(fail_result(ip, str(e)))
+            if len(chunk) >= LOCAL_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class HttpGeoProvider(GeoProvider):
+    """
+    Base class of the online providers: lookups read through the geo cache
+    (under the provider's name) and only misses reach fetch().
+
+    Args:
+        retries: Client retries per request (None: the client's default).
+                 FailoverProvider uses 0 and asks the next provider instead.
+    """
+    def __init__(self, retries=None):
+        self.retries = retries
+
+    def cached(self, ip):
+        """
+        Returns the cached result, None on a cache miss, or raises
+        GeolocationLookupError for a cached negative answer.
+        """
+        entry = get_geo_cache().get(self.name, ip)
+        if entry is None:
+            return None
+        if entry.negative:
+            raise GeolocationLookupError(f"Fehler: {entry.message}")
+        return entry.value
+
+    def lookup(self, ip, wait=time.sleep):
+        data = self.cached(ip)
+        if data is not None:
+            logger.info("IP %s answered from cache (%s).", ip, self.name)
+            return data
+        return self.fetch(ip, wait)
+
+    def fetch(self, ip, wait=time.sleep):
+        """
+        Asks the provider, stores the answer in the cache and returns the
+        normalized result.
+        """
+        raise NotImplementedError
+
+    def _get(self, url, wait, **kwargs):
+        try:
+            response = get_http_client().get(url, retries=self.retries, wait=wait, **kwargs)
+        except Exception as e:
+            logger.error("IP lookup at %s failed: %s", self.name, e)
+            raise ProviderUnavailable("Fehler beim IP-Lookup.") from e
+        if response.status_code == 429:
+            logger.warning("IP lookup at %s throttled (429)", self.name)
+            raise ProviderUnavailable("Fehler: Abfragelimit des Providers erreicht.", 429,
+                                      _retry_after(response))
+        return response
+
+    def _json(self, response):
+        # An HTML error page or a truncated body is a provider failure: the
+        # next provider may still answer.
+        try:
+            data = response.json()
+        except ValueError as e:
+            logger.error("Invalid JSON from %s: %s", self.name, e)
+            raise ProviderUnavailable("Fehler: Ungültige Antwort des Providers.", response.status_code) from e
+        if not isinstance(data, dict):
+            logger.error("Unexpected answer from %s: %r", self.name, data)
+            raise ProviderUnavailable("Fehler: Ungültige Antwort des Providers.", response.status_code)
+        return data
+
+
+class IpApiProvider(HttpGeoProvider):
+    """
+    ip-api.com. Single lookups use the JSON endpoint, bulk lookups the
+    batch endpoint; both read through the geo cache.
+
+    Args:
+        url: Template of the single-lookup URL with an {ip} placeholder.
+        batch: BatchGeolocator for bulk lookups (default: the shared quota).
+    """
+    name = "ip-api"
+
+    def __init__(self, url=IP_API_URL, batch=None, retries=None):
+        super().__init__(retries)
+        self.url = url
+        self.batch = batch
+
+    def fetch(self, ip, wait=time.sleep):
+        response = self._get(self.url.format(ip=ip), wait)
+        if response.status_code != 200:
+            logger.error("IP lookup failed with status code: %s", response.status_code)
+            raise ProviderUnavailable("Fehler: Konnte Daten für die IP nicht abrufen.", response.status_code)
+        data = self._json(response)
+        if data.get("status") != "success":
+            message = data.get("message", "Unbekannter Fehler")
+            logger.error("ip-api error: %s", message)
+            # e.g. "reserved range" or "invalid query": asking again will not help.
+            get_geo_cache().put_negative(self.name, ip, message)
+            raise GeolocationLookupError(f"Fehler: {message}")
+        data["source"] = self.name
+        get_geo_cache().put(self.name, ip, data)
+        return data
+
+    def lookup_many(self, ips, wait=time.sleep):
+        cache = get_geo_cache()
+        cached = []
+        missing = []
+        for ip in ips:
+            entry = cache.get(self.name, ip)
+            if entry is None:
+                missing.append(ip)
+            elif entry.negative:
+                cached.append(fail_result(ip, entry.message))
+            else:
+                cached.append(entry.value)
+        # Cached addresses first, so they show up immediately.
+        if cached:
+            yield cached
+        for batch_results in (self.batch or BatchGeolocator()).lookup(missing, wait=wait):
+            cache.put_many(self.name, [
+                (data["query"], data if data.get("status") == "success" else data.get("message", "Unbekannter Fehler"),
+                 data.get("status") != "success")
+                for data in batch_results if data.get("query") and not data.get("transient")
+            ])
+            yield batch_results
+
+
+class IpInfoProvider(HttpGeoProvider):
+    """
+    ipinfo.io. Answers are normalized to the common schema: "region"
+    becomes regionName, "loc" ("lat,lon") lat/lon, "postal" zip, and the
+    AS number is split off "org" for isp.
+    """
+    name = "ipinfo"
+
+    def __init__(self, url=IPINFO_URL, token=IPINFO_TOKEN, retries=None):
+        super().__init__(retries)
+        self.url = url
+        self.token = token
+
+    def fetch(self, ip, wait=time.sleep):
+        params = {"token": self.token} if self.token else None
+        response = self._get(self.url.format(ip=ip), wait, params=params)
+        if response.status_code == 404:
+            get_geo_cache().put_negative(self.name, ip, "Nicht gefunden")
+            raise GeolocationLookupError("Fehler: Nicht gefunden")
+        if response.status_code != 200:
+            logger.error("ipinfo lookup failed with status code: %s", response.status_code)
+            raise ProviderUnavailable("Fehler: Konnte Daten für die IP nicht abrufen.", response.status_code)
+        raw = self._json(response)
+        if raw.get("bogon"):
+            get_geo_cache().put_negative(self.name, ip, "reserved range")
+            raise GeolocationLookupError("Fehler: reserved range")
+        data = self.normalize(ip, raw)
+        get_geo_cache().put(self.name, ip, data)
+        return data
+
+    def normalize(self, ip, raw):
+        lat = lon = None
+        if raw.get("loc"):
+            try:
+                lat, lon = (float(part) for part in raw["loc"].split(","))
+            except ValueError:
+                pass
+        org = raw.get("org") or ""
+        asn, _, isp = org.partition(" ")
+        if not asn.startswith("AS"):
+            isp = org
+        return {
+            "query": raw.get("ip", ip),
+            "status": "success",
+            "country": raw.get("country") or "Nicht verfügbar",
+            "regionName": raw.get("region") or "Nicht verfügbar",
+            "city": raw.get("city") or "Nicht verfügbar",
+            "zip": raw.get("postal") or "Nicht verfügbar",
+            "lat": lat,
+            "lon": lon,
+            "timezone": raw.get("timezone") or "Nicht verfügbar",
+            "isp": isp or "Nicht verfügbar",
+            "org": org or "Nicht verfügbar",
+            "source": self.name,
+        }
+
+
+class MMDBProvider(GeoProvider):
+    """
+    Local MaxMind-format database (e.g. GeoLite2-City.mmdb or DB-IP lite
+    MMDB). The file is memory-mapped, so opening it is instant and lookups
+    do not load the database into the Python heap.
+    """
+    name = "mmdb"
+
+    def __init__(self, path=GEOIP_MMDB_PATH):
+        if maxminddb is None:
+            raise ImportError("The maxminddb package is required for MMDB databases.")
+        self.path = path
+        self._reader = maxminddb.open_database(path, maxminddb.MODE_MMAP)
+
+    def lookup(self, ip, wait=time.sleep):
+        record = self._reader.get(ip)
+        if not record:
+            raise GeolocationLookupError("Fehler: IP nicht in der lokalen Datenbank gefunden.")
+        return self.normalize(ip, record)
+
+    def block(self, ip_obj):
+        # The database is a prefix tree: the prefix length of the matching
+        # node is the block that shares this record.
+        record, prefix_len = self._reader.get_with_prefix_len(str(ip_obj))
+        network = ipaddress.ip_network((ip_obj, prefix_len), strict=False)
+        if record:
+            result = self.normalize(str(ip_obj), record)
+        else:
+            result = fail_result(str(ip_obj), "IP nicht in der lokalen Datenbank gefunden.")
+        return int(network.network_address), int(network.broadcast_address), result
+
+    def normalize(self, ip, record):
+        def name_of(node):
+            names = (node or {}).get("names", {})
+            return names.get("de") or names.get("en")
+
+        location = record.get("location", {})
+        subdivisions = record.get("subdivisions") or [{}]
+        organization = record.get("autonomous_system_organization") or record.get("traits", {}).get("organization")
+        return {
+            "query": ip,
+            "status": "success",
+            "country": name_of(record.get("country")) or "Nicht verfügbar",
+            "regionName": name_of(subdivisions[0]) or "Nicht verfügbar",
+            "city": name_of(record.get("city")) or "Nicht verfügbar",
+            "zip": record.get("postal", {}).get("code", "Nicht verfügbar"),
+            "lat": location.get("latitude"),
+            "lon": location.get("longitude"),
+            "timezone": location.get("time_zone", "Nicht verfügbar"),
+            "isp": record.get("traits", {}).get("isp", organization or "Nicht verfügbar"),
+            "org": organization or "Nicht verfügbar",
+            "source": self.name,
+        }
+
+
+class LocalRangeProvider(GeoProvider):
+    """
+    Interval index built from a CSV of IP ranges.
+
+    The CSV either has a header row naming the columns (start/end, or
+    ip_from/ip_to, plus any of country, region, city, zip, lat, lon,
+    timezone, isp, org) or is in the headerless DB-IP "city lite" layout:
+    start_ip,end_ip,continent,country,stateprov,city,latitude,longitude.
+    Range bounds may be textual addresses or integers. Integers carry no
+    address family: it is taken from a "version" column (4 or 6), else
+    from the version argument (GEOIP_CSV_VERSION); without either,
+    integers are read as IPv4 unless a bound exceeds 32 bits.
+
+    Ranges are kept per IP version as sorted arrays of start and end
+    integers; a lookup is one binary search.
+    """
+    name = "csv"
+
+    COLUMN_ALIASES = {
+        "start": ("start", "start_ip", "ip_from", "network_start", "range_start"),
+        "end": ("end", "end_ip", "ip_to", "network_end", "range_end"),
+        "country": ("country", "country_name", "country_code"),
+        "regionName": ("region", "region_name", "regionname", "stateprov", "subdivision"),
+        "city": ("city", "city_name"),
+        "zip": ("zip", "zip_code", "postal", "postal_code"),
+        "lat": ("lat", "latitude"),
+        "lon": ("lon", "lng", "longitude"),
+        "timezone": ("timezone", "time_zone"),
+        "isp": ("isp",),
+        "org": ("org", "organization", "as_organization"),
+        "version": ("version", "ip_version", "family", "ip_family"),
+    }
+    DBIP_LAYOUT = ("start", "end", None, "country", "regionName", "city", "lat", "lon")
+    FIELDS = ("country", "regionName", "city", "zip", "lat", "lon", "timezone", "isp", "org")
+
+    def __init__(self, path=GEOIP_CSV_PATH, version=GEOIP_CSV_VERSION):
+        self.path = path
+        self.version = version
+        # version -> (starts, ends, record indexes)
+        self._ranges = {}
+        self._records = []
+        self._load(path)
+
+    def _load(self, path):
+        started = time.perf_counter()
+        record_ids = {}
+        rows = {4: [], 6: []}
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                return
+            layout = self._layout_from_header(first)
+            if layout is None:
+                layout = self.DBIP_LAYOUT
+                pending = [first]
+            else:
+                pending = []
+            for row in _chain(pending, reader):
+                values = {field: row[i] for i, field in enumerate(layout) if field and i < len(row)}
+                try:
+                    version = _parse_version(values.get("version")) or self.version
+                    version, start, end = _parse_range(values["start"], values["end"], version)
+                except (KeyError, ValueError):
+                    continue
+                record = tuple(_convert(field, values.get(field)) for field in self.FIELDS)
+                record_id = record_ids.get(record)
+                if record_id is None:
+                    record_id = record_ids[record] = len(self._records)
+                    self._records.append(record)
+                rows[version].append((start, end, record_id))
+
+        for version, entries in rows.items():
+            entries.sort()
+            # IPv4 bounds fit into unsigned 64-bit arrays; IPv6 needs Python ints.
+            bounds_type = (lambda values: array("Q", values)) if version == 4 else list
+            self._ranges[version] = (
+                bounds_type(start for start, _, _ in entries),
+                bounds_type(end for _, end, _ in entries),
+                array("I", (record_id for _, _, record_id in entries)),
+            )
+        logger.info("Loaded %s IPv4 and %s IPv6 ranges from %s in %.2f s", len(rows[4]), len(rows[6]),
+                    path, time.perf_counter() - started)
+
+    def _layout_from_header(self, header):
+        lowered = [column.strip().lower() for column in header]
+        layout = []
+        for column in lowered:
+            layout.append(next((field for field, aliases in self.COLUMN_ALIASES.items() if column in aliases), None))
+        return layout if "start" in layout and "end" in layout else None
+
+    def find(self, ip_obj):
+        """
+        Returns (start, end, record) of the range containing the address, or None.
+        """
+        starts, ends, record_ids = self._ranges.get(ip_obj.version, ((), (), ()))
+        value = int(ip_obj)
+        position = bisect.bisect_right(starts, value) - 1
+        if position < 0 or ends[position] < value:
+            return None
+        return starts[position], ends[position], self._records[record_ids[position]]
+
+    def lookup(self, ip, wait=time.sleep):
+        found = self.find(ipaddress.ip_address(ip))
+        if found is None:
+            raise GeolocationLookupError("Fehler: IP nicht in der lokalen Datenbank gefunden.")
+        return self.to_result(ip, found[2])
+
+    def block(self, ip_obj):
+        starts, ends, record_ids = self._ranges.get(ip_obj.version, ((), (), ()))
+        value = int(ip_obj)
+        position = bisect.bisect_right(starts, value) - 1
+        if position >= 0 and ends[position] >= value:
+            return starts[position], ends[position], self.to_result(str(ip_obj), self._records[record_ids[position]])
+        # Gap between two ranges: the whole gap is unknown.
+        first = ends[position] + 1 if position >= 0 else 0
+        last = starts[position + 1] - 1 if position + 1 < len(starts) else (1 << ip_obj.max_prefixlen) - 1
+        return first, last, fail_result(str(ip_obj), "IP nicht in der lokalen Datenbank gefunden.")
+
+    def to_result(self, ip, record):
+        result = {"query": ip, "status": "success", "source": self.name}
+        for field, value in zip(self.FIELDS, record):
+            # Missing coordinates stay None so that no map is offered.
+            result[field] = value if value is not None or field in ("lat", "lon") else "Nicht verfügbar"
+        return result
+
+
+def _chain(first_rows, reader):
+    yield from first_rows
+    yield from reader
+
+
+def _parse_range(start, end, version=None):
+    """
+    Returns (version, first, last) for the bounds of a CSV range. Textual
+    addresses determine the family themselves; integer bounds use version,
+    or IPv4 if it is None and both fit into 32 bits.
+    """
+    bounds = []
+    families = set()
+    for value in (start, end):
+        value = value.strip()
+        if value.isdigit():
+            bounds.append(int(value))
+        else:
+            address = ipaddress.ip_address(value)
+            families.add(address.version)
+            bounds.append(int(address))
+    if len(families) > 1:
+        raise ValueError(f"Range {start} - {end} mixes IPv4 and IPv6")
+    if families:
+        version = families.pop()
+    elif version is None:
+        version = 4 if max(bounds) <= 0xFFFFFFFF else 6
+    first, last = bounds
+    if first > last or last >= 1 << (32 if version == 4 else 128):
+        raise ValueError(f"Invalid IPv{version} range {start} - {end}")
+    return version, first, last
+
+
+def _parse_version(value):
+    # "4", "6", "IPv4", "ipv6"; anything else leaves the family open.
+    value = (value or "").strip().lower().removeprefix("ipv")
+    return int(value) if value in ("4", "6") else None
+
+
+def _convert(field, value):
+    if value is None or value == "" or value == "-":
+        return None
+    if field in ("lat", "lon"):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value
+
+
+ONLINE_PROVIDERS = {provider.name: provider for provider in (IpApiProvider, IpInfoProvider)}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def create_provider(kind=GEO_PROVIDER):
+    """
+    Creates the provider for the given kind ("auto", "online", "ip-api",
+    "ipinfo", "mmdb" or "csv").
+    """
+    if kind == "mmdb":
+        return MMDBProvider()
+    if kind == "csv":
+        return LocalRangeProvider()
+    if kind in ONLINE_PROVIDERS:
+        return ONLINE_PROVIDERS[kind]()
+    if kind == "auto":
+        if os.path.exists(GEOIP_MMDB_PATH):
+            try:
+                return MMDBProvider()
+            except ImportError:
+                logger.warning("%s found but the maxminddb package is not installed.", GEOIP_MMDB_PATH)
+        if os.path.exists(GEOIP_CSV_PATH):
+            return LocalRangeProvider()
+    return create_online_provider()
+
+
+def create_online_provider(order=GEO_PROVIDER_ORDER):
+    """
+    Combines the online providers in the given order. With more than one,
+    a FailoverProvider asks the next one when a provider fails or is slow.
+    """
+    if len(order) == 1:
+        return ONLINE_PROVIDERS[order[0]]()
+    from services.geo_failover import FailoverProvider
+    # No client retries: asking the next provider is faster than backing off.
+    return FailoverProvider([ONLINE_PROVIDERS[name](retries=0) for name in order])
+
+
+def get_geo_provider():
+    """
+    Returns the process-wide geolocation provider, creating it on first use.
+    Loading a local database can take a moment, so call this from a worker.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider()
+            logger.info("Using geolocation provider: %s", _provider.name)
+        return _provider
+
+
+def discover_public_ip(urls=PUBLIC_IP_URLS, wait=None):
+    """
+    Returns the own public IP address as seen by the first echo service of
+    urls that answers. The result is cached briefly; concurrent callers
+    share one request. Raises ProviderUnavailable if no service answers.
+    """
+    cache = get_geo_cache()
+    entry = cache.get("public-ip", "self")
+    if entry is not None:
+        return entry.value
+    return get_single_flight().do(("public-ip", "self"), _request_public_ip, urls, wait=wait)
+
+
+def _request_public_ip(urls):
+    error = None
+    for url in urls:
+        try:
+            response = get_http_client().get(url, retries=0)
+            response.raise_for_status()
+            public_ip = str(ipaddress.ip_address(response.text.strip()))
+        except Exception as e:
+            logger.warning("Public IP lookup at %s failed: %s", url, e)
+            error = e
+            continue
+        get_geo_cache().put("public-ip", "self", public_ip)
+        return public_ip
+    raise ProviderUnavailable("Fehler bei der Ermittlung der öffentlichen IP.") from error
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,191 @@
+"""
+Lookup engine for IP geolocation, MAC vendors and network ranges.
+
+The functions here hold all lookup logic and know nothing about Tk, so
+the GeolocationFrame (through thin TaskExecutor adapters), the headless
+CLI (cli.py) and batch jobs share one code path, including the geo cache,
+provider failover and single-flight coalescing. Blocking functions take
+a wait function: background tasks pass TaskContext.wait so that
+cancellation interrupts rate-limit waits and retries.
+
+Usage::
+
+    data = lookup_ip("8.8.8.8")
+    status_code, vendor = lookup_mac("00:1A:2B:3C:4D:5E")
+    for results in lookup_ips(["8.8.8.8", "10.0.0.1", "1.1.1.1"]):
+        ...
+"""
+
+import ipaddress
+import logging
+import re
+import time
+
+from services.geo_cache import get_geo_cache
+from services.geo_providers import GeolocationLookupError, discover_public_ip, get_geo_provider
+from services.http_client import get_http_client
+from services.oui_index import get_oui_index
+from services.single_flight import get_single_flight
+from utils.metrics import get_metrics, timed
+
+logger = logging.getLogger(__name__)
+
+MAC_PATTERN = re.compile(r'^([0-9A-Fa-f]{2}[-:]){5}([0-9A-Fa-f]{2})$')
+MAC_VENDORS_URL = "https://api.macvendors.com/{mac}"
+
+# Columns of geolocation results, e.g. for CSV output.
+GEO_FIELDS = ("query", "status", "message", "networkType", "country", "regionName", "city", "zip", "lat", "lon",
+              "timezone", "isp", "org", "source")
+MAC_FIELDS = ("query", "status", "vendor", "message")
+
+
+def simulated_private_ip_data(ip_str):
+    """
+    Simulated answer for private addresses (never sent to a provider).
+    """
+    return {
+        "query": ip_str,
+        "networkType": "Private",
+        "country": "Lokales Netzwerk",
+        "regionName": "Simulierte Region",
+        "city": "Simulierte Stadt",
+        "zip": "Nicht verfügbar",
+        "lat": 37.7749,     # Simulated coordinate (San Francisco)
+        "lon": -122.4194,   # Simulated coordinate
+        "timezone": "Lokal (simuliert)",
+        "isp": "Privater ISP",
+        "org": "Lokale Organisation",
+        "status": "success"
+    }
+
+
+# ------------------------- IP addresses -------------------------
+def lookup_ip(query, wait=time.sleep):
+    """
+    Returns the geolocation of one IP address from the configured provider
+    (online providers with failover, or a local database). Private
+    addresses get a simulated answer. Raises GeolocationLookupError.
+    """
+    try:
+        ip_obj = ipaddress.ip_address(query.strip())
+    except ValueError:
+        raise GeolocationLookupError("Ungültiges IP-Adressformat.") from None
+    ip_str = str(ip_obj)
+    if ip_obj.is_private:
+        logger.info("IP %s is private.", ip_str)
+        return simulated_private_ip_data(ip_str)
+
+    # Identical lookups running at the same time (e.g. from several frames) share one call.
+    # wait goes to both: the first caller's lookup (retries, backoff) and the waiting callers.
+    provider = get_geo_provider()
+    with get_metrics().timer("lookup_ip", detail=ip_str, provider=provider.name):
+        return get_single_flight().do((provider.name, ip_str), provider.lookup, ip_str, wait, wait=wait)
+
+
+@timed("lookup_public_ip")
+def lookup_public_ip(wait=time.sleep, on_address=None):
+    """
+    Returns (public_ip, geolocation) of this machine. on_address(public_ip)
+    is called as soon as the address is known, before it is geolocated.
+    """
+    public_ip = discover_public_ip(wait=wait)
+    if on_address is not None:
+        on_address(public_ip)
+    return public_ip, lookup_ip(public_ip, wait=wait)
+
+
+def lookup_ips(ips, wait=time.sleep):
+    """
+    Yields lists of results (including "fail" results) for many addresses.
+    Private addresses are answered first; public ones go to the provider's
+    bulk path (ip-api batch endpoint or the local range index).
+    Invalid addresses are returned as "fail" results.
+    """
+    private_results = []
+    public_ips = []
+    for query in ips:
+        try:
+            ip_obj = ipaddress.ip_address(query.strip())
+        except ValueError:
+            private_results.append({"query": query, "status": "fail", "message": "Ungültiges IP-Adressformat."})
+            continue
+        if ip_obj.is_private:
+            private_results.append(simulated_private_ip_data(str(ip_obj)))
+        else:
+            public_ips.append(str(ip_obj))
+    if private_results:
+        yield private_results
+    if public_ips:
+        yield from get_geo_provider().lookup_many(public_ips, wait=wait)
+
+
+def host_count(network):
+    """
+    Returns the number of addresses network.hosts() yields.
+    """
+    if network.prefixlen >= network.max_prefixlen - 1:
+        return network.num_addresses
+    # IPv4 skips the network and broadcast address, IPv6 the subnet-router anycast address.
+    return network.num_addresses - (2 if network.version == 4 else 1)
+
+
+def scan_range(network, wait=time.sleep):
+    """
+    Yields lists of results for all hosts of an ip_network, block by block.
+    """
+    # Timed in the body: a decorator would only time creating the generator.
+    with get_metrics().timer("network_scan", detail=str(network)):
+        yield from lookup_ips((str(ip) for ip in network.hosts()), wait=wait)
+
+
+# ------------------------- MAC addresses -------------------------
+def normalize_mac(query):
+    """
+    Normalizes a MAC address (upper case, colons) for use as cache key.
+    """
+    return query.replace("-", ":").upper()
+
+
+def lookup_mac(query, wait=time.sleep):
+    """
+    Returns (status_code, text) for the vendor of a MAC address. The local
+    IEEE OUI index is asked first; only unknown prefixes go to
+    macvendors.com. Known and unknown (404) vendors from macvendors are
+    stored in the geo cache.
+    """
+    query = query.strip()
+    if not MAC_PATTERN.match(query):
+        raise GeolocationLookupError("Ungültiges MAC-Adressformat.")
+    metrics = get_metrics()
+    with metrics.timer("lookup_mac", provider="oui"):
+        vendor = get_oui_index().lookup(query)
+    if vendor is not None:
+        return 200, vendor
+
+    cache = get_geo_cache()
+    key = normalize_mac(query)
+    entry = cache.get("macvendors", key)
+    if entry is not None:
+        return (404, entry.message) if entry.negative else (200, entry.value)
+    with metrics.timer("lookup_mac", detail=query, provider="macvendors"):
+        return get_single_flight().do(("macvendors", key), _request_mac_vendor, query, key, wait, wait=wait)
+
+
+def _request_mac_vendor(query, key, wait):
+    cache = get_geo_cache()
+    response = get_http_client().get(MAC_VENDORS_URL.format(mac=query), wait=wait)
+    text = response.text.strip()
+    if response.status_code == 200:
+        cache.put("macvendors", key, text)
+    elif response.status_code == 404:
+        cache.put_negative("macvendors", key, text)
+    return response.status_code, text
+
+
+def mac_result(query, status_code, text):
+    """
+    Converts the (status_code, text) of lookup_mac() into a result row.
+    """
+    if status_code == 200:
+        return {"query": query, "status": "success", "vendor": text, "message": None}
+    return {"query": query, "status": "fail", "vendor": None, "message": f"Status {status_code}: {text}"}
@@ -0,0 +1,218 @@
+"""
+Central HTTP client for all outbound requests.
+
+All components share one pooled keep-alive session instead of calling
+requests.get() directly, so TCP/TLS connections are reused across lookups.
+The client adds:
+
+  * default connect/read timeouts (no request can hang forever),
+  * a per-host connection limit,
+  * an adaptive (AIMD) per-host concurrency limit that backs off on 429/503
+    and latency spikes (services/adaptive_limiter.py),
+  * retries with exponential backoff and jitter for connection errors and
+    retryable status codes, honouring the server's Retry-After header,
+  * optional HTTP/2 through httpx (HTTP2_ENABLED, needs "httpx[http2]").
+
+Usage::
+
+    response = get_http_client().get("https://api.ipify.org")
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Optional: HTTP/2 support. Without httpx the requests session is used.
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from config.app_config import (ADAPTIVE_LIMITS_ENABLED, HTTP2_ENABLED, HTTP_BACKOFF_FACTOR, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS_PER_HOST,
+                               HTTP_MAX_RETRIES, HTTP_MAX_RETRY_AFTER, HTTP_POOL_MAX_HOSTS, HTTP_READ_TIMEOUT,
+                               HTTP_USER_AGENT)
+from services.adaptive_limiter import AdaptiveLimiter, get_adaptive_limiter
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Methods that may be repeated even after the server has seen the request.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# Status codes that guarantee the request was not processed, so even a POST
+# can safely be retried.
+NOT_PROCESSED_STATUSES = (429, 503)
+
+
+class HttpClient:
+    """
+    Thread-safe pooled HTTP client with default timeouts and retries.
+
+    Args:
+        limiter: AdaptiveLimiter for the per-host concurrency. By default
+                 every client learns its own limits (up to pool_size);
+                 adaptive=False disables the limiter.
+    """
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR,
+                 max_retry_after=HTTP_MAX_RETRY_AFTER, http2=HTTP2_ENABLED, pool_hosts=HTTP_POOL_MAX_HOSTS,
+                 pool_size=HTTP_MAX_CONNECTIONS_PER_HOST, limiter=None, adaptive=ADAPTIVE_LIMITS_ENABLED):
+        if limiter is None and adaptive:
+            limiter = AdaptiveLimiter(maximum=pool_size)
+        self.limiter = limiter
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_after = max_retry_after
+        self.retries_sent = 0  # Total retries, e.g. for load tests
+        self._stats_lock = threading.Lock()
+        if http2 and httpx is not None:
+            self._session = httpx.Client(
+                http2=True,
+                headers={"User-Agent": HTTP_USER_AGENT},
+                limits=httpx.Limits(max_connections=pool_hosts * pool_size, max_keepalive_connections=pool_hosts),
+            )
+            self._transport_errors = (httpx.TransportError,)
+            self.http2 = True
+        else:
+            if http2:
+                logger.warning("HTTP/2 requested but httpx is not installed; using HTTP/1.1.")
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = HTTP_USER_AGENT
+            # pool_block limits the number of parallel connections per host.
+            adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+            self._transport_errors = (requests.ConnectionError, requests.Timeout)
+            self.http2 = False
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, timeout=None, retries=None, retry_statuses=RETRY_STATUSES,
+                wait=time.sleep, **kwargs):
+        """
+        Sends a request and retries it on connection errors and retryable
+        status codes. After the last attempt the final response is returned
+        (or the last exception raised), so callers still see the status code.
+
+        Args:
+            timeout: (connect, read) tuple or number; defaults to the client timeouts.
+            retries: Number of retries; defaults to HTTP_MAX_RETRIES.
+            retry_statuses: Status codes that trigger a retry.
+            wait: Sleep function used between attempts; background tasks pass
+                  TaskContext.wait so that cancellation interrupts the backoff.
+            **kwargs: Passed on to the session (params, json, data, headers, ...).
+        """
+        method = method.upper()
+        retries = self.max_retries if retries is None else retries
+        timeout = self._timeout(timeout if timeout is not None else self.timeout)
+        idempotent = method in IDEMPOTENT_METHODS
+        host = urlsplit(url).hostname or url
+        started = time.perf_counter()
+        status = "error"
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = self._send(method, url, host, timeout, wait, kwargs)
+                except self._transport_errors as e:
+                    if attempt >= retries or not (idempotent or _not_sent(e)):
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.warning("%s %s failed (%s), retrying in %.1f s", method, url, e, delay)
+                else:
+                    retryable = response.status_code in retry_statuses and (
+                        idempotent or response.status_code in NOT_PROCESSED_STATUSES)
+                    if not retryable or attempt >= retries:
+                        status = response.status_code
+                        return response
+                    delay = self._retry_after(response)
+                    if delay is None:
+                        delay = self._backoff(attempt)
+                    logger.warning("%s %s returned %s, retrying in %.1f s", method, url, response.status_code, delay)
+                    response.close()
+                attempt += 1
+                with self._stats_lock:
+                    self.retries_sent += 1
+                get_metrics().count("http_retries", host=host)
+                wait(delay)
+        finally:
+            # Per-host latency including retries and backoff, i.e. what the caller waited.
+            metrics = get_metrics()
+            metrics.observe("http_request", time.perf_counter() - started, detail=f"{method} {url}", host=host)
+            metrics.count("http_responses", host=host, status=status)
+
+    def _send(self, method, url, host, timeout, wait, kwargs):
+        # One attempt, within the host's adaptive concurrency limit.
+        if self.limiter is None:
+            return self._session.request(method, url, timeout=timeout, **kwargs)
+        with self.limiter.slot(host, wait) as slot:
+            response = self._session.request(method, url, timeout=timeout, **kwargs)
+            slot.status = response.status_code
+            return response
+
+    def close(self):
+        self._session.close()
+
+    def _timeout(self, timeout):
+        if self.http2 and isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return timeout
+
+    def _backoff(self, attempt):
+        # Exponential backoff with full jitter.
+        return random.uniform(0, self.backoff_factor * (2 ** attempt))
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            if parsed is None:
+                return None
+            seconds = parsed.timestamp() - time.time()
+        return min(max(seconds, 0.0), self.max_retry_after)
+
+
+def _not_sent(error):
+    # Only a failed connect means the server never saw the request. A reset
+    # or read error may come after the body went out, so a POST (ip-api
+    # batch, backend calls) must not be replayed then.
+    if httpx is not None and isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    # requests reports a refused connection as a plain ConnectionError
+    # wrapping urllib3's MaxRetryError(reason=NewConnectionError).
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Returns the process-wide HttpClient, creating it on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(limiter=get_adaptive_limiter() if ADAPTIVE_LIMITS_ENABLED else None)
+        return _client
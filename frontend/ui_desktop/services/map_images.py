@@ -0,0 +1,255 @@
+"""
+Static map images for the geolocation map window.
+
+A map is identified by its center (rounded to MAP_IMAGE_COORD_PRECISION
+decimal places, so nearby locations share one image), zoom level and size.
+Downloaded images are stored in a content-addressed disk cache: the file
+name is the SHA-256 of the normalized key, so reopening the map for the
+same or a nearby location never contacts the tile server again. The disk
+cache is bounded by MAP_IMAGE_CACHE_MAX_BYTES (least recently used first).
+
+Reading, downloading and decoding run on the shared TaskExecutor; only the
+final PhotoImage is created on the Tk thread. Recent PhotoImages are kept
+in a small in-memory LRU so that reopening a map is instant.
+
+Usage::
+
+    service = get_map_image_service()
+    service.request(lat, lon, owner=label, on_ready=show_photo, on_error=show_error)
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from config.app_config import (MAP_IMAGE_CACHE_DIR, MAP_IMAGE_CACHE_MAX_BYTES, MAP_IMAGE_COORD_PRECISION,
+                               MAP_IMAGE_MEMORY_ENTRIES, MAP_IMAGE_SIZE, MAP_IMAGE_URL, MAP_IMAGE_ZOOM,
+                               TASK_TIMEOUT_SECONDS)
+from services.http_client import get_http_client
+from services.single_flight import get_single_flight
+from services.task_executor import get_executor
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MapImageError(Exception):
+    """
+    Raised when a map image can neither be loaded from disk nor downloaded.
+    """
+
+
+class MapImageService:
+    """
+    Disk cache, memory LRU and background loading of static map images.
+    """
+    def __init__(self, cache_dir=MAP_IMAGE_CACHE_DIR, max_disk_bytes=MAP_IMAGE_CACHE_MAX_BYTES,
+                 memory_entries=MAP_IMAGE_MEMORY_ENTRIES, precision=MAP_IMAGE_COORD_PRECISION,
+                 url_template=MAP_IMAGE_URL, client=None):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_entries = memory_entries
+        self.precision = precision
+        self.url_template = url_template
+        self.client = client
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+        self._photos = OrderedDict()  # key -> PhotoImage, only touched on the Tk thread
+        self._lock = threading.Lock()
+
+    # ------------------------- Keys -------------------------
+    def key(self, lat, lon, zoom=MAP_IMAGE_ZOOM, size=MAP_IMAGE_SIZE):
+        """
+        Returns the normalized cache key (lat, lon, zoom, width, height).
+        """
+        width, height = size
+        return (round(float(lat), self.precision), round(float(lon), self.precision), int(zoom),
+                int(width), int(height))
+
+    def path_for(self, key):
+        digest = hashlib.sha256("{:.6f},{:.6f},{},{}x{}".format(*key).encode("ascii")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".png")
+
+    def url_for(self, key):
+        lat, lon, zoom, width, height = key
+        return self.url_template.format(lat=lat, lon=lon, zoom=zoom, width=width, height=height)
+
+    # ------------------------- Tk thread -------------------------
+    def cached_photo(self, key):
+        """
+        Returns the PhotoImage for key from the memory LRU, or None.
+        """
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            self.memory_hits += 1
+            get_metrics().count("map_images", source="memory")
+        return photo
+
+    def request(self, lat, lon, owner, on_ready, on_error=None, zoom=MAP_IMAGE_ZOOM, size=MAP_IMAGE_SIZE,
+                timeout=TASK_TIMEOUT_SECONDS):
+        """
+        Delivers the map as a PhotoImage to on_ready(photo) on the Tk thread.
+        A map in the memory LRU is delivered immediately and None is returned;
+        otherwise the TaskHandle of the background load is returned.
+        """
+        key = self.key(lat, lon, zoom, size)
+        photo = self.cached_photo(key)
+        if photo is not None:
+            on_ready(photo)
+            return None
+
+        def deliver(image):
+            on_ready(self._remember(key, image))
+
+        return get_executor().submit(self.load_image, key, owner=owner, on_success=deliver,
+                                     on_error=on_error, timeout=timeout)
+
+    def _remember(self, key, image):
+        # PIL is already loaded by load_image() at this point.
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(image)
+        self._photos[key] = photo
+        self._photos.move_to_end(key)
+        while len(self._photos) > self.memory_entries:
+            self._photos.popitem(last=False)
+        return photo
+
+    # ------------------------- Worker thread -------------------------
+    def load_image(self, ctx, key):
+        """
+        Returns the decoded PIL image for key, from disk or downloaded.
+        Runs on a worker thread.
+        """
+        data = self._read(key)
+        if data is None:
+            ctx.check_cancelled()
+            # Two windows opening the same map wait for one download.
+            data = get_single_flight().do(("map-image",) + key, self._fetch, ctx, key, wait=ctx.wait)
+        else:
+            get_metrics().count("map_images", source="disk")
+        ctx.check_cancelled()
+        return self._decode(data, key)
+
+    def _read(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Could not read cached map %s: %s", path, e)
+            return None
+        try:
+            os.utime(path)  # Recently used maps are pruned last
+        except OSError:
+            pass
+        with self._lock:
+            self.disk_hits += 1
+        return data
+
+    def _fetch(self, ctx, key):
+        data = self._download(ctx, key)
+        self._write(key, data)
+        get_metrics().count("map_images", source="download")
+        return data
+
+    def _download(self, ctx, key):
+        client = self.client or get_http_client()
+        response = client.get(self.url_for(key), wait=ctx.wait)
+        if response.status_code != 200:
+            raise MapImageError("Kartenbild konnte nicht geladen werden.")
+        with self._lock:
+            self.downloads += 1
+        return response.content
+
+    def _decode(self, data, key):
+        # PIL is only imported once a map is actually needed (faster startup).
+        from PIL import Image
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        except Exception as e:
+            # A corrupt cache file must not block the map for good.
+            self._discard(key)
+            raise MapImageError("Kartenbild konnte nicht dekodiert werden.") from e
+        size = key[3:]
+        if image.size != size:
+            image = image.resize(size)
+        return image
+
+    def _write(self, key, data):
+        path = self.path_for(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".map-", suffix=".tmp", dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning("Could not cache map image %s: %s", path, e)
+            return
+        self.prune()
+
+    def _discard(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def prune(self):
+        """
+        Removes the least recently used files until the disk cache fits
+        into max_disk_bytes.
+        """
+        files = []
+        total = 0
+        for directory, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_disk_bytes:
+            return
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "downloads": self.downloads,
+                "memory_entries": len(self._photos)}
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_map_image_service():
+    """
+    Returns the process-wide MapImageService.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = MapImageService()
+        return _service
@@ -0,0 +1,172 @@
+"""
+Offline MAC vendor resolution from the IEEE registration authority files.
+
+The IEEE publishes its assignments as CSV files:
+
+    oui.csv    MA-L, 24-bit prefixes  (https://standards-oui.ieee.org/oui/oui.csv)
+    mam.csv    MA-M, 28-bit prefixes  (https://standards-oui.ieee.org/oui28/mam.csv)
+    oui36.csv  MA-S, 36-bit prefixes  (https://standards-oui.ieee.org/oui36/oui36.csv)
+    iab.csv    IAB,  36-bit prefixes  (https://standards-oui.ieee.org/iab/iab.csv)
+
+They are loaded into one dict per prefix length, keyed by the integer
+prefix. A lookup checks the 36-, 28- and 24-bit prefix of the address in
+that order, so the longest assigned prefix wins in constant time.
+
+Run ``python -m services.oui_index --download`` to fetch the current files
+into OUI_DATA_DIR.
+"""
+
+import argparse
+import csv
+import logging
+import os
+import re
+import sys
+import threading
+
+from config.app_config import HTTP_CONNECT_TIMEOUT, OUI_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILES = {
+    "oui.csv": "https://standards-oui.ieee.org/oui/oui.csv",
+    "mam.csv": "https://standards-oui.ieee.org/oui28/mam.csv",
+    "oui36.csv": "https://standards-oui.ieee.org/oui36/oui36.csv",
+    "iab.csv": "https://standards-oui.ieee.org/iab/iab.csv",
+}
+
+# Prefix lengths in bits, longest first.
+PREFIX_BITS = (36, 28, 24)
+
+# MA-L blocks that the IEEE subdivided into MA-M/MA-S/IAB assignments are
+# registered to the registration authority itself; that is not a vendor.
+REGISTRATION_AUTHORITY = "IEEE Registration Authority"
+
+_HEX_ONLY = re.compile(r"[^0-9A-Fa-f]")
+
+
+def mac_to_int(mac):
+    """
+    Converts a MAC address in any common notation (00:11:22:33:44:55,
+    00-11-22-33-44-55, 0011.2233.4455) to a 48-bit integer.
+    Raises ValueError for anything that is not 12 hex digits.
+    """
+    digits = _HEX_ONLY.sub("", mac)
+    if len(digits) != 12:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return int(digits, 16)
+
+
+class OUIIndex:
+    """
+    Longest-prefix index of IEEE MAC address block assignments.
+    """
+    def __init__(self):
+        self._prefixes = {bits: {} for bits in PREFIX_BITS}
+
+    def __len__(self):
+        return sum(len(table) for table in self._prefixes.values())
+
+    def add(self, assignment, organization):
+        """
+        Adds one assignment given as a hex string of 6, 7 or 9 digits.
+        """
+        bits = len(assignment) * 4
+        if bits not in self._prefixes:
+            raise ValueError(f"Unsupported assignment length: {assignment}")
+        self._prefixes[bits][int(assignment, 16)] = sys.intern(organization.strip())
+
+    def load_ieee_csv(self, path):
+        """
+        Imports one IEEE registry CSV (Registry,Assignment,Organization Name,...).
+        Returns the number of imported assignments.
+        """
+        count = 0
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            for row in csv.DictReader(f):
+                assignment = (row.get("Assignment") or "").strip()
+                organization = row.get("Organization Name") or ""
+                if not assignment:
+                    continue
+                try:
+                    self.add(assignment, organization)
+                    count += 1
+                except ValueError:
+                    logger.debug("Skipping invalid OUI assignment %r in %s", assignment, path)
+        return count
+
+    def load_directory(self, directory=OUI_DATA_DIR):
+        """
+        Imports every known registry file found in the given directory.
+        """
+        for filename in REGISTRY_FILES:
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                count = self.load_ieee_csv(path)
+                logger.info("Loaded %s OUI assignments from %s", count, path)
+        return self
+
+    def lookup(self, mac):
+        """
+        Returns the organization owning the longest matching prefix, or None.
+        """
+        value = mac_to_int(mac)
+        for bits in PREFIX_BITS:
+            vendor = self._prefixes[bits].get(value >> (48 - bits))
+            if vendor is not None and vendor != REGISTRATION_AUTHORITY:
+                return vendor
+        return None
+
+    def lookup_many(self, macs):
+        """
+        Resolves many addresses at once. Returns a dict mac -> vendor (or None).
+        """
+        return {mac: self.lookup(mac) for mac in macs}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_oui_index():
+    """
+    Returns the process-wide OUIIndex, loading OUI_DATA_DIR on first use.
+    The index is empty if no registry files have been downloaded.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = OUIIndex().load_directory()
+        return _index
+
+
+def download_registry(directory=OUI_DATA_DIR):
+    """
+    Downloads the IEEE registry files into the given directory.
+    """
+    from services.http_client import get_http_client
+
+    os.makedirs(directory, exist_ok=True)
+    for filename, url in REGISTRY_FILES.items():
+        logger.info("Downloading %s", url)
+        response = get_http_client().get(url, timeout=(HTTP_CONNECT_TIMEOUT, 120))
+        response.raise_for_status()
+        path = os.path.join(directory, filename)
+        with open(path + ".tmp", "wb") as f:
+            f.write(response.content)
+        os.replace(path + ".tmp", path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Import the IEEE MAC address registries for offline lookups.")
+    parser.add_argument("--download", action="store_true", help="download the current registry files first")
+    parser.add_argument("--directory", default=OUI_DATA_DIR, help="directory holding the registry CSV files")
+    parser.add_argument("mac", nargs="*", help="MAC addresses to resolve after loading")
+    args = parser.parse_args()
+    if args.download:
+        download_registry(args.directory)
+    index = OUIIndex().load_directory(args.directory)
+    print(f"{len(index)} assignments loaded.")
+    for mac in args.mac:
+        print(f"{mac}: {index.lookup(mac) or 'unknown'}")
@@ -0,0 +1,262 @@
+"""
+Block-wise geolocation of large IPv4 and IPv6 ranges.
+
+Geolocation data is assigned per allocation block, not per address, so
+looking up every host of a range mostly repeats the same answer (and a
+/16 or any IPv6 prefix cannot be enumerated at all). scan_blocks() walks
+the range block by block instead:
+
+1. The block containing the next unscanned address comes from the local
+   database if the provider has one (LocalRangeProvider ranges, MMDB
+   prefixes; no network access at all), otherwise from RDAP, the
+   registries' record of the allocation (startAddress/endAddress). If
+   neither knows the block, a RANGE_FALLBACK_PREFIX block is assumed.
+2. One representative address per block is looked up through the engine
+   (geo cache, failover, single flight).
+3. Adjacent blocks with the same location are merged, and one summary row
+   per merged block is yielded.
+
+A /16 or an IPv6 /48 inside one allocation thus costs one RDAP request
+and one lookup. RDAP blocks are remembered for the session (BlockIndex),
+so later scans touching the same allocation skip the request. RANGE_MAX_BLOCKS bounds the cost of ranges that are
+split into many small allocations.
+
+Usage::
+
+    for row in scan_blocks(ipaddress.ip_network("8.8.0.0/16")):
+        print(row["block"], row["addresses"], row["country"])
+"""
+
+import bisect
+import ipaddress
+import logging
+import threading
+import time
+
+from config.app_config import RANGE_FALLBACK_PREFIX, RANGE_MAX_BLOCKS, RDAP_URL
+from services.geo_cache import get_geo_cache
+from services.geo_providers import GeolocationLookupError, fail_result, get_geo_provider
+from services.geolocation_engine import GEO_FIELDS, lookup_ip, simulated_private_ip_data
+from services.http_client import get_http_client
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns of the block summary rows.
+BLOCK_FIELDS = ("block", "first", "last", "addresses", "representative", "blockSource", "netname") + GEO_FIELDS[1:]
+# Result fields that must match for two adjacent blocks to be merged.
+MERGE_FIELDS = ("status", "message", "country", "regionName", "city", "isp", "org")
+
+
+class BlockIndex:
+    """
+    Sorted, non-overlapping address blocks per IP version with a value each
+    (here: the RDAP netname), looked up by binary search. Thread-safe.
+    """
+    def __init__(self):
+        self._blocks = {4: ([], [], []), 6: ([], [], [])}  # version -> (starts, ends, values)
+        self._lock = threading.Lock()
+
+    def find(self, ip_obj):
+        """
+        Returns (first, last, value) of the block containing the address, or None.
+        """
+        starts, ends, values = self._blocks[ip_obj.version]
+        value = int(ip_obj)
+        with self._lock:
+            position = bisect.bisect_right(starts, value) - 1
+            if position < 0 or ends[position] < value:
+                return None
+            return starts[position], ends[position], values[position]
+
+    def add(self, version, first, last, value):
+        starts, ends, values = self._blocks[version]
+        with self._lock:
+            position = bisect.bisect_left(starts, first)
+            # Registries nest networks; keep the first answer where blocks overlap.
+            if (position > 0 and ends[position - 1] >= first) or (position < len(starts)
+                                                                 and starts[position] <= last):
+                return
+            starts.insert(position, first)
+            ends.insert(position, last)
+            values.insert(position, value)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(starts) for starts, _, _ in self._blocks.values())
+
+
+# RDAP blocks seen in this session. The geo cache keeps answers per queried
+# address across sessions, which covers repeated scans of the same range;
+# this index answers any other address inside a known block.
+_rdap_blocks = BlockIndex()
+
+
+def rdap_block(ip_obj, wait=time.sleep):
+    """
+    Returns (first, last, netname) of the registered network containing the
+    address according to RDAP, or None if RDAP has no usable answer.
+    """
+    found = _rdap_blocks.find(ip_obj)
+    if found is not None:
+        return found
+    cache = get_geo_cache()
+    key = str(ip_obj)
+    entry = cache.get("rdap", key)
+    if entry is not None:
+        if entry.negative:
+            return None
+        first = int(ipaddress.ip_address(entry.value["start"]))
+        last = int(ipaddress.ip_address(entry.value["end"]))
+        _rdap_blocks.add(ip_obj.version, first, last, entry.value.get("name"))
+        return first, last, entry.value.get("name")
+    try:
+        with get_metrics().timer("rdap", detail=key):
+            response = get_http_client().get(RDAP_URL.format(ip=key), wait=wait,
+                                             headers={"Accept": "application/rdap+json"})
+    except Exception as e:
+        logger.warning("RDAP lookup of %s failed: %s", key, e)
+        return None
+    if response.status_code != 200:
+        logger.warning("RDAP lookup of %s failed with status code: %s", key, response.status_code)
+        if response.status_code == 404:
+            cache.put_negative("rdap", key, "Nicht gefunden")
+        return None
+    try:
+        data = response.json()
+        start = ipaddress.ip_address(data["startAddress"].strip())
+        end = ipaddress.ip_address(data["endAddress"].strip())
+    except (ValueError, KeyError, AttributeError) as e:
+        logger.warning("Unusable RDAP answer for %s: %s", key, e)
+        return None
+    if start.version != ip_obj.version or not int(start) <= int(ip_obj) <= int(end):
+        logger.warning("RDAP block %s - %s does not contain %s", start, end, key)
+        return None
+    cache.put("rdap", key, {"start": str(start), "end": str(end), "name": data.get("name")})
+    _rdap_blocks.add(ip_obj.version, int(start), int(end), data.get("name"))
+    return int(start), int(end), data.get("name")
+
+
+def fallback_block(ip_obj):
+    """
+    Returns (first, last) of the RANGE_FALLBACK_PREFIX block containing the address.
+    """
+    network = ipaddress.ip_network((ip_obj, RANGE_FALLBACK_PREFIX[ip_obj.version]), strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def representative(first, last):
+    """
+    Address looked up for a block: the first host, i.e. not the network
+    address of a block with more than two addresses.
+    """
+    return first + 1 if last - first >= 2 else first
+
+
+def _lookup(address, wait):
+    try:
+        return lookup_ip(str(address), wait=wait)
+    except GeolocationLookupError as e:
+        return fail_result(str(address), str(e))
+
+
+def find_blocks(network, wait=time.sleep, max_blocks=RANGE_MAX_BLOCKS):
+    """
+    Yields (first, last, source, netname, result) for consecutive blocks
+    covering the network, clipped to it. After max_blocks blocks the rest
+    of the network is yielded as one "fail" block.
+    """
+    address_type = type(network.network_address)
+    current = int(network.network_address)
+    end = int(network.broadcast_address)
+    if network.is_private:
+        # Not routed publicly: no registry data, one simulated answer.
+        yield current, end, "private", None, simulated_private_ip_data(str(network.network_address))
+        return
+
+    provider = get_geo_provider()
+    metrics = get_metrics()
+    blocks = 0
+    while current <= end:
+        wait(0)  # Raises TaskCancelled for a cancelled scan
+        ip_obj = address_type(current)
+        if blocks >= max_blocks:
+            yield current, end, "limit", None, fail_result(
+                str(ip_obj), f"Nicht gescannt: mehr als {max_blocks} Blöcke.")
+            return
+        blocks += 1
+        netname = None
+        found = provider.block(ip_obj)
+        if found is not None:
+            first, last, result = found
+            source = provider.name
+        else:
+            rdap = rdap_block(ip_obj, wait)
+            if rdap is not None:
+                first, last, netname = rdap
+                source = "rdap"
+            else:
+                first, last = fallback_block(ip_obj)
+                source = "prefix"
+            result = None
+        first, last = max(first, current), min(last, end)
+        if result is None:
+            result = _lookup(address_type(representative(first, last)), wait)
+        metrics.count("range_blocks", source=source)
+        yield first, last, source, netname, result
+        current = last + 1
+
+
+def block_row(address_type, first, last, source, netname, result):
+    """
+    Builds the summary row of a (merged) block.
+    """
+    prefixes = list(ipaddress.summarize_address_range(address_type(first), address_type(last)))
+    row = {name: result.get(name) for name in GEO_FIELDS[1:]}
+    row.update({
+        "block": str(prefixes[0]) if len(prefixes) == 1 else f"{address_type(first)} - {address_type(last)}",
+        "first": str(address_type(first)),
+        "last": str(address_type(last)),
+        "addresses": last - first + 1,
+        "representative": result.get("query"),
+        "blockSource": source,
+        "netname": netname,
+    })
+    row["status"] = result.get("status", "success")
+    return row
+
+
+def scan_blocks(network, wait=time.sleep, max_blocks=RANGE_MAX_BLOCKS):
+    """
+    Yields one summary row per block of the network (see BLOCK_FIELDS);
+    adjacent blocks with the same location are merged into one row.
+    """
+    # Timed in the body: a decorator would only time creating the generator.
+    with get_metrics().timer("range_scan", detail=str(network)):
+        yield from _merge_blocks(network, wait, max_blocks)
+
+
+def _merge_blocks(network, wait, max_blocks):
+    address_type = type(network.network_address)
+    pending = None  # [first, last, sources, netnames, result] of the block being merged
+    for first, last, source, netname, result in find_blocks(network, wait, max_blocks):
+        if pending is not None and pending[1] + 1 == first and _same_location(pending[4], result):
+            pending[1] = last
+            pending[2].setdefault(source)
+            if netname:
+                pending[3].setdefault(netname)
+            continue
+        if pending is not None:
+            yield _merged_row(address_type, pending)
+        pending = [first, last, {source: None}, {netname: None} if netname else {}, result]
+    if pending is not None:
+        yield _merged_row(address_type, pending)
+
+
+def _same_location(a, b):
+    return all(a.get(name) == b.get(name) for name in MERGE_FIELDS)
+
+
+def _merged_row(address_type, pending):
+    first, last, sources, netnames, result = pending
+    return block_row(address_type, first, last, ",".join(sources), ",".join(netnames) or None, result)
@@ -0,0 +1,191 @@
+"""
+Relevance ranking for search results.
+
+Every result is featurized exactly once when it is added to a RankingIndex:
+its text (url, source and description) is normalized and split into words.
+The index keeps two levels of postings: word -> results containing it, and
+character n-gram -> words containing it. Search results share most of their
+words (domains, source names, first and last names), so the n-grams of a
+word are computed once per distinct word, not once per result, and adding
+a result costs little more than splitting its text.
+
+Ranking a query walks the words of each query n-gram and scores every
+result by the TF-IDF weighted share of the query n-grams it contains, so a
+score of 1.0 means every part of the query occurs in the result. The best
+k results are picked with a heap over the results that scored at all.
+
+If the optional "rapidfuzz" package is installed, its C-accelerated
+token_set_ratio scorer is used instead of the n-gram index.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from utils.metrics import get_metrics
+
+# Optional: C-accelerated fuzzy string scorers.
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
+NGRAM_SIZE = 3
+
+_NON_WORD = re.compile(r"[\W_]+")
+# Same as _NON_WORD, but keeps the line breaks that separate the texts of a batch.
+_NON_WORD_LINES = re.compile(r"(?:[^\w\n]|_)+")
+# Fast path of normalize_many() for ASCII text: punctuation -> space.
+_ASCII_NON_WORD = {code: " " for code in range(128) if not chr(code).isalnum() and chr(code) != "\n"}
+
+
+def result_text(result):
+    return f"{result['url']} {result['source']} {result['description']}"
+
+
+def normalize(text):
+    """
+    Lower-cases the text and replaces URL punctuation (/, _, -, ., ...) by spaces.
+    """
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def normalize_many(texts):
+    """
+    normalize() for many texts at once: one lower(), translate() and split
+    over the joined texts instead of one regex call per text. The words are
+    the same; surrounding spaces are not stripped.
+    """
+    blob = "\n".join(text.replace("\n", " ") for text in texts).lower().translate(_ASCII_NON_WORD)
+    if not blob.isascii():
+        blob = _NON_WORD_LINES.sub(" ", blob)
+    return blob.split("\n")
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    """
+    Returns a Counter of the character n-grams of every word in the
+    normalized text. Words are padded so that short words and word
+    boundaries still produce n-grams.
+    """
+    grams = Counter()
+    for word in text.split():
+        grams.update(word_ngrams(word, n))
+    return grams
+
+
+def word_ngrams(word, n=NGRAM_SIZE):
+    """
+    Returns the n-grams of one padded word as a list (with repetitions).
+    """
+    padded = f" {word} "
+    if len(padded) <= n:
+        return [padded]
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+class RankingIndex:
+    """
+    Incremental relevance index over search results.
+    """
+    def __init__(self, n=NGRAM_SIZE, use_rapidfuzz=True):
+        self.n = n
+        self.use_rapidfuzz = use_rapidfuzz and process is not None
+        self.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        self._results = []
+        self._texts = []
+        # word -> document ids, once per occurrence of the word in the document
+        self._words = {}
+        # n-gram -> words, once per occurrence of the n-gram in the word
+        self._grams = defaultdict(list)
+
+    def add(self, results):
+        """
+        Adds results (dicts with url, source and description) to the index.
+        """
+        with get_metrics().timer("ranking", operation="index"):
+            self._add(results)
+
+    def _add(self, results):
+        results = list(results)
+        start = len(self._results)
+        self._results.extend(results)
+        texts = normalize_many(result_text(result) for result in results)
+        if self.use_rapidfuzz:
+            self._texts.extend(text.strip() for text in texts)
+            return
+        words, grams, n = self._words, self._grams, self.n
+        for doc_id, text in enumerate(texts, start):
+            for word in text.split():
+                postings = words.get(word)
+                if postings is None:
+                    postings = words[word] = []
+                    for gram in word_ngrams(word, n):
+                        grams[gram].append(word)
+                postings.append(doc_id)
+
+    def rank(self, query, k=None):
+        """
+        Returns up to k (result, score) pairs, best first; all results if k is None.
+        Scores range from 0.0 to 1.0. Equal scores keep the insertion order.
+        """
+        with get_metrics().timer("ranking", operation="rank"):
+            return self._rank(query, k)
+
+    def _rank(self, query, k):
+        count = len(self._results)
+        if not count:
+            return []
+        k = count if k is None else min(k, count)
+        query = normalize(query)
+        if self.use_rapidfuzz:
+            scores = {doc_id: score / 100.0 for _, score, doc_id in
+                      process.extract(query, self._texts, scorer=fuzz.token_set_ratio, processor=None, limit=None)}
+        else:
+            scores = self._score(query)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        ranked = [(self._results[doc_id], score) for doc_id, score in best if score > 0]
+        if len(ranked) < k:
+            # Fill up with the unmatched results in insertion order.
+            ranked.extend((result, 0.0) for doc_id, result in enumerate(self._results)
+                          if not scores.get(doc_id))
+            del ranked[k:]
+        return ranked
+
+    def _score(self, query):
+        count = len(self._results)
+        scores = defaultdict(float)
+        total = 0.0
+        for gram, query_count in ngrams(query, self.n).items():
+            # Term frequency of the n-gram per document, summed over its words.
+            frequencies = Counter()
+            for word in self._grams.get(gram, ()):
+                frequencies.update(self._words[word])
+            # Smoothed IDF: n-grams found in every result (e.g. "htt") weigh little.
+            idf = math.log((count + 1) / (len(frequencies) + 1)) + 1.0
+            total += query_count * idf
+            if query_count == 1:
+                for doc_id in frequencies:
+                    scores[doc_id] += idf
+            else:
+                for doc_id, doc_count in frequencies.items():
+                    scores[doc_id] += (doc_count if doc_count < query_count else query_count) * idf
+        if not total:
+            return {}
+        return {doc_id: score / total for doc_id, score in scores.items()}
+
+
+def rank_results(query, results, k=None):
+    """
+    Ranks a list of results once; use a RankingIndex for results that arrive
+    incrementally.
+    """
+    index = RankingIndex()
+    index.add(results)
+    return index.rank(query, k)
@@ -0,0 +1,76 @@
+"""
+Rate limiting helpers for outbound provider requests.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens are refilled continuously at ``rate`` tokens per second up to
+    ``capacity``. acquire() blocks until enough tokens are available, which
+    keeps callers within a provider's published quota while still allowing
+    short bursts.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute, burst=None):
+        """
+        Creates a bucket from a "N requests per minute" quota.
+        """
+        return cls(requests_per_minute / 60.0, burst if burst is not None else requests_per_minute)
+
+    def _refill(self):
+        now = time.monotonic()
+        if now < self._updated:
+            # Still inside a back-off window set by drain().
+            return
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Takes tokens if they are available right now. Returns True on success.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, wait=time.sleep):
+        """
+        Blocks until the requested number of tokens could be taken.
+
+        Args:
+            tokens: Number of tokens to take.
+            wait: Sleep function used while waiting. Background tasks pass
+                  TaskContext.wait so that cancellation interrupts the wait.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                delay = (tokens - self._tokens) / self.rate + max(0.0, self._updated - time.monotonic())
+            wait(delay)
+
+    def drain(self, seconds):
+        """
+        Empties the bucket and postpones the next refill, e.g. after the
+        provider answered with HTTP 429 and told us how long to back off.
+        """
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = time.monotonic() + seconds
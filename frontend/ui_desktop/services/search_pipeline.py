@@ -0,0 +1,236 @@
+"""
+Concurrent search pipeline for the name search.
+
+All enabled sources are started at once on an asyncio event loop that runs
+inside a TaskExecutor worker, so the total latency is that of the slowest
+source instead of the sum of all sources. Every source is an async
+generator yielding lists of result dicts ({"url", "source", "description"})
+and gets its own timeout. Progress is reported through the task context as
+
+    ("results", source, [result, ...])   a batch of new results
+    ("done", source, None)               the source finished
+    ("timeout", source, None)            the source exceeded its timeout
+    ("error", source, message)           the source failed
+
+Usage from a frame::
+
+    get_executor().submit(run_search_pipeline, query, ["internal", "web"],
+                          owner=self, on_progress=self.on_search_progress, ...)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from urllib.error import HTTPError
+
+from config.app_config import SEARCH_SOURCE_TIMEOUT_SECONDS
+from services.adaptive_limiter import get_adaptive_limiter
+from utils.metrics import get_metrics, timed
+
+logger = logging.getLogger(__name__)
+
+# Host scraped by googlesearch; its requests bypass HttpClient, so they take
+# a slot of the adaptive limiter explicitly.
+GOOGLE_HOST = "www.google.com"
+# Results per Google result page (one request each).
+SEARCH_PAGE_SIZE = 5
+
+# How often the pipeline checks whether the task was cancelled.
+CANCEL_POLL_SECONDS = 0.05
+
+_UNRESOLVED = object()
+_search = _UNRESOLVED
+
+
+def google_search():
+    """
+    Returns googlesearch.search, or None if the optional package is missing.
+    The package is only imported on the first web search to keep startup fast.
+    """
+    global _search
+    if _search is _UNRESOLVED:
+        try:
+            from googlesearch import search
+        except ImportError:
+            search = None
+        _search = search
+    return _search
+
+
+def _result(url, source, description):
+    return {"url": url, "source": source, "description": description}
+
+
+async def internal_source(query):
+    yield [
+        _result(f"https://internal.example.com/profil/{query.replace(' ', '_')}",
+                "Interne Datenbank", "Ergebnis aus der PeopleFinder-Datenbank."),
+        _result(f"https://social.internal.com/user/{query.replace(' ', '')}",
+                "Interne Datenbank", "Ergebnis aus der SocialSphere-Datenbank."),
+    ]
+
+
+async def web_source(query):
+    search = google_search()
+    if search is None:
+        yield [
+            _result(f"https://example.com/profil/{query.replace(' ', '_')}",
+                    "Web-Suche (simuliert)", "Simuliertes Web-Ergebnis."),
+            _result(f"https://news.example.com/articles/{query.replace(' ', '-')}",
+                    "Web-Suche (simuliert)", "Simuliertes Web-Ergebnis."),
+        ]
+        return
+    # googlesearch blocks (including its pause between page requests), so it
+    # is iterated in a thread and every URL is streamed as soon as it arrives.
+    async for url in iterate_in_thread(lambda: limited_search(search, query)):
+        yield [_result(url, "Web-Suche", "Ergebnis der Suchmaschinenabfrage.")]
+
+
+def limited_search(search, query, results=SEARCH_PAGE_SIZE):
+    """
+    Runs a googlesearch query within Google's adaptive concurrency limit,
+    so parallel name searches back off together when Google throttles.
+    A slot is only held while a result page is requested: the consumer may
+    stop iterating at any time (source timeout, cancellation), and that
+    must neither block the slot nor count as a failure of Google.
+    """
+    limiter = get_adaptive_limiter()
+    urls = search(query, num=SEARCH_PAGE_SIZE, stop=results, pause=1)
+    count = 0
+    while True:
+        if count % SEARCH_PAGE_SIZE == 0:
+            # googlesearch requests the next page once the last one is used up.
+            with limiter.slot(GOOGLE_HOST) as slot:
+                try:
+                    url = next(urls, None)
+                except HTTPError as e:
+                    slot.status = e.code
+                    raise
+        else:
+            url = next(urls, None)
+        if url is None:
+            return
+        count += 1
+        yield url
+
+
+async def social_source(query):
+    yield [
+        _result(f"https://twitter.com/{query.replace(' ', '')}",
+                "Soziale Netzwerke", "Simuliertes Ergebnis aus sozialen Netzwerken."),
+        _result(f"https://linkedin.com/in/{query.replace(' ', '-')}",
+                "Soziale Netzwerke", "Simuliertes Ergebnis aus sozialen Netzwerken."),
+    ]
+
+
+async def extended_source(query):
+    description = "Ergebnis aus erweiterten Quellen (wissenschaftliche Artikel, Pressemitteilungen)."
+    yield [
+        _result(f"https://scholarly.example.com/article/{query.replace(' ', '_')}",
+                "Erweiterte Quelle", description),
+        _result(f"https://press.example.com/mitteilung/{query.replace(' ', '-')}",
+                "Erweiterte Quelle", description),
+    ]
+
+
+SOURCES = {
+    "internal": internal_source,
+    "web": web_source,
+    "social": social_source,
+    "extended": extended_source,
+}
+
+
+async def iterate_in_thread(factory):
+    """
+    Iterates the blocking iterable returned by factory() in a daemon thread
+    and yields its items on the event loop. A daemon thread is used instead
+    of the loop's executor so that a cancelled search never waits for a
+    blocking call to return.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            # The loop is already closed because the search was cancelled.
+            stop.set()
+
+    def produce():
+        try:
+            for item in factory():
+                if stop.is_set():
+                    return
+                put(item)
+        except Exception as e:
+            put(e)
+        finally:
+            put(end)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = await items.get()
+            if item is end:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+async def _run_source(ctx, name, query, timeout):
+    metrics = get_metrics()
+
+    async def consume():
+        async for batch in SOURCES[name](query):
+            if batch:
+                metrics.count("search_results", len(batch), source=name)
+                ctx.report_progress("results", name, batch)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Search source %s timed out after %s s", name, timeout)
+        outcome = "timeout"
+        ctx.report_progress("timeout", name, None)
+    except Exception as e:
+        logger.error("Search source %s failed: %s", name, e)
+        outcome = "error"
+        ctx.report_progress("error", name, str(e))
+    else:
+        outcome = "done"
+        ctx.report_progress("done", name, None)
+    metrics.observe("search_source", time.perf_counter() - started, detail=query, source=name)
+    metrics.count("search_source_outcomes", source=name, outcome=outcome)
+
+
+async def _run_pipeline(ctx, query, sources, timeout):
+    pending = {asyncio.ensure_future(_run_source(ctx, name, query, timeout)) for name in sources}
+    while pending:
+        if ctx.cancelled:
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            break
+        _, pending = await asyncio.wait(pending, timeout=CANCEL_POLL_SECONDS)
+    ctx.check_cancelled()
+
+
+@timed("search")
+def run_search_pipeline(ctx, query, sources, timeout=SEARCH_SOURCE_TIMEOUT_SECONDS):
+    """
+    Task function for the TaskExecutor: runs the given sources concurrently
+    and returns once all of them have finished, failed or timed out.
+    """
+    unknown = [name for name in sources if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown search sources: {', '.join(unknown)}")
+    asyncio.run(_run_pipeline(ctx, query, sources, timeout))
@@ -0,0 +1,210 @@
+"""
+Process-wide settings store.
+
+The settings live in memory; every component reads them through
+get_settings_store() instead of re-reading settings.json. Changes are
+published to subscribers immediately and written to disk behind the scenes:
+a save is only performed once no further change arrived for
+SETTINGS_SAVE_DELAY_SECONDS, so dragging a slider costs no disk I/O until
+it settles. Files are written to a temporary file and renamed into place,
+so a crash never leaves a half-written settings.json.
+
+Usage::
+
+    store = get_settings_store()
+    store.get("font_size")
+    store.set("font_size", 16)
+    unsubscribe = store.subscribe(self.on_setting_changed, keys=("font_size",))
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from config.app_config import SETTINGS_FILE, SETTINGS_SAVE_DELAY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Schema of all settings with their default values.
+DEFAULT_SETTINGS = {
+    "appearance_mode": "System",         # "System", "Light" or "Dark"
+    "font_size": 14,
+    "auto_complete_enabled": True,
+    "show_advanced_filters": False,
+    "custom_primary_color": "#0078D7",
+    "custom_accent_color": "#00B4FF",
+    "auto_dark_mode": False,             # Automatic dark/light switching
+    "selected_language": "de",           # "de" or "en"
+    "layout_spacing": 10,                # Layout spacing in pixels
+    "log_level": "INFO",                 # "INFO", "DEBUG" or "ERROR"
+    "notifications_enabled": True,
+    "sound_enabled": True,
+    "adaptive_limits": {},               # Per host: {"min": ..., "max": ...} plus the learned "limit"
+}
+
+
+class SettingsStore:
+    """
+    Thread-safe in-memory settings with change subscriptions and
+    debounced write-behind persistence.
+    """
+    def __init__(self, path=SETTINGS_FILE, save_delay=SETTINGS_SAVE_DELAY_SECONDS, defaults=DEFAULT_SETTINGS):
+        self.path = path
+        self.save_delay = save_delay
+        self.defaults = copy.deepcopy(defaults)
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # Keeps saves in order
+        self._subscribers = []
+        self._timer = None
+        self._dirty = False
+        self._settings = self._load()
+
+    # ------------------------- Reading -------------------------
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._settings:
+                return self._settings[key]
+            return self.defaults.get(key, default)
+
+    def all(self):
+        """
+        Returns a copy of all settings.
+        """
+        with self._lock:
+            return copy.deepcopy(self._settings)
+
+    # ------------------------- Writing -------------------------
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        """
+        Changes several settings at once, notifies subscribers about every
+        changed key and schedules a save.
+        """
+        with self._lock:
+            changed = {key: value for key, value in values.items() if self._settings.get(key) != value}
+            self._settings.update(changed)
+            if changed:
+                self._schedule_save()
+        self._notify(changed)
+
+    def replace(self, values):
+        """
+        Replaces all settings (e.g. when importing a backup); missing keys
+        fall back to their defaults.
+        """
+        merged = dict(self.defaults)
+        merged.update(values)
+        with self._lock:
+            removed = [key for key in self._settings if key not in merged]
+            for key in removed:
+                del self._settings[key]
+        self.update(merged)
+
+    def reset(self):
+        self.replace(self.defaults)
+
+    # ------------------------- Subscriptions -------------------------
+    def subscribe(self, callback, keys=None):
+        """
+        Registers callback(key, value) for changes of the given keys (all
+        keys if None). Callbacks run in the thread that changed the setting,
+        which for the UI is the Tk main thread. Returns an unsubscribe function.
+        """
+        entry = (callback, frozenset(keys) if keys is not None else None)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _notify(self, changed):
+        if not changed:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for key, value in changed.items():
+            for callback, keys in subscribers:
+                if keys is None or key in keys:
+                    try:
+                        callback(key, value)
+                    except Exception as e:
+                        logger.error("Settings subscriber for %s failed: %s", key, e)
+
+    # ------------------------- Persistence -------------------------
+    def flush(self):
+        """
+        Writes pending changes immediately (e.g. on exit or an explicit save).
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                data = copy.deepcopy(self._settings)
+                self._dirty = False
+            self._write(data)
+
+    def _schedule_save(self):
+        # Lock held. Every change restarts the timer, so only the last change of a burst is saved.
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _load(self):
+        settings = copy.deepcopy(self.defaults)
+        if not os.path.exists(self.path):
+            return settings
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except Exception as e:
+            logger.error("Could not load settings from %s, using defaults: %s", self.path, e)
+        return settings
+
+    def _write(self, data):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            logger.debug("Settings saved to %s", self.path)
+        except Exception as e:
+            logger.error("Could not save settings to %s: %s", self.path, e)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_settings_store():
+    """
+    Returns the process-wide SettingsStore, loading the settings file on first use.
+    Pending changes are written when the interpreter exits.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SettingsStore()
+            atexit.register(_store.flush)
+        return _store
@@ -0,0 +1,109 @@
+"""
+Coalescing of duplicate in-flight provider calls ("single flight").
+
+When the same lookup is started several times while the first call is
+still running (repeated clicks on Lookup, the same IP in two frames), only
+the first caller actually contacts the provider. Everyone else waits for
+that call and receives the same result or exception, so bursts of
+identical requests cost one upstream request and one unit of quota.
+
+Keys are tuples of the provider name and the normalized query, e.g.
+("ip-api", "8.8.8.8"). Results are not kept once the call finished; the
+geo cache takes over from there.
+
+Usage::
+
+    result = get_single_flight().do(("ip-api", ip), provider.lookup, ip, wait=ctx.wait)
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_for
+
+from services.task_executor import TaskCancelled
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Waiting callers check for their own cancellation at this interval.
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time and shares its outcome.
+    """
+    def __init__(self):
+        self._calls = {}  # key -> Future of the running call
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, wait=None, **kwargs):
+        """
+        Returns fn(*args, **kwargs), or the result of the identical call that
+        is already running for key. Exceptions of the shared call are raised
+        to every caller.
+
+        Args:
+            key: Hashable identity of the call (provider name plus normalized query).
+            wait: Sleep function of the caller (TaskContext.wait in background
+                  tasks), so a waiting caller can still be cancelled.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+            if leader:
+                get_metrics().count("single_flight", outcome="executed")
+                return self._run(key, future, fn, args, kwargs)
+
+            get_metrics().count("single_flight", outcome="shared")
+            logger.debug("Joining in-flight call %s", key)
+            self._wait(future, wait)
+            try:
+                return future.result()
+            except TaskCancelled:
+                # The first caller was cancelled, not this one: run the call again.
+                continue
+
+    def _run(self, key, future, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @staticmethod
+    def _wait(future, wait):
+        if wait is None:
+            wait_for([future])
+            return
+        while not wait_for([future], timeout=POLL_INTERVAL_SECONDS).done:
+            wait(0)  # Raises TaskCancelled once the waiting task is cancelled
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """
+    Returns the process-wide SingleFlight shared by all provider calls.
+    """
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
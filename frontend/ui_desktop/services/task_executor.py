@@ -0,0 +1,288 @@
+"""
+Shared background task execution for the desktop UI.
+
+Blocking work (network lookups, file I/O) is submitted to a thread pool.
+Workers never touch Tk widgets; instead every outcome (progress, result,
+error) is put on a thread-safe queue that is drained on the Tk main loop
+through ``after()`` polling, where the registered callbacks are invoked.
+
+Usage from a frame::
+
+    handle = get_executor().submit(
+        lambda ctx: fetch_something(query),
+        owner=self,
+        on_success=self.show_result,
+        on_error=self.show_error,
+        timeout=15,
+    )
+    ...
+    handle.cancel()
+
+Task functions always receive a TaskContext as their first argument, which
+they can use to report progress and to check for cancellation.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+from config.app_config import TASK_POLL_INTERVAL_MS, TASK_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of queued messages handled per poll tick so that a flood of
+# progress updates cannot starve the Tk event loop.
+MAX_MESSAGES_PER_TICK = 200
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a worker (via TaskContext.check_cancelled) when the task
+    was cancelled or exceeded its timeout.
+    """
+
+
+class TaskHandle:
+    """
+    Handle for a submitted task. Returned by TaskExecutor.submit().
+    """
+    def __init__(self, task_id, owner, on_success, on_error, on_progress, timeout):
+        self.task_id = task_id
+        self.owner = owner
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.future = None
+        self.timed_out = False
+        self.done = False
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        Requests cancellation. A task that has not started yet is dropped;
+        a running task stops at its next check_cancelled() call. Callbacks
+        are never invoked for a cancelled task.
+        """
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskContext:
+    """
+    Passed to every task function as its first argument.
+    """
+    def __init__(self, handle, executor):
+        self._handle = handle
+        self._executor = executor
+
+    @property
+    def cancelled(self):
+        return self._handle.cancelled
+
+    def check_cancelled(self):
+        """
+        Raises TaskCancelled if the task was cancelled or timed out.
+        """
+        if self._handle.cancelled:
+            raise TaskCancelled()
+
+    def report_progress(self, *args):
+        """
+        Schedules the task's on_progress callback with the given arguments on
+        the Tk main loop.
+        """
+        if self._handle.on_progress is not None and not self._handle.cancelled:
+            self._executor._post(self._handle, "progress", args)
+
+    def wait(self, seconds):
+        """
+        Sleeps for up to the given number of seconds, returning early (with
+        TaskCancelled) if the task is cancelled in the meantime.
+        """
+        if self._handle._cancel_event.wait(seconds):
+            raise TaskCancelled()
+
+
+class TaskExecutor:
+    """
+    Thread pool plus result queue drained on the Tk main loop.
+
+    submit() and cancel_owner() must be called from the Tk main thread; the
+    callbacks are always invoked there as well.
+    """
+    def __init__(self, max_workers=TASK_WORKERS, poll_interval_ms=TASK_POLL_INTERVAL_MS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="omniscient-worker")
+        self._results = queue.Queue()
+        self._active = {}
+        self._ids = itertools.count(1)
+        self._poll_interval_ms = poll_interval_ms
+        self._root = None
+        self._polling = False
+
+    def submit(self, fn, *args, owner=None, on_success=None, on_error=None, on_progress=None, timeout=None):
+        """
+        Runs ``fn(ctx, *args)`` on a worker thread.
+
+        Args:
+            fn: Callable executed in the background; receives a TaskContext first.
+            owner: Widget the task belongs to. Callbacks are skipped once the
+                   widget is destroyed, and cancel_owner() cancels all of its tasks.
+            on_success: Called with the return value of ``fn``.
+            on_error: Called with the raised exception (TimeoutError on timeout).
+            on_progress: Called with the arguments passed to ctx.report_progress().
+            timeout: Seconds after which the task is cancelled and on_error is
+                     called with a TimeoutError. None disables the timeout.
+
+        Returns:
+            TaskHandle: Handle that can be used to cancel the task.
+
+        Raises:
+            RuntimeError: If there is neither an owner nor a Tk root window.
+        """
+        if self._root is None:
+            self._root = self._find_root(owner)
+        handle = TaskHandle(next(self._ids), owner, on_success, on_error, on_progress, timeout)
+        self._active[handle.task_id] = handle
+        handle.future = self._pool.submit(self._run, handle, fn, args)
+        self._ensure_polling()
+        return handle
+
+    @staticmethod
+    def _find_root(owner):
+        """
+        Returns the Tk root whose main loop delivers the callbacks: that of
+        the owner widget, else Tk's default root. Without either the
+        callbacks could never run, so submitting fails right away.
+        """
+        if owner is not None:
+            return owner.nametowidget(".")
+        root = getattr(tk, "_default_root", None)
+        if root is None:
+            raise RuntimeError("TaskExecutor.submit() needs an owner widget or an existing Tk root window.")
+        return root
+
+    def cancel_owner(self, owner):
+        """
+        Cancels every task submitted with the given owner widget.
+        """
+        for handle in list(self._active.values()):
+            if handle.owner is owner:
+                handle.cancel()
+
+    def shutdown(self):
+        """
+        Cancels all pending tasks and stops the worker pool without waiting.
+        """
+        for handle in list(self._active.values()):
+            handle.cancel()
+        self._active.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------- Worker side -------------------------
+    def _run(self, handle, fn, args):
+        if handle.cancelled:
+            self._post(handle, "cancelled", None)
+            return
+        ctx = TaskContext(handle, self)
+        try:
+            result = fn(ctx, *args)
+        except TaskCancelled:
+            self._post(handle, "cancelled", None)
+        except Exception as e:
+            logger.debug("Task %s failed: %s", handle.task_id, e)
+            self._post(handle, "error", e)
+        else:
+            self._post(handle, "success", result)
+
+    def _post(self, handle, kind, payload):
+        self._results.put((handle, kind, payload))
+
+    # ------------------------- Tk side -------------------------
+    def _ensure_polling(self):
+        if self._polling or self._root is None:
+            return
+        self._polling = True
+        try:
+            self._root.after(self._poll_interval_ms, self._poll)
+        except tk.TclError:
+            self._polling = False
+
+    def _poll(self):
+        self._polling = False
+        for _ in range(MAX_MESSAGES_PER_TICK):
+            try:
+                handle, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._dispatch(handle, kind, payload)
+        self._check_timeouts()
+        if self._active or not self._results.empty():
+            self._ensure_polling()
+
+    def _dispatch(self, handle, kind, payload):
+        if kind == "progress":
+            if not handle.cancelled and not handle.done:
+                self._invoke(handle, handle.on_progress, *payload)
+            return
+        # Terminal message for this task.
+        self._active.pop(handle.task_id, None)
+        if handle.done or handle.cancelled:
+            return
+        handle.done = True
+        if kind == "success":
+            self._invoke(handle, handle.on_success, payload)
+        elif kind == "error":
+            self._invoke(handle, handle.on_error, payload)
+
+    def _check_timeouts(self):
+        now = time.monotonic()
+        for handle in list(self._active.values()):
+            if handle.deadline is not None and now >= handle.deadline and not handle.done:
+                handle.timed_out = True
+                handle.done = True
+                handle.cancel()
+                self._active.pop(handle.task_id, None)
+                logger.warning("Task %s timed out.", handle.task_id)
+                self._invoke(handle, handle.on_error, TimeoutError("Zeitüberschreitung der Anfrage."))
+            elif handle.cancelled and handle.future is not None and handle.future.cancelled():
+                # Cancelled before it ever ran; no terminal message will arrive.
+                self._active.pop(handle.task_id, None)
+
+    def _invoke(self, handle, callback, *args):
+        if callback is None:
+            return
+        owner = handle.owner
+        try:
+            if owner is not None and not owner.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        try:
+            callback(*args)
+        except Exception:
+            logger.exception("Error in callback of task %s", handle.task_id)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the process-wide TaskExecutor, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = TaskExecutor()
+        return _executor
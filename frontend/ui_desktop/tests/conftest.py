@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# Modules are imported relative to frontend/ui_desktop, as in main.py.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """
+    Manually advanced replacement for time.time/time.monotonic.
+    """
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Returns install(*targets): patches every target (e.g.
+    "services.rate_limiter.time.monotonic") with one shared FakeClock.
+    """
+    def install(*targets):
+        clock = FakeClock()
+        for target in targets:
+            monkeypatch.setattr(target, clock)
+        return clock
+    return install
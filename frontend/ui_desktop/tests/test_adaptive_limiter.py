@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from config.app_config import ADAPTIVE_DECREASE_INTERVAL, ADAPTIVE_LIMIT_BACKOFF
+from services.adaptive_limiter import LATENCY_MIN_SAMPLES, AdaptiveLimiter, HostLimit
+from services.task_executor import TaskCancelled
+
+HOST = "api.example.com"
+
+
+def busy_host(limit=4.0, maximum=16):
+    state = HostLimit(HOST, limit, 1, maximum)
+    state.in_flight = int(limit) - 1  # The responding request itself is no longer counted
+    return state
+
+
+def test_additive_increase_while_busy():
+    state = busy_host(4.0)
+    assert state.on_response(0.1, 200, now=100.0) is None
+    assert state.limit == pytest.approx(4.25)
+
+
+def test_no_increase_while_idle():
+    state = HostLimit(HOST, 4.0, 1, 16)
+    state.on_response(0.1, 200, now=100.0)
+    assert state.limit == 4.0
+
+
+def test_increase_stops_at_maximum():
+    state = busy_host(4.0, maximum=4)
+    state.on_response(0.1, 200, now=100.0)
+    assert state.limit == 4.0
+
+
+@pytest.mark.parametrize("status", [429, 503, None])
+def test_multiplicative_decrease(status):
+    state = busy_host(8.0)
+    assert state.on_response(0.1, status, now=100.0)
+    assert state.limit == pytest.approx(8.0 * ADAPTIVE_LIMIT_BACKOFF)
+
+
+def test_one_decrease_per_interval_and_hold():
+    state = busy_host(8.0)
+    state.on_response(0.1, 429, now=100.0)
+    assert state.on_response(0.1, 429, now=100.0 + ADAPTIVE_DECREASE_INTERVAL / 2) is None
+    assert state.limit == pytest.approx(8.0 * ADAPTIVE_LIMIT_BACKOFF)
+    state.in_flight = int(state.limit) - 1
+    state.on_response(0.1, 200, now=100.0 + ADAPTIVE_DECREASE_INTERVAL / 2)
+    assert state.limit == pytest.approx(8.0 * ADAPTIVE_LIMIT_BACKOFF)
+    assert state.decreases == 1
+
+
+def test_decrease_respects_minimum():
+    state = HostLimit(HOST, 1.0, 1, 16)
+    state.on_response(0.1, 429, now=100.0)
+    assert state.limit == 1.0
+
+
+def test_latency_spike_decreases():
+    state = HostLimit(HOST, 8.0, 1, 16)
+    for _ in range(LATENCY_MIN_SAMPLES):
+        state.on_response(0.1, 200, now=100.0)
+    assert state.on_response(5.0, 200, now=100.0).startswith("latency spike")
+    assert state.limit == pytest.approx(8.0 * ADAPTIVE_LIMIT_BACKOFF)
+
+
+def test_slot_error_counts_as_connection_error():
+    limiter = AdaptiveLimiter(initial=8, maximum=16)
+    with pytest.raises(OSError):
+        with limiter.slot(HOST):
+            raise OSError("connection reset")
+    host = limiter.snapshot()[0]
+    assert (host["limit"], host["in_flight"], host["decreases"]) == (8 * ADAPTIVE_LIMIT_BACKOFF, 0, 1)
+
+
+def test_slot_status_is_reported():
+    limiter = AdaptiveLimiter(initial=8, maximum=16)
+    with limiter.slot(HOST) as slot:
+        slot.status = 429
+    assert limiter.snapshot()[0]["throttled"] == 1
+
+
+def test_cancelled_slot_only_frees_the_slot():
+    limiter = AdaptiveLimiter(initial=8, maximum=16)
+    with pytest.raises(TaskCancelled):
+        with limiter.slot(HOST):
+            raise TaskCancelled()
+    host = limiter.snapshot()[0]
+    assert (host["limit"], host["in_flight"], host["decreases"]) == (8, 0, 0)
+
+
+def test_abandoned_generator_only_frees_the_slot():
+    limiter = AdaptiveLimiter(initial=8, maximum=16)
+
+    def pages():
+        while True:
+            with limiter.slot(HOST):
+                yield "page"
+
+    iterator = pages()
+    next(iterator)
+    assert limiter.snapshot()[0]["in_flight"] == 1
+    iterator.close()  # Raises GeneratorExit inside the slot
+    host = limiter.snapshot()[0]
+    assert (host["limit"], host["in_flight"], host["decreases"]) == (8, 0, 0)
+
+
+def test_acquire_blocks_at_limit():
+    limiter = AdaptiveLimiter(initial=1, maximum=1)
+    limiter.acquire(HOST)
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(HOST), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.2)
+    limiter.release(HOST)
+    assert acquired.wait(5)
+    thread.join(5)
+
+
+def test_cancelled_wait_leaves_the_queue():
+    limiter = AdaptiveLimiter(initial=1, maximum=1)
+    limiter.acquire(HOST)
+
+    def cancelled(seconds):
+        raise TaskCancelled()
+
+    with pytest.raises(TaskCancelled):
+        limiter.acquire(HOST, wait=cancelled)
+    assert limiter.snapshot()[0]["waiting"] == 0
+
+
+def test_configure_and_learned():
+    limiter = AdaptiveLimiter(initial=8, maximum=16)
+    limiter.acquire(HOST)
+    limiter.release(HOST)
+    limiter.configure({HOST: {"min": 1, "max": 2}})
+    assert limiter.snapshot()[0]["limit"] == 2
+    assert limiter.learned() == {HOST: {"min": 1, "max": 2, "limit": 2}}
@@ -0,0 +1,66 @@
+import io
+
+from services.bulk_import import ImportStats, classify, parse_entries, read_lines, work_units
+
+
+def parse(text, max_addresses=256):
+    stats = ImportStats()
+    return list(parse_entries(text.splitlines(), stats, max_addresses)), stats
+
+
+def test_classify():
+    assert classify("8.8.8.8") == ("ip", "8.8.8.8")
+    assert classify('"2001:DB8::1"') == ("ip", "2001:db8::1")
+    assert classify("aa-bb-cc-dd-ee-ff") == ("mac", "AA:BB:CC:DD:EE:FF")
+    assert classify("10.0.0.7/30")[0] == "network"
+    assert classify("hostname") is None
+
+
+def test_mixed_csv_with_header():
+    entries, stats = parse("name;address;mac\n"
+                           "router;192.168.0.1;00:11:22:33:44:55\n"
+                           "# comment\n"
+                           "\n"
+                           "dns, 8.8.8.8\n")
+    assert entries == [("ip", "192.168.0.1"), ("mac", "00:11:22:33:44:55"), ("ip", "8.8.8.8")]
+    assert (stats.entries, stats.invalid, stats.duplicates) == (3, 0, 0)
+
+
+def test_lines_without_address_after_the_first_are_invalid():
+    entries, stats = parse("8.8.8.8\nnot an address\n")
+    assert entries[1][0] == "invalid"
+    assert entries[1][1]["query"] == "not an address"
+    assert stats.invalid == 1
+
+
+def test_duplicates_are_dropped():
+    entries, stats = parse("8.8.8.8\n8.8.8.8 aa:bb:cc:dd:ee:ff\nAA-BB-CC-DD-EE-FF\n")
+    assert entries == [("ip", "8.8.8.8"), ("mac", "AA:BB:CC:DD:EE:FF")]
+    assert stats.duplicates == 2
+
+
+def test_networks_expand_to_new_hosts():
+    entries, stats = parse("10.0.0.1\n10.0.0.0/29\n10.0.0.0/29\n")
+    assert entries == [("ip", f"10.0.0.{i}") for i in range(1, 7)]
+    assert stats.entries == 6
+    assert stats.duplicates == 2  # 10.0.0.1 again and the repeated network
+
+
+def test_oversized_networks_are_invalid():
+    entries, stats = parse("10.0.0.0/16\n", max_addresses=256)
+    assert entries[0][0] == "invalid"
+    assert stats.invalid == 1
+    entries, _ = parse("10.0.0.0/22\n", max_addresses=0)
+    assert len(entries) == 1022
+
+
+def test_read_lines_counts_bytes_and_strips_bom():
+    data = "\ufeff8.8.8.8\n1.1.1.1\n".encode("utf-8")
+    stats = ImportStats(size=len(data))
+    assert list(read_lines(io.BytesIO(data), stats)) == ["8.8.8.8\n", "1.1.1.1\n"]
+    assert (stats.lines, stats.bytes_read, stats.fraction) == (2, len(data), 1.0)
+
+
+def test_work_units_group_ips():
+    units = list(work_units([("ip", "1.1.1.1"), ("mac", "AA"), ("ip", "2.2.2.2"), ("ip", "3.3.3.3")], block_size=2))
+    assert units == [("mac", "AA"), ("ips", ["1.1.1.1", "2.2.2.2"]), ("ips", ["3.3.3.3"])]
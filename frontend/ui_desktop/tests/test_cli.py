@@ -0,0 +1,276 @@
+import csv
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import cli
+from services import bulk_import
+from services.batch import BatchContext, chunked, read_inputs, run_batch
+from services.task_executor import TaskCancelled
+
+
+class FakeEngine:
+    """
+    Stands in for the lookup engines; records every call.
+    """
+    def __init__(self):
+        self.ip_blocks = []
+        self.macs = []
+        self.networks = []
+        self.lock = threading.Lock()
+
+    def lookup_ips(self, ips, wait):
+        ips = list(ips)
+        with self.lock:
+            self.ip_blocks.append(ips)
+        yield [{"query": ip, "status": "fail" if ip.endswith(".99") else "success", "country": "Testland"}
+               for ip in ips]
+
+    def lookup_mac(self, query, wait):
+        with self.lock:
+            self.macs.append(query)
+        if query.startswith("FF"):
+            raise ConnectionError("provider down")
+        return 200, "Test Vendor"
+
+    def scan_blocks(self, network, wait, max_blocks):
+        with self.lock:
+            self.networks.append((str(network), max_blocks))
+        return iter([{"block": str(network), "status": "success", "country": "Testland"}])
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    for module in (cli, bulk_import):
+        monkeypatch.setattr(module, "lookup_ips", engine.lookup_ips)
+        monkeypatch.setattr(module, "lookup_mac", engine.lookup_mac)
+    monkeypatch.setattr(cli, "scan_blocks", engine.scan_blocks)
+    # Keeps the global logging setup (and the settings file) out of the tests.
+    monkeypatch.setattr(cli, "setup_logging", lambda **kwargs: None)
+    monkeypatch.setattr(cli, "shutdown_logging", lambda: None)
+    return engine
+
+
+def stdin(monkeypatch, text):
+    monkeypatch.setattr(cli.sys, "stdin", io.TextIOWrapper(io.BytesIO(text.encode("utf-8")), encoding="utf-8"))
+
+
+def jsonl(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_geo_from_stdin_to_stdout(engine, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "MAX_BATCH_SIZE", 2)
+    stdin(monkeypatch, "# addresses\n1.1.1.1\n\n2.2.2.2\n3.3.3.3\n")
+
+    assert cli.main(["geo", "--concurrency", "1"]) == 0
+
+    out, err = capsys.readouterr()
+    rows = jsonl(out)
+    assert [row["query"] for row in rows] == ["1.1.1.1", "2.2.2.2", "3.3.3.3"]
+    assert rows[0]["country"] == "Testland"
+    assert set(rows[0]) == set(cli.GEO_FIELDS)
+    # Addresses go to the bulk path in blocks.
+    assert engine.ip_blocks == [["1.1.1.1", "2.2.2.2"], ["3.3.3.3"]]
+    assert "3 rows (0 failed)" in err
+
+
+def test_mac_from_file_to_csv(engine, tmp_path, capsys):
+    source = tmp_path / "macs.txt"
+    source.write_text("00:11:22:33:44:55\nFF:FF:FF:FF:FF:FF\n", encoding="utf-8")
+    output = tmp_path / "vendors.csv"
+
+    assert cli.main(["mac", "-i", str(source), "-o", str(output), "-c", "1"]) == 0
+
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [
+        {"query": "00:11:22:33:44:55", "status": "success", "vendor": "Test Vendor", "message": ""},
+        {"query": "FF:FF:FF:FF:FF:FF", "status": "fail", "vendor": "", "message": "provider down"},
+    ]
+    assert "2 rows (1 failed)" in capsys.readouterr().err
+
+
+def test_format_option_overrides_the_extension(engine, tmp_path):
+    output = tmp_path / "vendors.txt"
+    source = tmp_path / "macs.txt"
+    source.write_text("00:11:22:33:44:55\n", encoding="utf-8")
+
+    cli.main(["mac", "-i", str(source), "-o", str(output), "-f", "csv"])
+
+    assert output.read_text(encoding="utf-8").splitlines()[0] == "query,status,vendor,message"
+
+
+def test_only_failures_exit_with_1(engine, monkeypatch):
+    stdin(monkeypatch, "FF:00:00:00:00:01\n")
+
+    assert cli.main(["mac"]) == 1
+
+
+def test_missing_input_file_exits_with_2(engine, tmp_path, capsys):
+    assert cli.main(["geo", "-i", str(tmp_path / "missing.txt")]) == 2
+    assert "Error:" in capsys.readouterr().err
+
+
+def test_invalid_concurrency_is_rejected():
+    with pytest.raises(SystemExit):
+        cli.parse_args(["geo", "--concurrency", "0"])
+
+
+def test_range_expands_networks_and_reports_invalid_ones(engine, monkeypatch, capsys):
+    stdin(monkeypatch, "10.0.0.0/30\nnot-a-network\n10.1.0.0/24\n")
+
+    cli.main(["range", "--max-addresses", "16"])
+
+    rows = {row["query"]: row for row in jsonl(capsys.readouterr().out)}
+    assert sorted(rows) == ["10.0.0.1", "10.0.0.2", "10.1.0.0/24", "not-a-network"]
+    assert rows["not-a-network"]["message"] == "Ungültiges Netzwerkformat."
+    assert "zu groß" in rows["10.1.0.0/24"]["message"]
+
+
+def test_blocks_scans_every_network(engine, monkeypatch, capsys):
+    stdin(monkeypatch, "10.0.0.0/8\nnot-a-network\n")
+
+    cli.main(["blocks", "--max-blocks", "4", "-c", "1", "-f", "jsonl"])
+
+    rows = jsonl(capsys.readouterr().out)
+    assert [(row["block"], row["status"]) for row in rows] == [("10.0.0.0/8", "success"), ("not-a-network", "fail")]
+    assert engine.networks == [("10.0.0.0/8", 4)]
+
+
+def test_import_reads_binary_stdin(engine, monkeypatch, capsys):
+    stdin(monkeypatch, "address;mac\n8.8.8.8;00:11:22:33:44:55\n8.8.8.8\nbogus\n")
+
+    cli.main(["import", "-c", "1"])
+
+    out, err = capsys.readouterr()
+    rows = {(row["query"], row["type"], row["status"]) for row in jsonl(out)}
+    assert rows == {("8.8.8.8", "ip", "success"), ("00:11:22:33:44:55", "mac", "success"),
+                    ("bogus", "invalid", "fail")}
+    assert "1 duplicates skipped, 1 invalid entries" in err
+
+
+class TailedInput:
+    """
+    Input stream that records how many rows the output file held whenever a
+    line was read.
+    """
+    def __init__(self, lines, output):
+        self.lines = lines
+        self.output = output
+        self.seen = []
+
+    def __iter__(self):
+        for line in self.lines:
+            self.seen.append(self.output.read_text(encoding="utf-8").count("\n") if self.output.exists() else None)
+            yield line
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("fmt, header", [("jsonl", 0), ("csv", 1)])
+def test_rows_are_written_while_the_input_is_read(engine, monkeypatch, tmp_path, fmt, header):
+    output = tmp_path / f"vendors.{fmt}"
+    source = TailedInput([f"00:00:00:00:00:0{i}\n" for i in range(5)], output)
+    monkeypatch.setattr(cli, "open", lambda *args, **kwargs: source, raising=False)
+
+    cli.main(["mac", "-i", "macs.txt", "-o", str(output), "-c", "1"])
+
+    # With one lookup in flight, line n is read after n rows were flushed.
+    assert source.seen == [header + n for n in range(5)]
+    assert output.read_text(encoding="utf-8").count("\n") == header + 5
+
+
+# ------------------------- services.batch -------------------------
+def test_read_inputs_and_chunked():
+    assert list(read_inputs(io.StringIO(" a \n\n# comment\nb\n"))) == ["a", "b"]
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def test_run_batch_reads_at_most_concurrency_items_ahead():
+    yielded = []
+    ahead = []
+
+    def items():
+        for i in range(20):
+            ahead.append(i - len(yielded))
+            yield i
+
+    for item, result, error in run_batch(BatchContext(), lambda i: i * 2, items(), concurrency=3):
+        assert error is None and result == item * 2
+        yielded.append(item)
+
+    assert sorted(yielded) == list(range(20))
+    # When an item is read, at most two earlier ones are still pending: three in flight at most.
+    assert max(ahead) == 2
+
+
+def test_run_batch_runs_items_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    results = list(run_batch(BatchContext(), lambda i: barrier.wait() >= 0, range(3), concurrency=3))
+
+    # Would time out (BrokenBarrierError) unless all three calls ran at once.
+    assert [(result, error) for _, result, error in results] == [(True, None)] * 3
+
+
+def test_run_batch_reports_errors_per_item():
+    def fn(item):
+        if item == 1:
+            raise ValueError("bad item")
+        return item
+
+    results = {item: (result, error) for item, result, error in run_batch(BatchContext(), fn, range(3), 2)}
+
+    assert results[0] == (0, None)
+    assert isinstance(results[1][1], ValueError)
+    assert results[2] == (2, None)
+
+
+def test_run_batch_stops_on_cancellation():
+    ctx = BatchContext()
+    read = []
+
+    def items():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    def fn(item):
+        if item == 2:
+            ctx.cancel()
+            ctx.check_cancelled()
+        return item
+
+    with pytest.raises(TaskCancelled):
+        list(run_batch(ctx, fn, items(), concurrency=1))
+
+    assert read == [0, 1, 2]
+
+
+def test_abandoned_run_batch_cancels_waiting_calls():
+    ctx = BatchContext()
+    started = threading.Event()
+
+    def fn(item):
+        if item:
+            started.set()
+            ctx.wait(30)
+        return item
+
+    batch = run_batch(ctx, fn, range(3), concurrency=2)
+    assert next(batch) == (0, 0, None)
+    assert started.wait(5)
+    finished = time.monotonic() + 5
+
+    # Closing the generator cancels the context, which wakes the running call.
+    batch.close()
+
+    assert ctx.cancelled
+    assert time.monotonic() < finished
@@ -0,0 +1,184 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from services.export import (ExportError, RowStream, available_compressions, available_formats, export_filename,
+                             export_rows, stream_format)
+from services.task_executor import TaskCancelled
+
+FIELDS = ["query", "country", "lat"]
+ROWS = [{"query": f"10.0.0.{i}", "country": "Österreich" if i % 2 else "Germany", "lat": 47.5 + i, "extra": "x"}
+        for i in range(25)]
+
+
+class FakeContext:
+    """
+    TaskContext stand-in: records progress and cancels after cancel_after reports.
+    """
+    def __init__(self, cancel_after=None):
+        self.cancel_after = cancel_after
+        self.progress = []
+
+    def check_cancelled(self):
+        if self.cancel_after is not None and len(self.progress) >= self.cancel_after:
+            raise TaskCancelled()
+
+    def report_progress(self, *args):
+        self.progress.append(args)
+
+
+def read_text(path):
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            return f.read()
+    if path.endswith(".zst"):
+        import zstandard
+        with open(path, "rb") as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read().decode("utf-8")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def parse(text, fmt):
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(text)))
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def expected(fmt):
+    # CSV reads every value back as text; JSON Lines keeps the types.
+    convert = str if fmt == "csv" else (lambda value: value)
+    return [{name: convert(row[name]) for name in FIELDS} for row in ROWS]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_round_trip(tmp_path, fmt, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / export_filename("results", fmt, compression))
+    ctx = FakeContext()
+
+    assert export_rows(ctx, ROWS, path, fmt, compression, FIELDS, chunk_size=10) == path
+
+    assert parse(read_text(path), fmt) == expected(fmt)
+    assert ctx.progress == [(10, 25), (20, 25), (25, 25)]
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_parquet_round_trip(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / export_filename("results", "parquet", "zstd"))
+
+    export_rows(FakeContext(), ROWS + [{"query": "10.0.1.1", "country": None}], path, "parquet", "zstd", FIELDS)
+
+    table = parquet.read_table(path)
+    assert table.column_names == FIELDS
+    rows = table.to_pylist()
+    assert rows[0] == {"query": "10.0.0.0", "country": "Germany", "lat": "47.5"}
+    assert rows[-1] == {"query": "10.0.1.1", "country": None, "lat": None}
+
+
+def test_fieldnames_default_to_the_keys_of_the_first_row(tmp_path):
+    path = str(tmp_path / "results.csv")
+
+    export_rows(FakeContext(), ROWS[:2], path)
+
+    assert read_text(path).splitlines()[0] == "query,country,lat,extra"
+
+
+def test_empty_export_writes_an_empty_file(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+
+    export_rows(FakeContext(), [], path, "jsonl")
+
+    assert read_text(path) == ""
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_cancelled_export_leaves_no_file(tmp_path, fmt):
+    path = str(tmp_path / f"results.{fmt}")
+    ctx = FakeContext(cancel_after=1)
+
+    with pytest.raises(TaskCancelled):
+        export_rows(ctx, ROWS, path, fmt, chunk_size=10)
+
+    assert ctx.progress == [(10, 25)]
+    assert os.listdir(tmp_path) == []
+
+
+def test_cancelled_export_keeps_an_existing_file(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("old", encoding="utf-8")
+
+    with pytest.raises(TaskCancelled):
+        export_rows(FakeContext(cancel_after=0), ROWS, str(path))
+
+    assert path.read_text(encoding="utf-8") == "old"
+    assert os.listdir(tmp_path) == ["results.csv"]
+
+
+def test_unsupported_options(tmp_path, monkeypatch):
+    path = str(tmp_path / "results")
+    with pytest.raises(ExportError):
+        export_rows(FakeContext(), ROWS, path, "xml")
+    with pytest.raises(ExportError):
+        export_rows(FakeContext(), ROWS, path, "csv", "bzip2")
+
+    monkeypatch.setattr("services.export._installed", lambda package: False)
+    with pytest.raises(ExportError):
+        export_rows(FakeContext(), ROWS, path, "parquet")
+    with pytest.raises(ExportError):
+        export_rows(FakeContext(), ROWS, path, "csv", "zstd")
+    assert available_formats() == ["csv", "jsonl"]
+    assert available_compressions() == [None, "gzip"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_export_filename_and_stream_format():
+    assert export_filename("results", "jsonl", "gzip") == "results.jsonl.gz"
+    assert export_filename("results", "csv", "zstd") == "results.csv.zst"
+    assert export_filename("results", "parquet", "zstd") == "results.parquet"
+    assert stream_format("out.csv") == "csv"
+    assert stream_format("out.csv.gz") == "csv"
+    assert stream_format("out.jsonl") == "jsonl"
+    assert stream_format("-") == "jsonl"
+    assert stream_format("out.txt", default="csv") == "csv"
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_row_stream_flushes_every_row(tmp_path, fmt):
+    path = str(tmp_path / f"results.{fmt}")
+
+    with RowStream(path, fmt, FIELDS) as stream:
+        # Readable while the stream is still open, as with tail -f.
+        for count, row in enumerate(ROWS[:3], 1):
+            stream.write(row)
+            assert parse(read_text(path), fmt) == expected(fmt)[:count]
+
+    assert stream.written == 3
+
+
+def test_row_stream_gzip_is_complete_after_close(tmp_path):
+    path = str(tmp_path / "results.jsonl.gz")
+
+    with RowStream(path, "jsonl", FIELDS) as stream:
+        stream.write_many(ROWS)
+
+    assert parse(read_text(path), "jsonl") == expected("jsonl")
+
+
+def test_row_stream_to_stdout(capsys):
+    with RowStream("-", "csv", FIELDS) as stream:
+        stream.write(ROWS[0])
+
+    assert capsys.readouterr().out.splitlines() == ["query,country,lat", "10.0.0.0,Germany,47.5"]
+
+
+def test_row_stream_rejects_parquet(tmp_path):
+    with pytest.raises(ExportError):
+        RowStream(str(tmp_path / "results.parquet"), "parquet", FIELDS)
@@ -0,0 +1,97 @@
+import pytest
+
+from services.geo_batch import BatchGeolocator
+from services.rate_limiter import TokenBucket
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("Expecting value")
+        return self.body
+
+
+class FakeClient:
+    """
+    Answers the batch POSTs from a script; None answers every address.
+    """
+    def __init__(self, *script):
+        self.script = list(script)
+        self.posted = []
+
+    def post(self, url, json=None, **kwargs):
+        self.posted.append(list(json))
+        step = self.script.pop(0) if self.script else None
+        if step is None:
+            return FakeResponse(body=[{"query": ip, "status": "success"} for ip in json])
+        return step
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock("services.rate_limiter.time.monotonic")
+
+
+def geolocator(clock, *script, **kwargs):
+    client = FakeClient(*script)
+    return BatchGeolocator(client=client, limiter=TokenBucket(rate=1, capacity=10), **kwargs), client
+
+
+def lookup(geo, clock, ips):
+    return list(geo.lookup(ips, wait=clock.sleep))
+
+
+def test_addresses_are_sent_in_batches(clock):
+    geo, client = geolocator(clock, batch_size=2)
+    batches = lookup(geo, clock, ["1.1.1.1", "2.2.2.2", "3.3.3.3"])
+    assert client.posted == [["1.1.1.1", "2.2.2.2"], ["3.3.3.3"]]
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+def test_throttled_batch_waits_for_the_quota_window(clock):
+    geo, client = geolocator(clock, FakeResponse(429, headers={"X-Ttl": "30"}))
+    started = clock.now
+    [batch] = lookup(geo, clock, ["1.1.1.1"])
+    assert batch[0]["status"] == "success"
+    assert len(client.posted) == 2
+    assert clock.now - started >= 30
+
+
+def test_throttled_retries_are_capped(clock):
+    geo, client = geolocator(clock, *(FakeResponse(429, headers={"X-Ttl": "5"}) for _ in range(10)),
+                             max_throttled=2)
+    [batch] = lookup(geo, clock, ["1.1.1.1", "2.2.2.2"])
+    assert len(client.posted) == 3
+    assert all(row["status"] == "fail" and row["transient"] for row in batch)
+    assert [row["query"] for row in batch] == ["1.1.1.1", "2.2.2.2"]
+
+
+def test_exhausted_quota_pauses_the_next_batch(clock):
+    geo, client = geolocator(clock, FakeResponse(body=[{"query": "1.1.1.1"}], headers={"X-Rl": "0", "X-Ttl": "20"}),
+                             batch_size=1)
+    started = clock.now
+    lookup(geo, clock, ["1.1.1.1", "2.2.2.2"])
+    assert clock.now - started >= 20
+
+
+@pytest.mark.parametrize("response", [FakeResponse(500), FakeResponse(body=None), FakeResponse(body={"a": 1}),
+                                      FakeResponse(body=[{"query": "1.1.1.1"}])])
+def test_failed_batches_are_transient(clock, response):
+    geo, _ = geolocator(clock, response)
+    [batch] = lookup(geo, clock, ["1.1.1.1", "2.2.2.2"])
+    assert all(row["status"] == "fail" and row["transient"] for row in batch)
+
+
+def test_client_errors_are_transient(clock):
+    class BrokenClient:
+        def post(self, url, **kwargs):
+            raise ConnectionError("down")
+
+    geo = BatchGeolocator(client=BrokenClient(), limiter=TokenBucket(rate=1, capacity=10))
+    [batch] = lookup(geo, clock, ["1.1.1.1"])
+    assert batch == [{"query": "1.1.1.1", "status": "fail", "message": "down", "transient": True}]
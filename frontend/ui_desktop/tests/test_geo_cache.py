@@ -0,0 +1,150 @@
+import sqlite3
+
+import pytest
+
+from services.geo_cache import GeoCache
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock("services.geo_cache.time.time")
+
+
+def make_cache(path=None, **kwargs):
+    kwargs.setdefault("ttls", {"ip-api": 100, "macvendors": 1000})
+    kwargs.setdefault("negative_ttl", 10)
+    return GeoCache(path=path, **kwargs)
+
+
+def test_hit_and_miss(clock):
+    cache = make_cache()
+    assert cache.get("ip-api", "8.8.8.8") is None
+    cache.put("ip-api", "8.8.8.8", {"country": "United States"})
+    entry = cache.get("ip-api", "8.8.8.8")
+    assert entry.value == {"country": "United States"}
+    assert not entry.negative
+    assert entry.message is None
+    assert cache.get("ipinfo", "8.8.8.8") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_entries_expire_after_provider_ttl(clock):
+    cache = make_cache()
+    cache.put("ip-api", "1.1.1.1", {"city": "Sydney"})
+    cache.put("macvendors", "00:11:22", "Vendor")
+    clock.now += 101
+    assert cache.get("ip-api", "1.1.1.1") is None
+    assert cache.get("macvendors", "00:11:22").value == "Vendor"
+
+
+def test_unknown_provider_uses_default_ttl(clock):
+    cache = make_cache()
+    cache.put("other", "key", 1)
+    clock.now += 3600
+    assert cache.get("other", "key").value == 1
+
+
+def test_negative_entries_have_shorter_ttl(clock):
+    cache = make_cache()
+    cache.put_negative("ip-api", "10.0.0.1", "reserved range")
+    entry = cache.get("ip-api", "10.0.0.1")
+    assert entry.negative
+    assert entry.message == "reserved range"
+    assert cache.stats()["negative_hits"] == 1
+    clock.now += 11
+    assert cache.get("ip-api", "10.0.0.1") is None
+
+
+def test_negative_ttl_never_exceeds_provider_ttl(clock):
+    cache = make_cache(ttls={"fast": 5}, negative_ttl=10)
+    cache.put_negative("fast", "key", "unknown")
+    clock.now += 6
+    assert cache.get("fast", "key") is None
+
+
+def test_put_many_and_lru_bound(clock):
+    cache = make_cache(max_entries=2)
+    cache.put_many("ip-api", [("a", 1, False), ("b", "bad", True), ("c", 3, False)])
+    assert cache.get("ip-api", "a") is None
+    assert cache.get("ip-api", "b").negative
+    assert cache.get("ip-api", "c").value == 3
+
+
+def test_entries_survive_restart(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    make_cache(path).put("ip-api", "9.9.9.9", {"org": "Quad9"})
+    make_cache(path).put_negative("ip-api", "0.0.0.0", "invalid")
+    cache = make_cache(path)
+    assert cache.get("ip-api", "9.9.9.9").value == {"org": "Quad9"}
+    assert cache.get("ip-api", "0.0.0.0").message == "invalid"
+    clock.now += 11
+    assert make_cache(path).get("ip-api", "0.0.0.0") is None
+
+
+def accessed(path):
+    db = sqlite3.connect(path)
+    try:
+        return dict(db.execute("SELECT key, accessed FROM entries"))
+    finally:
+        db.close()
+
+
+def test_hits_do_not_write_to_disk(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    make_cache(path).put("ip-api", "9.9.9.9", {"org": "Quad9"})
+    stored = clock.now
+    cache = make_cache(path)
+    changes = cache._db.total_changes
+
+    for _ in range(5):
+        clock.now += 1
+        assert cache.get("ip-api", "9.9.9.9") is not None
+
+    assert cache._db.total_changes == changes
+    assert accessed(path) == {"9.9.9.9": stored}
+    cache.flush()
+    assert accessed(path) == {"9.9.9.9": stored + 5}
+
+
+def test_access_times_are_written_with_the_next_store(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = make_cache(path)
+    cache.put("ip-api", "1.1.1.1", 1)
+    clock.now += 10
+    cache.get("ip-api", "1.1.1.1")
+    clock.now += 10
+
+    cache.put("ip-api", "2.2.2.2", 2)
+
+    assert accessed(path) == {"1.1.1.1": clock.now - 10, "2.2.2.2": clock.now}
+
+
+def test_access_times_are_written_in_batches(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr("services.geo_cache.ACCESS_FLUSH_ENTRIES", 3)
+    path = str(tmp_path / "cache.sqlite")
+    cache = make_cache(path)
+    cache.put_many("ip-api", [(key, key, False) for key in "abc"])
+    stored = clock.now
+    clock.now += 1
+
+    cache.get("ip-api", "a")
+    cache.get("ip-api", "b")
+    assert accessed(path) == {"a": stored, "b": stored, "c": stored}
+    cache.get("ip-api", "c")
+    assert accessed(path) == {"a": stored + 1, "b": stored + 1, "c": stored + 1}
+
+
+def test_disk_bound_keeps_the_recently_hit_entries(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = make_cache(path)
+    for key in "abc":
+        cache.put("ip-api", key, key)
+        clock.now += 1
+    cache.get("ip-api", "a")
+    cache.flush()
+
+    reopened = make_cache(path, max_disk_entries=2)
+
+    assert sorted(accessed(path)) == ["a", "c"]
+    assert reopened.get("ip-api", "b") is None
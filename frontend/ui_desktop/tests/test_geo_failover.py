@@ -0,0 +1,219 @@
+import threading
+
+import pytest
+
+from services import geo_providers
+from services.geo_cache import GeoCache
+from services.geo_failover import FailoverProvider
+from services.geo_providers import GeolocationLookupError, IpApiProvider, IpInfoProvider, ProviderUnavailable
+from services.task_executor import TaskCancelled
+from utils.metrics import get_metrics
+
+
+class FakeProvider:
+    """
+    Online provider stand-in: answers with its name, raises the given
+    error, or blocks until release is set.
+    """
+    def __init__(self, name, error=None, release=None):
+        self.name = name
+        self.error = error
+        self.release = release
+        self.calls = 0
+        self.wait = None
+        self.finished = threading.Event()
+
+    def cached(self, ip):
+        return None
+
+    def lookup(self, ip, wait=None):
+        self.calls += 1
+        self.wait = wait
+        try:
+            if self.release is not None:
+                self.release.wait(5)
+            if self.error is not None:
+                raise self.error
+            return {"query": ip, "status": "success", "source": self.name}
+        finally:
+            self.finished.set()
+
+
+@pytest.fixture(autouse=True)
+def metrics():
+    # Hedge delays come from the shared latency histograms.
+    get_metrics().reset()
+    yield get_metrics()
+    get_metrics().reset()
+
+
+def failover(*providers, **kwargs):
+    kwargs.setdefault("hedge", False)
+    return FailoverProvider(providers, **kwargs)
+
+
+def test_fails_over_to_next_provider():
+    first = FakeProvider("a", error=ProviderUnavailable("down", 503))
+    second = FakeProvider("b")
+    provider = failover(first, second)
+    assert provider.lookup("8.8.8.8")["source"] == "b"
+    assert provider.stats()["a"]["failures"] == 1
+    assert provider.stats()["b"]["successes"] == 1
+
+
+def test_definitive_answer_is_not_failed_over():
+    first = FakeProvider("a", error=GeolocationLookupError("Fehler: reserved range"))
+    second = FakeProvider("b")
+    with pytest.raises(GeolocationLookupError, match="reserved range"):
+        failover(first, second).lookup("10.0.0.1")
+    assert second.calls == 0
+
+
+def test_last_error_when_all_providers_fail():
+    provider = failover(FakeProvider("a", error=ProviderUnavailable("a down")),
+                        FakeProvider("b", error=ProviderUnavailable("b down")))
+    with pytest.raises(ProviderUnavailable, match="b down"):
+        provider.lookup("8.8.8.8")
+
+
+def test_hedge_after_delay_first_answer_wins():
+    release = threading.Event()
+    slow = FakeProvider("a", release=release)
+    fast = FakeProvider("b")
+    provider = failover(slow, fast, hedge=True, default_delay=0.05)
+    assert provider.lookup("8.8.8.8")["source"] == "b"
+    assert {"name": "geo_hedges", "labels": {"provider": "b"}, "value": 1} in get_metrics().snapshot()["counters"]
+    # The loser finishes in the background; its late answer is ignored but
+    # still counts for its health.
+    release.set()
+    assert slow.finished.wait(5)
+    provider._pool.shutdown(wait=True)
+    assert provider.stats()["a"]["successes"] == 1
+
+
+def test_no_hedge_when_first_provider_is_fast():
+    fast = FakeProvider("a")
+    other = FakeProvider("b")
+    assert failover(fast, other, hedge=True, default_delay=1.0).lookup("8.8.8.8")["source"] == "a"
+    assert other.calls == 0
+
+
+def test_hedge_delay_follows_p90(metrics):
+    provider = failover(FakeProvider("a"), FakeProvider("b"), default_delay=1.0, min_samples=10, min_delay=0.1)
+    assert provider.hedge_delay(provider.providers[0]) == 1.0
+    for _ in range(10):
+        metrics.observe("geo_provider", 0.3, provider="a")
+    assert provider.hedge_delay(provider.providers[0]) == pytest.approx(0.3, rel=0.05)
+    for _ in range(100):
+        metrics.observe("geo_provider", 0.001, provider="a")
+    assert provider.hedge_delay(provider.providers[0]) == 0.1
+
+
+def test_unhealthy_provider_is_asked_last():
+    broken = FakeProvider("a", error=ProviderUnavailable("down", 503))
+    healthy = FakeProvider("b")
+    provider = failover(broken, healthy, min_score=0.5)
+    for _ in range(4):
+        provider.lookup("8.8.8.8")  # 1.0 * 0.8 ** 4 < 0.5
+    assert provider.stats()["a"]["score"] < 0.5
+    assert [p.name for p in provider.ordered()] == ["b", "a"]
+    broken.calls = 0
+    provider.lookup("8.8.8.8")
+    assert broken.calls == 0
+
+
+def test_throttled_provider_cools_down(fake_clock):
+    clock = fake_clock("services.geo_failover.time.monotonic")
+    throttled = FakeProvider("a", error=ProviderUnavailable("429", 429))
+    provider = failover(throttled, FakeProvider("b"), FakeProvider("c"), cooldown=60)
+    assert provider.lookup("8.8.8.8")["source"] == "b"
+    assert provider.stats()["a"]["throttled"]
+    assert [p.name for p in provider.ordered()] == ["b", "c", "a"]
+    clock.now += 61
+    assert [p.name for p in provider.ordered()] == ["a", "b", "c"]
+
+
+def test_retry_after_overrides_cooldown(fake_clock):
+    clock = fake_clock("services.geo_failover.time.monotonic")
+    provider = failover(FakeProvider("a", error=ProviderUnavailable("429", 429, retry_after=5)), FakeProvider("b"))
+    provider.lookup("8.8.8.8")
+    clock.now += 6
+    assert not provider.stats()["a"]["throttled"]
+
+
+def test_wait_reaches_the_provider():
+    provider = FakeProvider("a")
+
+    def wait(seconds):
+        pass
+
+    failover(provider).lookup("8.8.8.8", wait=wait)
+    assert provider.wait is wait
+
+
+def test_cancelled_lookup_stops_waiting():
+    release = threading.Event()
+    slow = FakeProvider("a", release=release)
+    provider = failover(slow)
+
+    def cancelled(seconds):
+        raise TaskCancelled()
+
+    with pytest.raises(TaskCancelled):
+        provider.lookup("8.8.8.8", wait=cancelled)
+    release.set()
+
+
+def test_cancelled_attempt_does_not_count_for_health():
+    provider = failover(FakeProvider("a", error=TaskCancelled()))
+    with pytest.raises(TaskCancelled):
+        provider.lookup("8.8.8.8")
+    assert provider.stats()["a"] == {"score": 1.0, "throttled": False, "successes": 0, "failures": 0,
+                                     "throttles": 0}
+
+
+# ------------------------- Invalid answers of the HTTP providers -------------------------
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, text="<html>Bad Gateway</html>"):
+        self.status_code = status_code
+        self.body = body
+        self.text = text
+        self.headers = {}
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+        return self.body
+
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+@pytest.fixture
+def http(monkeypatch):
+    cache = GeoCache(path=None)
+    monkeypatch.setattr(geo_providers, "get_geo_cache", lambda: cache)
+
+    def respond(response):
+        monkeypatch.setattr(geo_providers, "get_http_client", lambda: FakeClient(response))
+    return respond
+
+
+@pytest.mark.parametrize("provider_class", [IpApiProvider, IpInfoProvider])
+@pytest.mark.parametrize("body", [None, ["not", "a", "dict"]])
+def test_invalid_json_is_provider_unavailable(http, provider_class, body):
+    http(FakeResponse(body=body))
+    with pytest.raises(ProviderUnavailable):
+        provider_class().lookup("8.8.8.8")
+
+
+def test_invalid_json_fails_over(http):
+    http(FakeResponse(body=None))
+    provider = failover(IpApiProvider(retries=0), FakeProvider("b"))
+    assert provider.lookup("8.8.8.8")["source"] == "b"
+    assert provider.stats()["ip-api"]["failures"] == 1
@@ -0,0 +1,159 @@
+import ipaddress
+from types import SimpleNamespace
+
+import pytest
+
+from services import geo_providers
+from services.geo_providers import GeolocationLookupError, LocalRangeProvider, MMDBProvider, _parse_range
+
+
+def provider(tmp_path, text, **kwargs):
+    path = tmp_path / "ranges.csv"
+    path.write_text(text, encoding="utf-8")
+    return LocalRangeProvider(str(path), **kwargs)
+
+
+def block(provider, ip):
+    ip_obj = ipaddress.ip_address(ip)
+    first, last, result = provider.block(ip_obj)
+    return str(type(ip_obj)(first)), str(type(ip_obj)(last)), result
+
+
+def test_parse_range():
+    assert _parse_range("1.0.0.0", "1.0.0.255") == (4, 0x01000000, 0x010000FF)
+    assert _parse_range("16777216", "16777471") == (4, 0x01000000, 0x010000FF)
+    assert _parse_range("2001:db8::", "2001:db8::ffff") == (6, 0x20010DB8 << 96, (0x20010DB8 << 96) + 0xFFFF)
+    # Integers carry no family: small IPv6 values need the version.
+    assert _parse_range("1", "1", version=6) == (6, 1, 1)
+    assert _parse_range("1", "1") == (4, 1, 1)
+    assert _parse_range("0", str(1 << 64)) == (6, 0, 1 << 64)
+    assert _parse_range("::1", "255") == (6, 1, 255)
+    with pytest.raises(ValueError):
+        _parse_range("1.0.0.0", "::1")
+    with pytest.raises(ValueError):
+        _parse_range("10", "5")
+    with pytest.raises(ValueError):
+        _parse_range("0", str(1 << 32), version=4)
+
+
+def test_header_layout_with_v4_and_v6_ranges(tmp_path):
+    ranges = provider(tmp_path, "ip_from,ip_to,country_code,city,latitude,longitude\n"
+                                "1.0.0.0,1.0.0.255,AU,Sydney,-33.8,151.2\n"
+                                "8.8.8.0,8.8.8.255,US,Mountain View,37.4,-122.1\n"
+                                "2001:db8::,2001:db8::ffff,DE,Berlin,-,\n"
+                                "not an address,1.2.3.4,XX,Nowhere,,\n")
+
+    result = ranges.lookup("8.8.8.8")
+    assert (result["country"], result["city"], result["lat"], result["lon"]) == ("US", "Mountain View", 37.4, -122.1)
+    assert result["source"] == "csv"
+    assert result["isp"] == "Nicht verfügbar"
+    v6 = ranges.lookup("2001:db8::1")
+    assert (v6["city"], v6["lat"], v6["lon"]) == ("Berlin", None, None)
+    for ip in ("8.8.9.1", "0.255.255.255", "2001:db8::1:0", "::1"):
+        with pytest.raises(GeolocationLookupError):
+            ranges.lookup(ip)
+
+
+def test_integer_bounds_take_the_family_from_the_version_column(tmp_path):
+    ranges = provider(tmp_path, "start,end,version,country\n"
+                                "1,1,6,Loopback6\n"
+                                "1,1,IPv4,Zero\n"
+                                f"{0x20010DB8 << 96},{(0x20010DB8 << 96) + 0xFF},,Doc\n")
+
+    assert ranges.lookup("::1")["country"] == "Loopback6"
+    assert ranges.lookup("0.0.0.1")["country"] == "Zero"
+    assert ranges.lookup("2001:db8::ff")["country"] == "Doc"
+
+
+def test_integer_bounds_of_an_ipv6_file(tmp_path):
+    text = "0,1,,Low\n4294967296,4294967551,,High\n"
+
+    v6 = provider(tmp_path, text, version=6)
+    assert v6.lookup("::1")["country"] == "Low"
+    assert v6.lookup("::1:0:1")["country"] == "High"
+    with pytest.raises(GeolocationLookupError):
+        v6.lookup("0.0.0.1")
+    # Without a version, bounds that fit into 32 bits are IPv4.
+    guessed = provider(tmp_path, text)
+    assert guessed.lookup("0.0.0.1")["country"] == "Low"
+    assert guessed.lookup("::1:0:1")["country"] == "High"
+
+
+def test_dbip_layout_without_header(tmp_path):
+    ranges = provider(tmp_path, "1.0.0.0,1.0.0.255,OC,AU,Queensland,Brisbane,-27.4,153.0\n")
+
+    result = ranges.lookup("1.0.0.7")
+    assert (result["country"], result["regionName"], result["city"], result["lat"]) == ("AU", "Queensland",
+                                                                                          "Brisbane", -27.4)
+
+
+def test_block_returns_the_range_or_the_gap(tmp_path):
+    ranges = provider(tmp_path, "start,end,country\n"
+                                "10.0.0.0,10.0.0.255,A\n"
+                                "10.0.2.0,10.0.2.255,B\n"
+                                "2001:db8::,2001:db8::ff,C\n")
+
+    first, last, result = block(ranges, "10.0.2.9")
+    assert (first, last, result["country"], result["query"]) == ("10.0.2.0", "10.0.2.255", "B", "10.0.2.9")
+    first, last, result = block(ranges, "10.0.1.1")
+    assert (first, last, result["status"]) == ("10.0.1.0", "10.0.1.255", "fail")
+    assert block(ranges, "1.1.1.1")[:2] == ("0.0.0.0", "9.255.255.255")
+    assert block(ranges, "200.0.0.1")[:2] == ("10.0.3.0", "255.255.255.255")
+    assert block(ranges, "2001:db8::1")[2]["country"] == "C"
+    assert block(ranges, "::1")[:2] == ("::", "2001:db7:ffff:ffff:ffff:ffff:ffff:ffff")
+
+
+class FakeReader:
+    """
+    maxminddb reader stub: one /24 with a record, everything else unknown as a /8.
+    """
+    RECORD = {
+        "country": {"names": {"en": "Germany", "de": "Deutschland"}},
+        "city": {"names": {"en": "Berlin"}},
+        "subdivisions": [{"names": {"en": "Land Berlin"}}],
+        "location": {"latitude": 52.5, "longitude": 13.4, "time_zone": "Europe/Berlin"},
+        "postal": {"code": "10115"},
+        "autonomous_system_organization": "Example AS",
+    }
+
+    def get(self, ip):
+        return self.RECORD if ip.startswith("5.6.7.") else None
+
+    def get_with_prefix_len(self, ip):
+        return (self.RECORD, 24) if ip.startswith("5.6.7.") else (None, 8)
+
+
+@pytest.fixture
+def mmdb(monkeypatch):
+    opened = []
+    fake = SimpleNamespace(MODE_MMAP="mmap",
+                           open_database=lambda path, mode: opened.append((path, mode)) or FakeReader())
+    monkeypatch.setattr(geo_providers, "maxminddb", fake)
+    provider = MMDBProvider("GeoLite2-City.mmdb")
+    assert opened == [("GeoLite2-City.mmdb", "mmap")]
+    return provider
+
+
+def test_mmdb_lookup(mmdb):
+    result = mmdb.lookup("5.6.7.8")
+
+    assert (result["country"], result["regionName"], result["city"]) == ("Deutschland", "Land Berlin", "Berlin")
+    assert (result["lat"], result["lon"], result["zip"], result["org"]) == (52.5, 13.4, "10115", "Example AS")
+    assert result["isp"] == "Example AS"
+    with pytest.raises(GeolocationLookupError):
+        mmdb.lookup("1.2.3.4")
+
+
+def test_mmdb_block_uses_the_prefix_length(mmdb):
+    first, last, result = block(mmdb, "5.6.7.8")
+    assert (first, last, result["city"], result["query"]) == ("5.6.7.0", "5.6.7.255", "Berlin", "5.6.7.8")
+
+    first, last, result = block(mmdb, "9.1.2.3")
+    assert (first, last, result["status"]) == ("9.0.0.0", "9.255.255.255", "fail")
+
+
+def test_mmdb_requires_the_package(monkeypatch):
+    monkeypatch.setattr(geo_providers, "maxminddb", None)
+
+    with pytest.raises(ImportError):
+        MMDBProvider("GeoLite2-City.mmdb")
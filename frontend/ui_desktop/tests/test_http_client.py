@@ -0,0 +1,163 @@
+import email.utils
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from services.adaptive_limiter import AdaptiveLimiter
+from services.http_client import HttpClient
+
+URL = "http://api.example.com/lookup"
+
+
+class StubAdapter(BaseAdapter):
+    """
+    Transport adapter that answers from a script: every entry is a status
+    code, a (status, headers) tuple or an exception to raise.
+    """
+    def __init__(self, *script):
+        super().__init__()
+        self.script = list(script)
+        self.requests = []
+        self.timeouts = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        self.timeouts.append(kwargs.get("timeout"))
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step if isinstance(step, tuple) else (step, {})
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = b"{}"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def refused():
+    reason = NewConnectionError(None, "Failed to establish a new connection: [Errno 111] Connection refused")
+    return requests.ConnectionError(MaxRetryError(None, URL, reason))
+
+
+def make_client(*script, **kwargs):
+    kwargs.setdefault("adaptive", False)
+    client = HttpClient(http2=False, backoff_factor=0.5, max_retries=2, **kwargs)
+    adapter = StubAdapter(*script)
+    client._session.mount("http://", adapter)
+    return client, adapter
+
+
+def send(client, method="GET"):
+    waits = []
+    response = client.request(method, URL, wait=waits.append)
+    return response, waits
+
+
+def test_get_is_retried_on_retryable_status():
+    client, adapter = make_client(503, 502, 200)
+    response, waits = send(client)
+    assert response.status_code == 200
+    assert len(adapter.requests) == 3
+    assert len(waits) == 2 and all(0 <= delay <= 1.0 for delay in waits)
+    assert client.retries_sent == 2
+
+
+def test_last_response_is_returned_after_retries():
+    client, adapter = make_client(503, 503, 503)
+    response, _ = send(client)
+    assert response.status_code == 503
+    assert len(adapter.requests) == 3
+
+
+def test_other_status_codes_are_returned_at_once():
+    client, adapter = make_client(404)
+    assert send(client)[0].status_code == 404
+    assert len(adapter.requests) == 1
+
+
+def test_retry_after_seconds_is_honoured_and_capped():
+    client, _ = make_client((429, {"Retry-After": "7"}), (503, {"Retry-After": "3600"}), 200, max_retry_after=60)
+    _, waits = send(client)
+    assert waits == [7.0, 60.0]
+
+
+def test_retry_after_http_date():
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    client, _ = make_client((503, {"Retry-After": when}), 200)
+    _, waits = send(client)
+    assert 25 <= waits[0] <= 30
+
+
+def test_post_is_only_retried_when_not_processed():
+    client, adapter = make_client(500)
+    assert send(client, "POST")[0].status_code == 500
+    assert len(adapter.requests) == 1
+    client, adapter = make_client(429, 503, 200)
+    assert send(client, "POST")[0].status_code == 200
+    assert len(adapter.requests) == 3
+
+
+@pytest.mark.parametrize("error", [requests.ConnectTimeout("connect timed out"), refused()])
+def test_post_is_retried_after_connect_failures(error):
+    client, adapter = make_client(error, 200)
+    assert send(client, "POST")[0].status_code == 200
+    assert len(adapter.requests) == 2
+
+
+@pytest.mark.parametrize("error", [requests.ConnectionError("Connection reset by peer"),
+                                   requests.ReadTimeout("read timed out")])
+def test_post_is_not_replayed_after_it_may_have_been_sent(error):
+    client, adapter = make_client(error, 200)
+    with pytest.raises(type(error)):
+        send(client, "POST")
+    assert len(adapter.requests) == 1
+
+
+@pytest.mark.parametrize("error", [requests.ConnectionError("Connection reset by peer"),
+                                   requests.ReadTimeout("read timed out")])
+def test_get_is_retried_after_transport_errors(error):
+    client, adapter = make_client(error, 200)
+    assert send(client)[0].status_code == 200
+
+
+def test_transport_error_is_raised_after_retries():
+    client, adapter = make_client(*(refused() for _ in range(3)))
+    with pytest.raises(requests.ConnectionError):
+        send(client)
+    assert len(adapter.requests) == 3
+
+
+def test_per_call_retries():
+    client, adapter = make_client(503, 200)
+    assert client.request("GET", URL, retries=0, wait=lambda seconds: None).status_code == 503
+    assert len(adapter.requests) == 1
+
+
+def test_default_timeouts():
+    client, adapter = make_client(200, 200, connect_timeout=2, read_timeout=9)
+    send(client)
+    client.request("GET", URL, timeout=1)
+    assert adapter.timeouts == [(2, 9), 1]
+
+
+def test_pool_is_bounded_per_host():
+    client = HttpClient(http2=False, adaptive=False, pool_hosts=3, pool_size=5)
+    adapter = client._session.get_adapter("https://api.example.com")
+    assert (adapter._pool_connections, adapter._pool_maxsize, adapter._pool_block) == (3, 5, True)
+
+
+def test_requests_hold_an_adaptive_slot():
+    limiter = AdaptiveLimiter(initial=4, maximum=8)
+    client, _ = make_client(429, 200, limiter=limiter, adaptive=True)
+    send(client)
+    host = limiter.snapshot()[0]
+    assert (host["host"], host["in_flight"], host["throttled"]) == ("api.example.com", 0, 1)
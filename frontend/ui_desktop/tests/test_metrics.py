@@ -0,0 +1,56 @@
+import pytest
+
+from utils.metrics import Histogram, MetricsRegistry
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) is None
+    assert histogram.summary()["mean"] is None
+
+
+def test_exact_values_below_linear_range():
+    histogram = Histogram()
+    for micros in range(1, 11):
+        histogram.record(micros / 1_000_000)
+    assert histogram.percentile(0.5) == pytest.approx(5e-6)
+    assert histogram.percentile(0.9) == pytest.approx(9e-6)
+    assert histogram.percentile(1.0) == pytest.approx(10e-6)
+
+
+@pytest.mark.parametrize("fraction", [0.5, 0.9, 0.99])
+def test_percentiles_within_bucket_error(fraction):
+    histogram = Histogram()
+    values = [i / 1000 for i in range(1, 1001)]  # 1 ms ... 1 s
+    for value in values:
+        histogram.record(value)
+    expected = values[int(fraction * len(values)) - 1]
+    assert histogram.percentile(fraction) == pytest.approx(expected, rel=1 / 32)
+
+
+def test_percentiles_are_clamped_to_min_and_max():
+    histogram = Histogram()
+    histogram.record(0.123456)
+    assert histogram.percentile(0.0) == histogram.percentile(1.0) == 0.123456
+
+
+def test_summary():
+    histogram = Histogram()
+    for value in (0.1, 0.2, 0.3):
+        histogram.record(value)
+    summary = histogram.summary()
+    assert (summary["count"], summary["min"], summary["max"]) == (3, 0.1, 0.3)
+    assert summary["mean"] == pytest.approx(0.2)
+    assert summary["p50"] == pytest.approx(0.2, rel=1 / 32)
+
+
+def test_timer_counts_errors():
+    registry = MetricsRegistry()
+    with registry.timer("lookup", provider="test"):
+        pass
+    with pytest.raises(ValueError):
+        with registry.timer("lookup", provider="test"):
+            raise ValueError()
+    assert registry.percentile("lookup", 0.5, provider="test") is not None
+    snapshot = registry.snapshot()
+    assert "lookup_errors" in str(snapshot)
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from services import oui_index
+from services.oui_index import OUIIndex, mac_to_int
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "oui")
+
+
+@pytest.fixture
+def index():
+    return OUIIndex().load_directory(FIXTURES)
+
+
+def test_mac_to_int():
+    assert mac_to_int("00:11:22:33:44:55") == 0x001122334455
+    assert mac_to_int("00-11-22-33-44-55") == 0x001122334455
+    assert mac_to_int("0011.2233.4455") == 0x001122334455
+    assert mac_to_int("aabbccddeeff") == 0xAABBCCDDEEFF
+    for invalid in ("00:11:22:33:44", "00:11:22:33:44:55:66", ""):
+        with pytest.raises(ValueError):
+            mac_to_int(invalid)
+
+
+def test_load_ieee_csv_skips_empty_and_invalid_assignments():
+    index = OUIIndex()
+
+    assert index.load_ieee_csv(os.path.join(FIXTURES, "oui.csv")) == 5
+    assert index.load_ieee_csv(os.path.join(FIXTURES, "mam.csv")) == 2
+    assert len(index) == 7
+
+
+def test_load_directory_reads_all_registries(index):
+    assert len(index) == 5 + 2 + 2 + 1
+
+
+def test_ma_l_lookup(index):
+    assert index.lookup("F0:D5:BF:12:34:56") == "Intel Corporate"
+    assert index.lookup("bc-d0-74-00-00-01") == "Apple, Inc."
+    assert index.lookup("00:00:00:00:00:01") is None
+
+
+def test_longest_prefix_wins(index):
+    # F8:B5:68 is split into MA-M blocks, one of which holds an MA-S block.
+    assert index.lookup("F8:B5:68:10:00:01") == "Example Audio GmbH"
+    assert index.lookup("F8:B5:68:20:00:01") == "Sensorik Nord, GmbH & Co. KG"
+    assert index.lookup("F8:B5:68:12:30:01") == "Longest Prefix Oy"
+    assert index.lookup("70:B3:D5:00:10:01") == "Tiny Devices AB"
+    assert index.lookup("00:50:C2:AB:CF:FF") == "Legacy IAB Systems"
+
+
+def test_registration_authority_blocks_are_not_a_vendor(index):
+    # Unassigned parts of subdivided MA-L blocks.
+    assert index.lookup("F8:B5:68:F0:00:01") is None
+    assert index.lookup("70:B3:D5:FF:F0:01") is None
+    assert index.lookup("00:50:C2:00:00:01") is None
+
+
+def test_lookup_many(index):
+    assert index.lookup_many(["F0:D5:BF:00:00:01", "00:00:00:00:00:01"]) == {
+        "F0:D5:BF:00:00:01": "Intel Corporate",
+        "00:00:00:00:00:01": None,
+    }
+
+
+def test_add_rejects_unsupported_lengths():
+    index = OUIIndex()
+    index.add("ABCDEF", " Padded Name ")
+
+    with pytest.raises(ValueError):
+        index.add("ABCDE", "Five Digits")
+    assert index.lookup("AB:CD:EF:00:00:00") == "Padded Name"
+
+
+def test_missing_directory_gives_an_empty_index(tmp_path):
+    assert len(OUIIndex().load_directory(str(tmp_path / "missing"))) == 0
+
+
+def test_process_index_loads_the_data_directory_once(monkeypatch):
+    loaded = []
+    original = OUIIndex.load_directory
+    monkeypatch.setattr(OUIIndex, "load_directory",
+                        lambda self, directory=FIXTURES: loaded.append(directory) or original(self, FIXTURES))
+    monkeypatch.setattr(oui_index, "_index", None)
+
+    index = oui_index.get_oui_index()
+
+    assert oui_index.get_oui_index() is index
+    assert len(loaded) == 1
+    assert index.lookup("F0:D5:BF:12:34:56") == "Intel Corporate"
@@ -0,0 +1,136 @@
+import ipaddress
+
+import pytest
+
+from services import range_engine
+from services.range_engine import BlockIndex, scan_blocks
+
+
+def ip(text):
+    return int(ipaddress.ip_address(text))
+
+
+def located(query, country, city="City"):
+    return {"query": query, "status": "success", "country": country, "city": city}
+
+
+class FakeProvider:
+    name = "local"
+
+    def __init__(self, blocks):
+        self.blocks = [(ip(first), ip(last), result) for first, last, result in blocks]
+
+    def block(self, ip_obj):
+        for first, last, result in self.blocks:
+            if first <= int(ip_obj) <= last:
+                return first, last, result
+        return None
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """
+    Runs scans without network access: blocks come from the given fake
+    provider, RDAP knows nothing, lookups of representatives use `lookups`.
+    """
+    lookups = {}
+
+    def setup(blocks=(), rdap=None):
+        monkeypatch.setattr(range_engine, "get_geo_provider", lambda: FakeProvider(blocks))
+        monkeypatch.setattr(range_engine, "rdap_block", lambda ip_obj, wait: rdap(ip_obj) if rdap else None)
+        return lookups
+
+    def lookup_ip(query, wait=None):
+        return lookups.get(query) or located(query, "Nowhere")
+
+    monkeypatch.setattr(range_engine, "lookup_ip", lookup_ip)
+    return setup
+
+
+def scan(network, **kwargs):
+    return list(scan_blocks(ipaddress.ip_network(network), wait=lambda seconds: None, **kwargs))
+
+
+def test_adjacent_blocks_with_same_location_are_merged(engine):
+    engine([("8.8.0.0", "8.8.0.127", located("8.8.0.0", "US")),
+            ("8.8.0.128", "8.8.0.255", located("8.8.0.128", "US"))])
+    rows = scan("8.8.0.0/24")
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row["block"], row["addresses"], row["country"], row["blockSource"]) == ("8.8.0.0/24", 256, "US", "local")
+
+
+def test_blocks_with_different_locations_stay_apart(engine):
+    engine([("8.8.0.0", "8.8.0.127", located("8.8.0.0", "US")),
+            ("8.8.0.128", "8.8.0.255", located("8.8.0.128", "DE"))])
+    rows = scan("8.8.0.0/24")
+    assert [(row["block"], row["country"]) for row in rows] == [("8.8.0.0/25", "US"), ("8.8.0.128/25", "DE")]
+
+
+def test_blocks_are_clipped_to_the_network(engine):
+    engine([("8.8.0.0", "8.8.0.255", located("8.8.0.0", "US"))])
+    rows = scan("8.8.0.64/26")
+    assert [(row["first"], row["last"], row["addresses"]) for row in rows] == [("8.8.0.64", "8.8.0.127", 64)]
+
+
+def test_unaligned_merged_range_is_shown_as_range(engine):
+    engine([("8.8.0.0", "8.8.0.63", located("8.8.0.0", "US")),
+            ("8.8.0.64", "8.8.0.255", located("8.8.0.64", "DE"))])
+    rows = scan("8.8.0.32/27")
+    assert rows[0]["block"] == "8.8.0.32/27"
+    rows = scan("8.8.0.0/25")
+    assert [row["block"] for row in rows] == ["8.8.0.0/26", "8.8.0.64/26"]
+
+
+def test_fallback_prefix_blocks_look_up_a_representative(engine):
+    lookups = engine()
+    lookups["8.8.1.1"] = located("8.8.1.1", "DE")
+    rows = scan("8.8.0.0/23")
+    assert [(row["block"], row["representative"], row["blockSource"]) for row in rows] == [
+        ("8.8.0.0/24", "8.8.0.1", "prefix"), ("8.8.1.0/24", "8.8.1.1", "prefix")]
+
+
+def test_rdap_blocks_merge_netnames(engine):
+    def rdap(ip_obj):
+        first = int(ip_obj) & ~0x7F
+        return first, first + 127, f"NET-{first & 0xFF}"
+
+    engine(rdap=rdap)
+    rows = scan("8.8.0.0/24")
+    assert len(rows) == 1
+    assert (rows[0]["blockSource"], rows[0]["netname"]) == ("rdap", "NET-0,NET-128")
+
+
+def test_block_limit_reports_the_rest(engine):
+    engine([("8.8.0.0", "8.8.0.255", located("8.8.0.0", "US")),
+            ("8.8.1.0", "8.8.1.255", located("8.8.1.0", "DE"))])
+    rows = scan("8.8.0.0/22", max_blocks=2)
+    last = rows[-1]
+    assert (last["first"], last["last"], last["blockSource"], last["status"]) == (
+        "8.8.2.0", "8.8.3.255", "limit", "fail")
+    assert sum(row["addresses"] for row in rows) == 1024
+
+
+def test_private_network_is_one_simulated_block(engine):
+    engine()
+    rows = scan("10.0.0.0/8")
+    assert len(rows) == 1
+    assert (rows[0]["addresses"], rows[0]["blockSource"]) == (2 ** 24, "private")
+
+
+def test_ipv6_prefix_is_scanned_by_block(engine):
+    engine()
+    rows = scan("2001:4860::/47")
+    assert [(row["block"], row["addresses"]) for row in rows] == [("2001:4860::/47", 2 ** 81)]
+
+
+def test_block_index():
+    index = BlockIndex()
+    index.add(4, ip("8.8.0.0"), ip("8.8.0.255"), "GOOGLE")
+    index.add(4, ip("8.8.0.128"), ip("8.8.1.255"), "NESTED")  # Overlaps, ignored
+    index.add(4, ip("9.9.9.0"), ip("9.9.9.255"), "QUAD9")
+    assert len(index) == 2
+    assert index.find(ipaddress.ip_address("8.8.0.200"))[2] == "GOOGLE"
+    assert index.find(ipaddress.ip_address("8.8.1.1")) is None
+    assert index.find(ipaddress.ip_address("9.9.9.9"))[2] == "QUAD9"
+    assert index.find(ipaddress.ip_address("2001:db8::1")) is None
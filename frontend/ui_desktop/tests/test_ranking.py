@@ -0,0 +1,80 @@
+import pytest
+
+from services.ranking import RankingIndex, ngrams, normalize, normalize_many, rank_results
+
+
+def result(url, description="Ergebnis"):
+    return {"url": url, "source": "Web-Suche", "description": description}
+
+
+def test_normalize_splits_url_punctuation():
+    assert normalize("https://Example.com/profil/Max_Muster") == "https example com profil max muster"
+
+
+def test_ngrams_pad_words():
+    assert ngrams("ab") == {" ab": 1, "ab ": 1}
+    assert ngrams("a") == {" a ": 1}
+
+
+def test_best_match_first():
+    results = [
+        result("https://example.com/news"),
+        result("https://example.com/profil/max_mustermann"),
+        result("https://example.com/profil/erika_musterfrau"),
+    ]
+    ranked = rank_results("Max Mustermann", results)
+    assert ranked[0][0] is results[1]
+    assert ranked[0][1] == pytest.approx(1.0)
+    assert all(0.0 <= score <= 1.0 for _, score in ranked)
+
+
+def test_ranks_all_results_unless_k_is_given():
+    results = [result(f"https://example.com/{i}") for i in range(700)]
+    assert len(rank_results("example", results)) == 700
+    assert len(rank_results("example", results, k=3)) == 3
+
+
+def test_equal_scores_keep_insertion_order():
+    results = [result(f"https://example.com/{name}") for name in ("a", "b", "c")]
+    assert [r for r, _ in rank_results("nothing in common", results)] == results
+
+
+def test_incremental_index():
+    index = RankingIndex(use_rapidfuzz=False)
+    assert index.rank("query") == []
+    index.add([result("https://example.com/other")])
+    index.add([result("https://example.com/omniscient")])
+    assert len(index) == 2
+    assert index.rank("omniscient", k=1)[0][0]["url"].endswith("omniscient")
+    index.clear()
+    assert len(index) == 0
+
+
+def test_normalize_many_matches_normalize():
+    texts = ["https://Example.com/profil/Max_Muster", "Müller-Lüdenscheidt, São Paulo", "line\nbreak", ""]
+    assert [text.split() for text in normalize_many(texts)] == [normalize(text).split() for text in texts]
+
+
+def test_batches_rank_like_one_shot():
+    results = [result(f"https://example.com/{name}", f"Profil von {name.replace('_', ' ')}")
+               for name in ("max_mustermann", "anna_schmidt", "max_schmidt", "maximilian", "mustermann")]
+    index = RankingIndex(use_rapidfuzz=False)
+    index.add(results[:2])
+    index.add(results[2:])
+    assert index.rank("Max Mustermann") == rank_results("Max Mustermann", results)
+
+
+def test_repeated_ngrams_count_per_occurrence():
+    index = RankingIndex(use_rapidfuzz=False)
+    index.add([result("https://example.com/aaa"), result("https://example.com/aaaaa")])
+    (best, best_score), (_, other_score) = index.rank("aaaaa")
+    assert best["url"].endswith("aaaaa")
+    assert best_score == pytest.approx(1.0)
+    assert other_score < best_score
+
+
+def test_top_k_fills_up_with_unmatched_results():
+    results = [result("https://example.com/zzz"), result("https://example.com/max"), result("https://example.com/yyy")]
+    ranked = rank_results("max", results, k=2)
+    assert [r["url"] for r, _ in ranked] == ["https://example.com/max", "https://example.com/zzz"]
+    assert ranked[1][1] == 0.0
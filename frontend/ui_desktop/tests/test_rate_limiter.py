@@ -0,0 +1,50 @@
+import pytest
+
+from services.rate_limiter import TokenBucket
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock("services.rate_limiter.time.monotonic")
+
+
+def test_burst_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.try_acquire(2)
+    clock.sleep(100)
+    assert bucket.try_acquire(2)
+    assert not bucket.try_acquire()
+
+
+def test_acquire_waits_for_missing_tokens(clock):
+    bucket = TokenBucket(rate=2, capacity=1)
+    bucket.acquire()
+    waits = []
+
+    def wait(seconds):
+        waits.append(seconds)
+        clock.sleep(seconds)
+
+    bucket.acquire(wait=wait)
+    assert waits == [pytest.approx(0.5)]
+
+
+def test_drain_postpones_refill(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.drain(5)
+    clock.sleep(4)
+    assert not bucket.try_acquire()
+    clock.sleep(1.5)
+    assert bucket.try_acquire(5)
+
+
+def test_per_minute():
+    bucket = TokenBucket.per_minute(45)
+    assert bucket.rate == pytest.approx(0.75)
+    assert bucket.capacity == 45
+    assert TokenBucket.per_minute(60, burst=5).capacity == 5
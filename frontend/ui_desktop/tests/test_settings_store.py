@@ -0,0 +1,236 @@
+import json
+import os
+
+import pytest
+
+from services import settings_store
+from services.settings_store import DEFAULT_SETTINGS, SettingsStore
+
+
+class FakeTimer:
+    """
+    Stands in for threading.Timer; fire() runs the callback like the timer thread would.
+    """
+    created = []
+
+    def __init__(self, interval, function):
+        self.interval = interval
+        self.function = function
+        self.cancelled = False
+        self.daemon = False
+        FakeTimer.created.append(self)
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        if not self.cancelled:
+            self.function()
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    FakeTimer.created = []
+    monkeypatch.setattr(settings_store.threading, "Timer", FakeTimer)
+    return FakeTimer.created
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "settings.json")
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    calls = []
+    original = SettingsStore._write
+
+    def write(self, data):
+        calls.append(data)
+        original(self, data)
+    monkeypatch.setattr(SettingsStore, "_write", write)
+    return calls
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_defaults_without_a_settings_file(path):
+    store = SettingsStore(path=path)
+
+    assert store.all() == DEFAULT_SETTINGS
+    assert store.get("appearance_mode") == "System"
+    assert store.get("unknown", "fallback") == "fallback"
+    assert not os.path.exists(path)
+
+
+def test_saved_settings_are_merged_over_the_defaults(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"font_size": 18}, f)
+
+    store = SettingsStore(path=path)
+
+    assert store.get("font_size") == 18
+    assert store.get("appearance_mode") == "System"
+
+
+def test_corrupt_settings_file_falls_back_to_the_defaults(path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+
+    assert SettingsStore(path=path).all() == DEFAULT_SETTINGS
+
+
+def test_a_burst_of_changes_is_written_once(path, timers, writes):
+    store = SettingsStore(path=path, save_delay=0.5)
+
+    for size in (15, 16, 17, 18):
+        store.set("font_size", size)
+
+    # Every change restarts the timer; only the last one is still pending.
+    assert len(timers) == 4
+    assert [timer.cancelled for timer in timers] == [True, True, True, False]
+    assert timers[-1].interval == 0.5
+    assert timers[-1].daemon
+    assert writes == []
+
+    for timer in timers:
+        timer.fire()
+
+    assert len(writes) == 1
+    assert read(path)["font_size"] == 18
+
+
+def test_unchanged_values_do_not_schedule_a_save(path, timers, writes):
+    store = SettingsStore(path=path)
+
+    store.set("font_size", DEFAULT_SETTINGS["font_size"])
+    store.flush()
+
+    assert timers == []
+    assert writes == []
+
+
+def test_flush_writes_pending_changes_immediately(path, timers, writes):
+    store = SettingsStore(path=path)
+    store.update({"font_size": 20, "sound_enabled": False})
+
+    store.flush()
+    store.flush()
+    timers[-1].fire()
+
+    assert timers[-1].cancelled
+    assert len(writes) == 1
+    saved = read(path)
+    assert saved["font_size"] == 20
+    assert saved["sound_enabled"] is False
+    assert SettingsStore(path=path).all() == saved
+
+
+def test_write_replaces_the_file_through_a_synced_temp_file(path, timers, monkeypatch):
+    synced = []
+    replaced = []
+    original_fsync, original_replace = os.fsync, os.replace
+    monkeypatch.setattr(settings_store.os, "fsync", lambda fd: (synced.append(fd), original_fsync(fd)))
+    monkeypatch.setattr(settings_store.os, "replace",
+                        lambda src, dst: (replaced.append((src, dst)), original_replace(src, dst)))
+    store = SettingsStore(path=path)
+
+    store.set("font_size", 16)
+    store.flush()
+
+    assert len(synced) == 1
+    [(tmp_path, target)] = replaced
+    assert target == path
+    assert os.path.dirname(tmp_path) == os.path.dirname(path)
+    assert os.listdir(os.path.dirname(path)) == ["settings.json"]
+
+
+def test_failed_write_keeps_the_old_file(path, timers, monkeypatch):
+    store = SettingsStore(path=path)
+    store.set("font_size", 16)
+    store.flush()
+
+    def crash(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(settings_store.os, "replace", crash)
+    store.set("font_size", 30)
+    store.flush()
+
+    # The old file is intact and the temp file was removed.
+    assert read(path)["font_size"] == 16
+    assert os.listdir(os.path.dirname(path)) == ["settings.json"]
+
+
+def test_subscribers_are_notified_about_changed_keys(path, timers):
+    store = SettingsStore(path=path)
+    everything = []
+    fonts = []
+    store.subscribe(lambda key, value: everything.append((key, value)))
+    unsubscribe = store.subscribe(lambda key, value: fonts.append((key, value)), keys=("font_size",))
+
+    store.update({"font_size": 16, "sound_enabled": False})
+    store.set("sound_enabled", False)
+    unsubscribe()
+    unsubscribe()
+    store.set("font_size", 17)
+
+    assert everything == [("font_size", 16), ("sound_enabled", False), ("font_size", 17)]
+    assert fonts == [("font_size", 16)]
+
+
+def test_failing_subscriber_does_not_stop_the_others(path, timers):
+    store = SettingsStore(path=path)
+    seen = []
+
+    def broken(key, value):
+        raise RuntimeError("broken")
+    store.subscribe(broken)
+    store.subscribe(lambda key, value: seen.append(key))
+
+    store.set("font_size", 16)
+
+    assert seen == ["font_size"]
+    assert store.get("font_size") == 16
+
+
+def test_reset_restores_the_defaults_and_notifies(path, timers, writes):
+    store = SettingsStore(path=path)
+    store.update({"font_size": 20, "appearance_mode": "Dark", "legacy_key": 1})
+    changes = []
+    store.subscribe(lambda key, value: changes.append((key, value)))
+
+    store.reset()
+    store.flush()
+
+    assert store.all() == DEFAULT_SETTINGS
+    assert sorted(changes) == [("appearance_mode", "System"), ("font_size", 14)]
+    assert read(path) == DEFAULT_SETTINGS
+
+
+def test_all_returns_a_copy(path, timers):
+    store = SettingsStore(path=path)
+
+    store.all()["adaptive_limits"]["ip-api.com"] = {"max": 1}
+
+    assert store.get("adaptive_limits") == {}
+
+
+def test_process_store_flushes_at_exit(tmp_path, timers, monkeypatch):
+    registered = []
+    monkeypatch.setattr(settings_store.atexit, "register", registered.append)
+    monkeypatch.setattr(settings_store, "_store", None)
+    monkeypatch.chdir(tmp_path)
+
+    store = settings_store.get_settings_store()
+    store.set("font_size", 16)
+
+    assert settings_store.get_settings_store() is store
+    assert registered == [store.flush]
+    registered[0]()
+    assert read(tmp_path / "settings.json")["font_size"] == 16
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from services import geolocation_engine
+from services.single_flight import SingleFlight
+from services.task_executor import TaskCancelled
+
+
+def start(target):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = target()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    leader, leader_outcome = start(lambda: flight.do("key", lookup))
+    while not flight.in_flight():
+        pass
+    joined = threading.Event()
+    follower, follower_outcome = start(lambda: flight.do("key", lookup, wait=lambda seconds: joined.set()))
+    joined.wait(5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert calls == [1]
+    assert leader_outcome == follower_outcome == {"result": "result"}
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError("bad")))
+    assert flight.in_flight() == 0
+
+
+def test_follower_reruns_call_of_cancelled_leader():
+    flight = SingleFlight()
+    leader_started = threading.Event()
+    cancel_leader = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            leader_started.set()
+            cancel_leader.wait(5)
+            raise TaskCancelled()
+        return "result"
+
+    leader, leader_outcome = start(lambda: flight.do("key", lookup))
+    leader_started.wait(5)
+    joined = threading.Event()
+    follower, follower_outcome = start(lambda: flight.do("key", lookup, wait=lambda seconds: joined.set()))
+    joined.wait(5)
+    cancel_leader.set()
+    leader.join(5)
+    follower.join(5)
+    assert isinstance(leader_outcome["error"], TaskCancelled)
+    assert follower_outcome == {"result": "result"}
+    assert len(calls) == 2
+
+
+def test_cancelled_follower_stops_waiting():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader, _ = start(lambda: flight.do("key", release.wait, 5))
+    while not flight.in_flight():
+        pass
+
+    def cancelled_wait(seconds):
+        raise TaskCancelled()
+
+    with pytest.raises(TaskCancelled):
+        flight.do("key", lambda: "unused", wait=cancelled_wait)
+    release.set()
+    leader.join(5)
+
+
+def test_lookup_ip_passes_wait_to_the_first_caller(monkeypatch):
+    class Provider:
+        name = "fake"
+
+        def lookup(self, ip, wait=None):
+            self.wait = wait
+            return {"query": ip, "status": "success"}
+
+    provider = Provider()
+    monkeypatch.setattr(geolocation_engine, "get_geo_provider", lambda: provider)
+    monkeypatch.setattr(geolocation_engine, "get_single_flight", SingleFlight)
+
+    def wait(seconds):
+        pass
+
+    assert geolocation_engine.lookup_ip("8.8.8.8", wait=wait)["query"] == "8.8.8.8"
+    assert provider.wait is wait
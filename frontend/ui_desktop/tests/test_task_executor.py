@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+
+from services import task_executor
+from services.task_executor import TaskCancelled, TaskExecutor
+
+
+class FakeRoot:
+    """
+    Stands in for the Tk root: after() only queues the callback, pump()
+    runs the queued callbacks like the main loop would.
+    """
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def nametowidget(self, name):
+        return self
+
+    def winfo_exists(self):
+        return True
+
+    def pump(self, until, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "condition not reached"
+            if self.scheduled:
+                self.scheduled.pop(0)()
+            else:
+                time.sleep(0.001)
+
+
+class FakeWidget:
+    def __init__(self, root):
+        self.root = root
+        self.alive = True
+
+    def nametowidget(self, name):
+        return self.root
+
+    def winfo_exists(self):
+        return self.alive
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def executor():
+    executor = TaskExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def submit(executor, fn, *args, **kwargs):
+    outcome = {}
+    kwargs.setdefault("on_success", lambda result: outcome.setdefault("result", result))
+    kwargs.setdefault("on_error", lambda error: outcome.setdefault("error", error))
+    handle = executor.submit(fn, *args, **kwargs)
+    return handle, outcome
+
+
+def test_callbacks_run_on_the_polling_loop(executor, root):
+    worker = []
+    handle, outcome = submit(executor, lambda ctx, x: worker.append(threading.current_thread()) or x * 2, 21,
+                             owner=FakeWidget(root))
+    root.pump(lambda: outcome)
+    assert outcome == {"result": 42}
+    assert worker[0] is not threading.current_thread()
+    assert handle.done
+
+
+def test_errors_go_to_on_error(executor, root):
+    def fail(ctx):
+        raise ValueError("bad")
+
+    _, outcome = submit(executor, fail, owner=FakeWidget(root))
+    root.pump(lambda: outcome)
+    assert isinstance(outcome["error"], ValueError)
+
+
+def test_progress_is_delivered_in_order(executor, root):
+    progress = []
+
+    def work(ctx):
+        for i in range(5):
+            ctx.report_progress(i, "step")
+        return "done"
+
+    _, outcome = submit(executor, work, owner=FakeWidget(root), on_progress=lambda *args: progress.append(args))
+    root.pump(lambda: outcome)
+    assert progress == [(i, "step") for i in range(5)]
+
+
+def test_cancel_suppresses_callbacks(executor, root):
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def work(ctx):
+        started.set()
+        try:
+            ctx.wait(5)
+        finally:
+            stopped.set()
+
+    handle, outcome = submit(executor, work, owner=FakeWidget(root))
+    started.wait(5)
+    handle.cancel()
+    assert stopped.wait(5)
+    root.pump(lambda: not executor._active)
+    assert outcome == {}
+
+
+def test_timeout_cancels_and_reports(executor, root):
+    stopped = threading.Event()
+
+    def work(ctx):
+        try:
+            ctx.wait(5)
+        except TaskCancelled:
+            stopped.set()
+            raise
+
+    handle, outcome = submit(executor, work, owner=FakeWidget(root), timeout=0.05)
+    root.pump(lambda: outcome)
+    assert isinstance(outcome["error"], TimeoutError)
+    assert handle.timed_out
+    assert stopped.wait(5)
+
+
+def test_cancel_owner_only_cancels_its_tasks(executor, root):
+    release = threading.Event()
+    owner, other = FakeWidget(root), FakeWidget(root)
+    first, first_outcome = submit(executor, lambda ctx: ctx.wait(5), owner=owner)
+    second, second_outcome = submit(executor, lambda ctx: release.wait(5) and "kept", owner=other)
+    executor.cancel_owner(owner)
+    release.set()
+    root.pump(lambda: second_outcome)
+    assert first.cancelled and not second.cancelled
+    assert first_outcome == {}
+    assert second_outcome == {"result": "kept"}
+
+
+def test_destroyed_owner_gets_no_callbacks(executor, root):
+    release = threading.Event()
+    owner = FakeWidget(root)
+    handle, outcome = submit(executor, lambda ctx: release.wait(5), owner=owner)
+    owner.alive = False
+    release.set()
+    root.pump(lambda: handle.done)
+    assert outcome == {}
+
+
+def test_ownerless_submit_uses_default_root(executor, root, monkeypatch):
+    monkeypatch.setattr(task_executor.tk, "_default_root", root, raising=False)
+    _, outcome = submit(executor, lambda ctx: "ok")
+    root.pump(lambda: outcome)
+    assert outcome == {"result": "ok"}
+
+
+def test_ownerless_submit_without_root_fails(executor, monkeypatch):
+    monkeypatch.setattr(task_executor.tk, "_default_root", None, raising=False)
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda ctx: None)
@@ -2,7 +2,6 @@
 import customtkinter as ctk
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 class AliasCorrelationFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -32,7 +31,6 @@ class AliasCorrelationFrame(ctk.CTkFrame):
         msg = f"Correlating alias: {alias}"
         logging.info(msg)
         self.status_label.configure(text="Correlation initiated... Check console")
-        print(msg)
     
     def reset_fields(self):
         self.alias_entry.delete(0, "end")
@@ -2,7 +2,6 @@
 import customtkinter as ctk
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 class CriminalRecordFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -32,7 +31,6 @@ class CriminalRecordFrame(ctk.CTkFrame):
         msg = f"Checking criminal record for: {name}"
         logging.info(msg)
         self.status_label.configure(text="Check initiated... Check console")
-        print(msg)
     
     def reset_fields(self):
         self.name_entry.delete(0, "end")
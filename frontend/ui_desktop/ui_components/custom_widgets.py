@@ -1,10 +1,276 @@
+import logging
+import math
+from collections import deque
+
 import customtkinter as ctk
 
+from config.app_config import CONSOLE_FLUSH_INTERVAL_MS, CONSOLE_MAX_LINES
+
 class CustomButton(ctk.CTkButton):
     """
     A custom button widget extending CTkButton.
-    
+
     This can be further customized as needed.
     """
     def __init__(self, master, text, command, **kwargs):
-        super().__init__(master, text=text, command=command, **kwargs)
\ No newline at end of file
+        super().__init__(master, text=text, command=command, **kwargs)
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only renders the visible rows.
+
+    A small pool of row buttons (as many as fit into the visible area) is
+    created once and recycled while scrolling: only their text and position
+    change, so showing thousands of items costs no more widgets than showing
+    a screenful.
+
+    Args:
+        format_row: Function item -> row text.
+        on_select: Called with the item when a row is clicked.
+        on_end: Called when the user scrolls to the end of the list, e.g. to
+                load the next page of items.
+        row_height: Height of one row in pixels (including spacing).
+        empty_text: Shown by set_items([]) when there is nothing to display.
+    """
+    ROW_SPACING = 6
+    SCROLL_UNITS = 3  # Rows scrolled per mouse wheel step
+
+    def __init__(self, master, format_row=str, on_select=None, on_end=None, row_height=40,
+                 empty_text="Keine Ergebnisse gefunden.", **kwargs):
+        super().__init__(master, **kwargs)
+        self.format_row = format_row
+        self.on_select = on_select
+        self.on_end = on_end
+        self.row_height = row_height
+        self.empty_text = empty_text
+        self._items = []
+        self._offset = 0  # Scroll position in pixels
+        self._rows = []  # Recycled row buttons
+        self._row_items = []  # Item index shown by each row (or None)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.grid(row=0, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns", pady=5)
+        self._empty_label = ctk.CTkLabel(self._viewport, text=empty_text)
+
+        self._viewport.bind("<Configure>", lambda event: self._render())
+        self._bind_wheel(self._viewport)
+
+    # ------------------------- Public API -------------------------
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def items(self):
+        return list(self._items)
+
+    def set_items(self, items):
+        """
+        Replaces all items. The scroll position is kept where possible so
+        that re-ranked results do not jump back to the top.
+        """
+        self._items = list(items)
+        self._empty_label.place_forget()
+        if not self._items and self.empty_text:
+            self._empty_label.place(relx=0.5, y=10, anchor="n")
+        self._render()
+
+    def append(self, items):
+        """
+        Appends items to the end of the list.
+        """
+        self._items.extend(items)
+        self._empty_label.place_forget()
+        self._render()
+
+    def sort(self, key=None, reverse=False):
+        self._items.sort(key=key, reverse=reverse)
+        self._render()
+
+    def clear(self):
+        """
+        Removes all items without showing the empty text.
+        """
+        self._items = []
+        self._offset = 0
+        self._empty_label.place_forget()
+        self._render()
+
+    def scroll_to(self, index):
+        self._offset = index * self.row_height
+        self._render()
+
+    # ------------------------- Rendering -------------------------
+    def _viewport_height(self):
+        # winfo_height() is in physical pixels, place() coordinates are scaled.
+        return self._viewport.winfo_height() / self._get_widget_scaling()
+
+    def _max_offset(self):
+        return max(0, len(self._items) * self.row_height - self._viewport_height())
+
+    def _ensure_rows(self, count):
+        while len(self._rows) < count:
+            slot = len(self._rows)
+            row = ctk.CTkButton(self._viewport, text="", anchor="w", corner_radius=8,
+                                height=self.row_height - self.ROW_SPACING,
+                                command=lambda s=slot: self._select(s))
+            self._bind_wheel(row)
+            self._rows.append(row)
+            self._row_items.append(None)
+
+    def _render(self):
+        height = self._viewport_height()
+        self._offset = min(max(self._offset, 0), self._max_offset())
+        first = int(self._offset // self.row_height)
+        shift = self._offset - first * self.row_height
+        visible = math.ceil((height + shift) / self.row_height)
+        self._ensure_rows(visible)
+
+        for slot, row in enumerate(self._rows):
+            index = first + slot
+            if slot >= visible or index >= len(self._items):
+                if self._row_items[slot] is not None:
+                    row.place_forget()
+                    self._row_items[slot] = None
+                continue
+            text = self.format_row(self._items[index])
+            if row.cget("text") != text:
+                row.configure(text=text)
+            row.place(x=0, y=slot * self.row_height - shift, relwidth=1)
+            self._row_items[slot] = index
+
+        total = len(self._items) * self.row_height
+        if total <= height:
+            self._scrollbar.set(0.0, 1.0)
+        else:
+            self._scrollbar.set(self._offset / total, (self._offset + height) / total)
+
+    def _select(self, slot):
+        index = self._row_items[slot]
+        if index is not None and self.on_select is not None:
+            self.on_select(self._items[index])
+
+    # ------------------------- Scrolling -------------------------
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._offset = float(value) * len(self._items) * self.row_height
+        elif unit == "pages":
+            self._offset += int(value) * self._viewport_height()
+        else:
+            self._offset += int(value) * self.row_height
+        self._scrolled()
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        self._offset += steps * self.SCROLL_UNITS * self.row_height
+        self._scrolled()
+
+    def _scrolled(self):
+        self._render()
+        if self.on_end is not None and self._items and self._offset >= self._max_offset():
+            self.on_end()
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mouse_wheel)
+        widget.bind("<Button-4>", self._on_mouse_wheel)
+        widget.bind("<Button-5>", self._on_mouse_wheel)
+
+
+class LogConsole(ctk.CTkTextbox):
+    """
+    Read-only text console for high-rate log output.
+
+    write() only appends to a bounded ring buffer; the text widget is
+    updated at most once per flush interval with a single insert, and lines
+    beyond max_lines are trimmed from the top. Lines below the current
+    level are kept in the buffer but not shown, so changing the level
+    re-renders the buffered history.
+
+    Args:
+        max_lines: Lines kept in the buffer and shown in the widget.
+        flush_interval_ms: Minimum time between two widget updates.
+        level: Lowest logging level that is displayed.
+    """
+    def __init__(self, master, max_lines=CONSOLE_MAX_LINES, flush_interval_ms=CONSOLE_FLUSH_INTERVAL_MS,
+                 level=logging.DEBUG, **kwargs):
+        super().__init__(master, **kwargs)
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.level = level
+        self._lines = deque(maxlen=max_lines)  # (level, text) of all recent lines
+        self._pending = deque(maxlen=max_lines)  # Visible lines not yet inserted
+        self._shown = 0  # Lines currently in the widget
+        self._flush_id = None
+        self.configure(state="disabled")
+
+    def write(self, message, level=logging.INFO):
+        """
+        Queues one message; multi-line messages are split into lines.
+        Must be called on the Tk main thread.
+        """
+        for line in message.splitlines() or [""]:
+            self._lines.append((level, line))
+            if level >= self.level:
+                self._pending.append(line)
+        if self._pending and self._flush_id is None:
+            self._flush_id = self.after(self.flush_interval_ms, self.flush)
+
+    def flush(self):
+        """
+        Inserts all pending lines at once and trims the oldest ones.
+        """
+        if self._flush_id is not None:
+            self.after_cancel(self._flush_id)
+            self._flush_id = None
+        if not self._pending:
+            return
+        lines = list(self._pending)
+        self._pending.clear()
+        # Only follow the output if the user has not scrolled up.
+        follow = self.yview()[1] >= 0.999
+        self.configure(state="normal")
+        self.insert("end", "\n".join(lines) + "\n")
+        self._shown += len(lines)
+        if self._shown > self.max_lines:
+            excess = self._shown - self.max_lines
+            self.delete("1.0", f"{excess + 1}.0")
+            self._shown = self.max_lines
+        self.configure(state="disabled")
+        if follow:
+            self.see("end")
+
+    def set_level(self, level):
+        """
+        Changes the displayed level and re-renders the buffered lines.
+        """
+        self.level = level
+        self._clear_widget()
+        self._pending.clear()
+        self._pending.extend(text for line_level, text in self._lines if line_level >= level)
+        self.flush()
+
+    def clear(self):
+        self._lines.clear()
+        self._pending.clear()
+        self._clear_widget()
+
+    def _clear_widget(self):
+        self.configure(state="normal")
+        self.delete("1.0", "end")
+        self.configure(state="disabled")
+        self._shown = 0
+
+    def destroy(self):
+        if self._flush_id is not None:
+            self.after_cancel(self._flush_id)
+            self._flush_id = None
+        super().destroy()
@@ -2,7 +2,6 @@
 import customtkinter as ctk
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 class DarkWebMonitoringFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -23,5 +22,4 @@ class DarkWebMonitoringFrame(ctk.CTkFrame):
     def perform_monitoring(self):
         msg = "Dark web monitoring initiated."
         logging.info(msg)
-        self.status_label.configure(text="Monitoring initiated... Check console")
-        print(msg)
\ No newline at end of file
+        self.status_label.configure(text="Monitoring initiated... Check console")
\ No newline at end of file
@@ -4,8 +4,6 @@ import tkinter.messagebox as mb
 import logging
 import random
 
-# Configure logging to display messages on the console.
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class DataProcessingFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
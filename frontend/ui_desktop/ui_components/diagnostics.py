@@ -0,0 +1,239 @@
+# ui_components/diagnostics.py
+import logging
+import os
+import time
+
+import customtkinter as ctk
+
+from config.app_config import ADAPTIVE_LIMITS_ENABLED, DIAGNOSTICS_REFRESH_MS, METRICS_EXPORT_PATH
+from services.adaptive_limiter import get_adaptive_limiter
+from services.geo_cache import get_geo_cache
+from services.map_images import get_map_image_service
+from services.settings_store import get_settings_store
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def format_labels(labels):
+    return ",".join(f"{name}={value}" for name, value in sorted(labels.items()))
+
+
+class DiagnosticsFrame(ctk.CTkFrame):
+    """
+    Zeigt Latenzen (p50/p90/p99), Durchsatz, Cache-Trefferquoten, die
+    adaptiven Parallelitätslimits und die langsamsten Aufrufe der laufenden
+    Sitzung an.
+    """
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.metrics = get_metrics()
+        self.refresh_id = None
+        self.previous_counts = {}   # (Name, Labels) -> Anzahl bei der letzten Aktualisierung
+        self.previous_time = None
+        self.build_ui()
+
+    def build_ui(self):
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        title = ctk.CTkLabel(self, text="Diagnose & Leistung", font=("Arial", 16, "bold"))
+        title.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+
+        # Buttons: Export und Zurücksetzen
+        btn_frame = ctk.CTkFrame(self)
+        btn_frame.grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        prometheus_button = ctk.CTkButton(btn_frame, text="Exportieren (Prometheus)",
+                                          command=lambda: self.export_metrics("prometheus"))
+        prometheus_button.grid(row=0, column=0, padx=5)
+        json_button = ctk.CTkButton(btn_frame, text="Exportieren (JSON)",
+                                    command=lambda: self.export_metrics("json"))
+        json_button.grid(row=0, column=1, padx=5)
+        reset_button = ctk.CTkButton(btn_frame, text="Zurücksetzen", command=self.reset_metrics)
+        reset_button.grid(row=0, column=2, padx=5)
+        self.export_label = ctk.CTkLabel(btn_frame, text="", fg_color="transparent")
+        self.export_label.grid(row=0, column=3, padx=5)
+
+        # Operationen: Anzahl, Rate und Latenzen
+        self.operations_box = ctk.CTkTextbox(self, height=260, font=("Courier", 12), wrap="none")
+        self.operations_box.grid(row=2, column=0, padx=10, pady=5, sticky="nsew")
+
+        # Cache-Trefferquoten
+        self.cache_box = ctk.CTkTextbox(self, height=70, font=("Courier", 12), wrap="none")
+        self.cache_box.grid(row=3, column=0, padx=10, pady=5, sticky="ew")
+
+        # Adaptive Parallelitätslimits je Host (AIMD)
+        self.limits_box = ctk.CTkTextbox(self, height=110, font=("Courier", 12), wrap="none")
+        self.limits_box.grid(row=4, column=0, padx=10, pady=5, sticky="ew")
+
+        # Limits eines Hosts festlegen (wird in settings.json gespeichert)
+        limit_frame = ctk.CTkFrame(self)
+        limit_frame.grid(row=5, column=0, padx=10, pady=5, sticky="w")
+        ctk.CTkLabel(limit_frame, text="Host:").grid(row=0, column=0, padx=5)
+        self.limit_host_entry = ctk.CTkEntry(limit_frame, width=180, placeholder_text="ip-api.com")
+        self.limit_host_entry.grid(row=0, column=1, padx=5)
+        ctk.CTkLabel(limit_frame, text="Min:").grid(row=0, column=2, padx=5)
+        self.limit_min_entry = ctk.CTkEntry(limit_frame, width=50)
+        self.limit_min_entry.grid(row=0, column=3, padx=5)
+        ctk.CTkLabel(limit_frame, text="Max:").grid(row=0, column=4, padx=5)
+        self.limit_max_entry = ctk.CTkEntry(limit_frame, width=50)
+        self.limit_max_entry.grid(row=0, column=5, padx=5)
+        apply_button = ctk.CTkButton(limit_frame, text="Übernehmen", width=100, command=self.apply_host_limits)
+        apply_button.grid(row=0, column=6, padx=5)
+        clear_button = ctk.CTkButton(limit_frame, text="Automatisch", width=100, command=self.clear_host_limits)
+        clear_button.grid(row=0, column=7, padx=5)
+        if not ADAPTIVE_LIMITS_ENABLED:
+            for widget in (apply_button, clear_button):
+                widget.configure(state="disabled")
+
+        # Langsamste Aufrufe
+        self.slowest_box = ctk.CTkTextbox(self, height=160, font=("Courier", 12), wrap="none")
+        self.slowest_box.grid(row=6, column=0, padx=10, pady=5, sticky="ew")
+
+        # Statusanzeige
+        self.status_label = ctk.CTkLabel(self, text="", fg_color="transparent")
+        self.status_label.grid(row=7, column=0, padx=10, pady=(0, 10), sticky="w")
+
+    # ------------------------- Lebenszyklus (FrameManager) -------------------------
+    def on_show(self):
+        # Nur aktualisieren, solange die Seite sichtbar ist.
+        self.refresh()
+
+    def on_hide(self):
+        self.stop_refresh()
+
+    def destroy(self):
+        self.stop_refresh()
+        super().destroy()
+
+    def stop_refresh(self):
+        if self.refresh_id is not None:
+            self.after_cancel(self.refresh_id)
+            self.refresh_id = None
+
+    # ------------------------- Anzeige -------------------------
+    def refresh(self):
+        self.stop_refresh()
+        snapshot = self.metrics.snapshot()
+        self.show_operations(snapshot)
+        self.show_caches()
+        self.show_limits()
+        self.show_slowest(snapshot)
+        uptime = snapshot["timestamp"] - snapshot["started"]
+        self.status_label.configure(text=f"Erfasst seit {uptime:.0f} s, aktualisiert {time.strftime('%H:%M:%S')}")
+        self.refresh_id = self.after(DIAGNOSTICS_REFRESH_MS, self.refresh)
+
+    def show_operations(self, snapshot):
+        now = snapshot["timestamp"]
+        elapsed = now - self.previous_time if self.previous_time is not None else None
+        counts = {}
+        lines = [f"{'Operation':<22} {'Labels':<34} {'Anzahl':>8} {'Rate/s':>8} "
+                 f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for histogram in snapshot["histograms"]:
+            labels = format_labels(histogram["labels"])
+            key = (histogram["name"], labels)
+            counts[key] = histogram["count"]
+            previous = self.previous_counts.get(key, 0)
+            rate = (histogram["count"] - previous) / elapsed if elapsed else 0.0
+            lines.append(f"{histogram['name']:<22} {labels:<34} {histogram['count']:>8} {rate:>8.1f} "
+                         f"{format_ms(histogram['p50']):>9} {format_ms(histogram['p90']):>9} "
+                         f"{format_ms(histogram['p99']):>9} {format_ms(histogram['max']):>9}")
+        if snapshot["counters"]:
+            lines.append("")
+            lines.append(f"{'Zähler':<22} {'Labels':<34} {'Wert':>8}")
+            for counter in snapshot["counters"]:
+                lines.append(f"{counter['name']:<22} {format_labels(counter['labels']):<34} {counter['value']:>8}")
+        self.previous_counts = counts
+        self.previous_time = now
+        self.set_text(self.operations_box, "\n".join(lines))
+
+    def show_caches(self):
+        geo = get_geo_cache().stats()
+        maps = get_map_image_service().stats()
+        map_lookups = maps["memory_hits"] + maps["disk_hits"] + maps["downloads"]
+        map_ratio = (maps["memory_hits"] + maps["disk_hits"]) / map_lookups if map_lookups else 0.0
+        lines = [
+            f"Geo-Cache    Trefferquote {geo['hit_ratio'] * 100:5.1f} %  "
+            f"({geo['hits']} Treffer, {geo['misses']} Fehlversuche, {geo['entries']} Einträge)",
+            f"Kartenbilder Trefferquote {map_ratio * 100:5.1f} %  "
+            f"({maps['memory_hits']} Speicher, {maps['disk_hits']} Festplatte, {maps['downloads']} Downloads)",
+        ]
+        self.set_text(self.cache_box, "\n".join(lines))
+
+    def show_limits(self):
+        if not ADAPTIVE_LIMITS_ENABLED:
+            self.set_text(self.limits_box, "Adaptive Limits sind deaktiviert (ADAPTIVE_LIMITS_ENABLED).")
+            return
+        lines = [f"{'Host':<34} {'Limit':>6} {'Aktiv':>6} {'Min':>4} {'Max':>4} {'Latenz ms':>10} "
+                 f"{'+':>6} {'-':>5} {'429/503':>8}"]
+        for state in get_adaptive_limiter().snapshot():
+            lines.append(f"{state['host']:<34} {state['limit']:>6.2f} {state['in_flight']:>6} {state['min']:>4} "
+                         f"{state['max']:>4} {format_ms(state['latency']):>10} {state['increases']:>6} "
+                         f"{state['decreases']:>5} {state['throttled']:>8}")
+        self.set_text(self.limits_box, "\n".join(lines))
+
+    def show_slowest(self, snapshot):
+        lines = ["Langsamste Aufrufe:"]
+        for call in snapshot["slowest"]:
+            stamp = time.strftime("%H:%M:%S", time.localtime(call["timestamp"]))
+            detail = call["detail"] or ""
+            lines.append(f"{stamp}  {format_ms(call['seconds']):>9} ms  {call['name']:<22} "
+                         f"{format_labels(call['labels']):<34} {detail}")
+        self.set_text(self.slowest_box, "\n".join(lines))
+
+    @staticmethod
+    def set_text(textbox, text):
+        textbox.configure(state="normal")
+        textbox.delete("1.0", "end")
+        textbox.insert("1.0", text)
+        textbox.configure(state="disabled")
+
+    # ------------------------- Aktionen -------------------------
+    def export_metrics(self, fmt):
+        path = METRICS_EXPORT_PATH
+        if fmt == "json":
+            path = os.path.splitext(path)[0] + ".json"
+        try:
+            self.metrics.export(path, fmt)
+        except OSError as e:
+            logger.error("Metrics export failed: %s", e)
+            self.export_label.configure(text=f"Export fehlgeschlagen: {e}")
+            return
+        self.export_label.configure(text=f"Exportiert nach {os.path.abspath(path)}")
+
+    def apply_host_limits(self):
+        host = self.limit_host_entry.get().strip().lower()
+        try:
+            minimum = int(self.limit_min_entry.get())
+            maximum = int(self.limit_max_entry.get())
+        except ValueError:
+            self.export_label.configure(text="Min und Max müssen ganze Zahlen sein.")
+            return
+        if not host or minimum < 1 or maximum < minimum:
+            self.export_label.configure(text="Ungültige Limits (Host angeben, 1 <= Min <= Max).")
+            return
+        store = get_settings_store()
+        limits = dict(store.get("adaptive_limits", {}))
+        limits[host] = dict(limits.get(host, {}), min=minimum, max=maximum)
+        store.set("adaptive_limits", limits)
+        self.export_label.configure(text=f"Limits für {host} gespeichert.")
+
+    def clear_host_limits(self):
+        host = self.limit_host_entry.get().strip().lower()
+        store = get_settings_store()
+        limits = dict(store.get("adaptive_limits", {}))
+        if host in limits:
+            # Gelerntes Limit behalten, feste Grenzen entfernen.
+            limits[host] = {key: value for key, value in limits[host].items() if key == "limit"}
+            store.set("adaptive_limits", limits)
+        self.export_label.configure(text=f"{host or 'Host'} wird wieder automatisch geregelt.")
+
+    def reset_metrics(self):
+        self.metrics.reset()
+        self.previous_counts = {}
+        self.previous_time = None
+        self.refresh()
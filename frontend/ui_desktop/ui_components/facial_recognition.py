@@ -3,7 +3,6 @@ import customtkinter as ctk
 import tkinter.filedialog as fd
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 class FacialRecognitionFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -29,5 +28,4 @@ class FacialRecognitionFrame(ctk.CTkFrame):
         if filename:
             msg = f"Performing facial recognition on: {filename}"
             logging.info(msg)
-            self.status_label.configure(text="Recognition initiated... Check console")
-            print(msg)
\ No newline at end of file
+            self.status_label.configure(text="Recognition initiated... Check console")
\ No newline at end of file
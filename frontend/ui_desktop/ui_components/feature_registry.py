@@ -0,0 +1,88 @@
+"""
+Registry of the feature frames shown in the navigation.
+
+Features are registered by module path and class name, so a frame module
+(and everything it imports, e.g. requests or PIL) is only loaded when the
+feature is opened for the first time. prewarm() imports selected modules
+in the background after startup so that likely next clicks are instant.
+"""
+
+import importlib
+import logging
+import threading
+import time
+
+from services.task_executor import get_executor
+
+logger = logging.getLogger(__name__)
+
+# (Navigation label, module path, class name) in navigation order
+FEATURES = [
+    ("Name Search", "ui_components.name_search", "NameSearchFrame"),
+    ("Email Lookup", "ui_components.email_lookup", "EmailLookupFrame"),
+    ("Phone Lookup", "ui_components.phone_lookup", "PhoneLookupFrame"),
+    ("Social Media", "ui_components.social_media_search", "SocialMediaSearchFrame"),
+    ("Business & Financial", "ui_components.business_financial", "BusinessFinancialFrame"),
+    ("Criminal Record", "ui_components.criminal_record", "CriminalRecordFrame"),
+    ("Facial Recognition", "ui_components.facial_recognition", "FacialRecognitionFrame"),
+    ("Dark Web Monitoring", "ui_components.dark_web_monitoring", "DarkWebMonitoringFrame"),
+    ("Geolocation", "ui_components.geolocation", "GeolocationFrame"),
+    ("Vehicle Lookup", "ui_components.vehicle_lookup", "VehicleLookupFrame"),
+    ("Alias Correlation", "ui_components.alias_correlation", "AliasCorrelationFrame"),
+    ("Diagnostics", "ui_components.diagnostics", "DiagnosticsFrame"),
+    ("Settings", "ui_components.settings", "SettingsFrame"),
+]
+
+
+class FeatureRegistry:
+    """
+    Maps navigation labels to lazily imported frame classes.
+    """
+    def __init__(self, features=FEATURES):
+        self._features = {name: (module, class_name) for name, module, class_name in features}
+        self._order = [name for name, _, _ in features]
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        return list(self._order)
+
+    def is_loaded(self, name):
+        return name in self._classes
+
+    def load(self, name):
+        """
+        Returns the frame class of the feature, importing its module on first use.
+        """
+        frame_class = self._classes.get(name)
+        if frame_class is not None:
+            return frame_class
+        module_path, class_name = self._features[name]
+        started = time.perf_counter()
+        module = importlib.import_module(module_path)
+        frame_class = getattr(module, class_name)
+        with self._lock:
+            self._classes[name] = frame_class
+        logger.debug("Loaded feature %s from %s in %.0f ms", name, module_path,
+                     (time.perf_counter() - started) * 1000)
+        return frame_class
+
+    def prewarm(self, names):
+        """
+        Imports the modules of the given features on a background worker.
+        Only imports happen there; frames are still created on the Tk thread.
+        """
+        module_paths = [self._features[name][0] for name in names if name in self._features]
+        if module_paths:
+            return get_executor().submit(_import_modules, module_paths)
+        return None
+
+
+def _import_modules(ctx, module_paths):
+    for module_path in module_paths:
+        ctx.check_cancelled()
+        try:
+            importlib.import_module(module_path)
+        except Exception as e:
+            # The error shows up again when the feature is opened.
+            logger.warning("Pre-warming %s failed: %s", module_path, e)
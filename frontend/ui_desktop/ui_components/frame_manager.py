@@ -0,0 +1,100 @@
+"""
+Keeps feature frames alive between navigation clicks.
+
+Instead of destroying the content area on every click, each feature page
+(header plus feature frame) is created once and then only hidden with
+pack_forget() and shown again with pack(). Running searches keep streaming
+into hidden frames, so switching tabs neither rebuilds widgets nor drops
+results. At most max_resident pages stay alive; the least recently shown
+one is destroyed when the bound is exceeded.
+
+Feature frames can optionally implement these hooks:
+
+    on_show()   the page became visible (e.g. resume timers)
+    on_hide()   the page was hidden (e.g. pause timers)
+    on_evict()  the page is about to be destroyed (release heavy resources);
+                background tasks owned by the frame are cancelled afterwards
+"""
+
+import logging
+from collections import OrderedDict
+
+import customtkinter as ctk
+
+from config.app_config import FRAME_CACHE_SIZE
+from services.task_executor import get_executor
+
+logger = logging.getLogger(__name__)
+
+
+class FramePage:
+    """
+    A resident feature page: container, header label and the feature frame.
+    """
+    def __init__(self, container, title_text, frame_class):
+        self.page = ctk.CTkFrame(container, fg_color="transparent")
+        header = ctk.CTkLabel(self.page, text=title_text, font=("Arial", 18, "bold"))
+        header.pack(pady=(10, 20))
+        self.frame = frame_class(self.page)
+        self.frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def call_hook(self, name):
+        hook = getattr(self.frame, name, None)
+        if hook is None:
+            return
+        try:
+            hook()
+        except Exception as e:
+            logger.error("%s.%s failed: %s", type(self.frame).__name__, name, e)
+
+
+class FrameManager:
+    """
+    LRU cache of feature pages inside a content container.
+    """
+    def __init__(self, container, registry, max_resident=FRAME_CACHE_SIZE):
+        self.container = container
+        self.registry = registry
+        self.max_resident = max(1, max_resident)
+        self.current = None
+        self._pages = OrderedDict()
+
+    def show(self, name):
+        """
+        Shows the feature with the given navigation label, creating its page
+        on first use.
+        """
+        if name == self.current:
+            return self._pages[name].frame
+        if self.current is not None:
+            current = self._pages[self.current]
+            current.page.pack_forget()
+            current.call_hook("on_hide")
+
+        page = self._pages.get(name)
+        if page is None:
+            page = FramePage(self.container, name, self.registry.load(name))
+            self._pages[name] = page
+        self._pages.move_to_end(name)
+        page.page.pack(fill="both", expand=True)
+        self.current = name
+        page.call_hook("on_show")
+        self._evict()
+        return page.frame
+
+    def evict(self, name):
+        """
+        Destroys the page of the given feature (unless it is the visible one).
+        """
+        if name == self.current or name not in self._pages:
+            return
+        page = self._pages.pop(name)
+        page.call_hook("on_evict")
+        get_executor().cancel_owner(page.frame)
+        page.page.destroy()
+        logger.debug("Evicted feature frame %s", name)
+
+    def _evict(self):
+        while len(self._pages) > self.max_resident:
+            oldest = next(iter(self._pages))
+            self.evict(oldest)
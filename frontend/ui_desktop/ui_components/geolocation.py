@@ -1,45 +1,114 @@
 # ui_components/geolocation.py
 import customtkinter as ctk
 import logging
-import requests
 import ipaddress
-import re
+import os
 import webbrowser
-import io
-from PIL import Image, ImageTk
+import tkinter as tk
+import tkinter.filedialog as fd
+
+from config.app_config import MAP_IMAGE_SIZE, NETWORK_SCAN_MAX_ADDRESSES, TASK_TIMEOUT_SECONDS
+from services.bulk_import import import_file
+from services.geo_cache import get_geo_cache
+from services.geo_providers import GeolocationLookupError
+from services.geolocation_engine import (MAC_PATTERN, host_count, lookup_ip, lookup_mac, lookup_public_ip,
+                                        scan_range)
+from services.map_images import MapImageError, get_map_image_service
+from services.range_engine import scan_blocks
+from services.task_executor import get_executor
+from ui_components.custom_widgets import LogConsole
+
+
+# ------------------------- Hintergrund-Abfragen -------------------------
+# Adapter für den TaskExecutor: Die Abfragelogik liegt in
+# services/geolocation_engine.py (ohne Tk, auch von cli.py genutzt). Die
+# Funktionen laufen im Worker-Thread und dürfen keine Widgets anfassen.
+
+def fetch_ip_geolocation(ctx, query):
+    """
+    Ruft die Geolokationsdaten für eine IP-Adresse ab (private IPs werden simuliert).
+    """
+    return lookup_ip(query, wait=ctx.wait)
+
+def fetch_public_ip_geolocation(ctx):
+    """
+    Ermittelt die öffentliche IP und deren Geolokationsdaten über denselben
+    Provider-Pfad wie der IP-Lookup. Meldet die gefundene IP als Zwischenstand.
+    """
+    def on_address(public_ip):
+        ctx.report_progress(public_ip)
+        ctx.check_cancelled()
+    return lookup_public_ip(wait=ctx.wait, on_address=on_address)
 
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+def fetch_mac_vendor(ctx, query):
+    """
+    Ermittelt den Hersteller einer MAC-Adresse; gibt (status_code, antworttext) zurück.
+    """
+    return lookup_mac(query, wait=ctx.wait)
 
-def get_public_ip():
+def scan_network_range(ctx, network):
+    """
+    Fragt alle Hosts eines Netzwerks ab. Jeder fertige Block wird sofort als
+    (text, erledigt, gesamt) gemeldet.
     """
-    Ermittelt die öffentliche IP-Adresse, z. B. über ipify.org.
+    total = host_count(network)
+    done = 0
+    for results in scan_range(network, wait=ctx.wait):
+        ctx.check_cancelled()
+        done += len(results)
+        text = "".join(format_range_line(data.get("query", ""), data) for data in results)
+        ctx.report_progress(text, done, total)
+    return done
+
+def scan_network_blocks(ctx, network):
     """
-    try:
-        response = requests.get("https://api.ipify.org")
-        response.raise_for_status()
-        return response.text.strip()
-    except Exception as e:
-        print("Fehler beim Abrufen der öffentlichen IP:", e)
-        return None
-
-def get_geolocation(ip):
+    Fragt ein Netzwerk blockweise ab (ein Lookup pro Vergabeblock, siehe
+    services/range_engine.py). Meldet jede Zusammenfassung als
+    (text, abgedeckte Adressen, Adressen gesamt).
     """
-    Ruft Standortinformationen für die angegebene IP-Adresse von ipinfo.io ab.
+    start = int(network.network_address)
+    blocks = 0
+    for row in scan_blocks(network, wait=ctx.wait):
+        ctx.check_cancelled()
+        blocks += 1
+        covered = int(ipaddress.ip_address(row["last"])) - start + 1
+        ctx.report_progress(format_block_line(row), covered, network.num_addresses)
+    return blocks
+
+def format_block_line(row):
     """
-    try:
-        url = f"https://ipinfo.io/{ip}/json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print("Fehler beim Abrufen der Geolokation:", e)
-        return None
+    Formatiert die Zusammenfassung eines Adressblocks.
+    """
+    netname = f", Netz: {row['netname']}" if row.get("netname") else ""
+    if row.get("status", "success") != "success":
+        return (f"{row['block']} ({row['addresses']} Adressen) - Lookup fehlgeschlagen "
+                f"({row.get('message') or 'Unbekannter Fehler'})\n")
+    return (f"{row['block']} ({row['addresses']} Adressen): Land: {row.get('country') or 'Nicht verfügbar'}, "
+            f"Region: {row.get('regionName') or 'Nicht verfügbar'}, Stadt: {row.get('city') or 'Nicht verfügbar'}, "
+            f"Organisation: {row.get('org') or 'Nicht verfügbar'}{netname} [Quelle: {row['blockSource']}]\n")
+
+def format_range_line(ip_str, data):
+    """
+    Formatiert das Ergebnis einer einzelnen Adresse des Netzwerkscans.
+    """
+    if data.get("status", "success") != "success":
+        return f"IP: {ip_str} - Lookup fehlgeschlagen ({data.get('message', 'Unbekannter Fehler')})\n"
+    return (f"IP: {data.get('query', ip_str)}, Land: {data.get('country', 'Nicht verfügbar')}, "
+            f"Region: {data.get('regionName', 'Nicht verfügbar')}, Stadt: {data.get('city', 'Nicht verfügbar')}\n")
+
+def format_duration(seconds):
+    """
+    Formatiert eine Restzeit als m:ss bzw. h:mm:ss.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
 
 class GeolocationFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         self.current_coordinates = None  # Für die Kartenansicht (IP-Lookup)
+        self.current_task = None  # Laufende Hintergrundabfrage (TaskHandle)
 
         self.grid_columnconfigure(1, weight=1)
 
@@ -50,8 +119,9 @@ class GeolocationFrame(ctk.CTkFrame):
         # Auswahl des Suchtyps
         type_label = ctk.CTkLabel(self, text="Suchtyp:")
         type_label.grid(row=1, column=0, padx=10, pady=5, sticky="e")
-        self.lookup_type_menu = ctk.CTkOptionMenu(self, 
-                                                  values=["IP (v4/v6)", "Öffentliche IP (automatisch)", "MAC", "Netzwerkbereich"])
+        self.lookup_type_menu = ctk.CTkOptionMenu(self,
+                                                  values=["IP (v4/v6)", "Öffentliche IP (automatisch)", "MAC", "Netzwerkbereich",
+                                                          "Netzwerkbereich (alle Hosts)"])
         self.lookup_type_menu.set("IP (v4/v6)")
         self.lookup_type_menu.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
 
@@ -61,27 +131,106 @@ class GeolocationFrame(ctk.CTkFrame):
         self.query_entry = ctk.CTkEntry(self)
         self.query_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
 
-        # Buttons: Lookup und Reset
+        # Buttons: Lookup, Abbrechen und Reset
         btn_frame = ctk.CTkFrame(self)
         btn_frame.grid(row=3, column=0, columnspan=2, pady=(10, 5))
         lookup_button = ctk.CTkButton(btn_frame, text="Lookup", command=self.perform_lookup)
         lookup_button.grid(row=0, column=0, padx=5)
+        self.cancel_button = ctk.CTkButton(btn_frame, text="Abbrechen", command=self.cancel_lookup, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=5)
         reset_button = ctk.CTkButton(btn_frame, text="Reset", command=self.reset_fields)
-        reset_button.grid(row=0, column=1, padx=5)
+        reset_button.grid(row=0, column=2, padx=5)
+        # Massenabfrage: Text-/CSV-Datei mit IPs, Netzwerken und MACs
+        import_button = ctk.CTkButton(btn_frame, text="Datei importieren...", command=self.import_bulk_file)
+        import_button.grid(row=0, column=3, padx=5)
 
         # Statusanzeige
         self.status_label = ctk.CTkLabel(self, text="", fg_color="transparent")
         self.status_label.grid(row=4, column=0, columnspan=2, pady=5)
 
+        # Fortschritt des Datei-Imports (nur während eines Imports sichtbar)
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=5, column=0, columnspan=2, padx=10, pady=(0, 5), sticky="ew")
+        self.progress_bar.grid_remove()
+
         # Textfeld für detaillierte Ergebnisse
-        self.result_box = ctk.CTkTextbox(self, width=480, height=150)
-        self.result_box.grid(row=5, column=0, columnspan=2, padx=10, pady=(5, 10))
-        self.result_box.configure(state="disabled")
+        # (gepufferte Konsole, damit der Netzwerkscan nicht bei jedem Block neu zeichnet)
+        self.result_box = LogConsole(self, width=480, height=150, max_lines=NETWORK_SCAN_MAX_ADDRESSES + 10)
+        self.result_box.grid(row=6, column=0, columnspan=2, padx=10, pady=(5, 10))
 
         # Button für Kartenansicht (wird nur aktiviert, wenn gültige Koordinaten vorliegen)
         self.map_button = ctk.CTkButton(self, text="Auf Karte anzeigen", command=self.show_map_window, state="disabled")
-        self.map_button.grid(row=6, column=0, columnspan=2, pady=(5, 10))
+        self.map_button.grid(row=7, column=0, columnspan=2, pady=(5, 10))
+
+        # Trefferstatistik des Geo-Caches
+        self.cache_label = ctk.CTkLabel(self, text="", fg_color="transparent")
+        self.cache_label.grid(row=8, column=0, columnspan=2, pady=(0, 10))
+        self.update_cache_stats()
 
+    # ------------------------- Hintergrundabfragen -------------------------
+    def run_task(self, fn, *args, on_success=None, on_error=None, on_progress=None, timeout=TASK_TIMEOUT_SECONDS):
+        """
+        Startet eine Abfrage über den gemeinsamen TaskExecutor. Eine noch laufende
+        Abfrage dieses Frames wird dabei abgebrochen.
+        """
+        if self.current_task is not None:
+            self.current_task.cancel()
+
+        def finish(callback):
+            def wrapper(*cb_args):
+                self.current_task = None
+                self.cancel_button.configure(state="disabled")
+                self.update_cache_stats()
+                if callback is not None:
+                    callback(*cb_args)
+            return wrapper
+
+        self.current_task = get_executor().submit(
+            fn, *args,
+            owner=self,
+            on_success=finish(on_success),
+            on_error=finish(on_error or self.on_lookup_error),
+            on_progress=on_progress,
+            timeout=timeout,
+        )
+        self.cancel_button.configure(state="normal")
+
+    def cancel_lookup(self):
+        if self.current_task is not None:
+            self.current_task.cancel()
+            self.current_task = None
+            self.status_label.configure(text="Abfrage abgebrochen.")
+        self.cancel_button.configure(state="disabled")
+        self.progress_bar.grid_remove()
+
+    def update_cache_stats(self):
+        stats = get_geo_cache().stats()
+        self.cache_label.configure(
+            text=f"Cache: {stats['hits']} Treffer / {stats['misses']} Fehlgriffe "
+                 f"({stats['hit_ratio']:.0%} Trefferquote)")
+
+    def on_lookup_error(self, error):
+        if isinstance(error, GeolocationLookupError):
+            self.status_label.configure(text=str(error))
+        elif isinstance(error, TimeoutError):
+            self.status_label.configure(text="Fehler: Zeitüberschreitung bei der Abfrage.")
+        else:
+            logging.error("Fehler bei der Abfrage: %s", error)
+            self.status_label.configure(text="Fehler bei der Abfrage.")
+
+    def set_result_text(self, text):
+        self.result_box.clear()
+        if text:
+            self.result_box.write(text)
+            self.result_box.flush()
+            self.result_box.see("1.0")
+
+    def set_coordinates(self, coordinates):
+        self.current_coordinates = coordinates
+        self.map_button.configure(state="normal" if coordinates else "disabled")
+
+    # ------------------------- Lookups -------------------------
     def perform_lookup(self):
         lookup_type = self.lookup_type_menu.get().strip()
         if lookup_type == "IP (v4/v6)":
@@ -91,57 +240,25 @@ class GeolocationFrame(ctk.CTkFrame):
         elif lookup_type == "MAC":
             self.lookup_mac()
         elif lookup_type == "Netzwerkbereich":
+            self.lookup_network_blocks()
+        elif lookup_type == "Netzwerkbereich (alle Hosts)":
             self.lookup_network_range()
 
     def lookup_ip(self):
         query = self.query_entry.get().strip()
         try:
-            ip_obj = ipaddress.ip_address(query)
+            ipaddress.ip_address(query)
         except Exception:
             self.status_label.configure(text="Ungültiges IP-Adressformat.")
             return
 
         self.status_label.configure(text="IP-Lookup gestartet...")
         logging.info("Suche nach Geolocation für IP: %s", query)
+        self.run_task(fetch_ip_geolocation, query, on_success=self.show_ip_result)
 
-        # Bei privaten IPs erfolgt eine simulierte Antwort.
-        if ip_obj.is_private:
-            logging.info("IP %s ist privat.", query)
-            data = {
-                "query": query,
-                "networkType": "Private",
-                "country": "Lokales Netzwerk",
-                "regionName": "Simulierte Region",
-                "city": "Simulierte Stadt",
-                "zip": "Nicht verfügbar",
-                "lat": 37.7749,     # Simulierte Koordinate (z. B. San Francisco)
-                "lon": -122.4194,   # Simulierte Koordinate
-                "timezone": "Lokal (simuliert)",
-                "isp": "Privater ISP",
-                "org": "Lokale Organisation",
-                "status": "success"
-            }
-        else:
-            try:
-                # Hier könnte auch ein anderer externer Dienst verwendet werden
-                response = requests.get(f"http://ip-api.com/json/{query}")
-                if response.status_code != 200:
-                    self.status_label.configure(text="Fehler: Konnte Daten für die öffentliche IP nicht abrufen.")
-                    logging.error("HTTP-Fehler: %s", response.status_code)
-                    return
-                data = response.json()
-                if data.get("status") != "success":
-                    message = data.get("message", "Unbekannter Fehler")
-                    self.status_label.configure(text=f"Fehler: {message}")
-                    logging.error("API-Fehler: %s", message)
-                    return
-            except Exception as e:
-                logging.error("Fehler beim IP-Lookup: %s", e)
-                self.status_label.configure(text="Fehler beim IP-Lookup.")
-                return
-
+    def show_ip_result(self, data, label="IP"):
         result_text = (
-            f"IP: {data.get('query', 'Nicht verfügbar')}\n"
+            f"{label}: {data.get('query', 'Nicht verfügbar')}\n"
             f"Netzwerk: {data.get('networkType', 'Public')}\n"
             f"Land: {data.get('country', 'Nicht verfügbar')}\n"
             f"Region: {data.get('regionName', 'Nicht verfügbar')}\n"
@@ -151,144 +268,193 @@ class GeolocationFrame(ctk.CTkFrame):
             f"Timezone: {data.get('timezone', 'Nicht verfügbar')}\n"
             f"ISP: {data.get('isp', 'Nicht verfügbar')}\n"
             f"Organisation: {data.get('org', 'Nicht verfügbar')}\n"
+            f"Quelle: {data.get('source', 'Nicht verfügbar')}\n"
         )
         self.status_label.configure(text="Lookup erfolgreich!")
         logging.info("Lookup-Ergebnis: %s", result_text)
-
-        self.result_box.configure(state="normal")
-        self.result_box.delete("1.0", "end")
-        self.result_box.insert("0.0", result_text)
-        self.result_box.configure(state="disabled")
+        self.set_result_text(result_text)
 
         if data.get("lat") is not None and data.get("lon") is not None:
-            self.current_coordinates = (data["lat"], data["lon"])
-            self.map_button.configure(state="normal")
+            self.set_coordinates((data["lat"], data["lon"]))
         else:
-            self.map_button.configure(state="disabled")
-            self.current_coordinates = None
+            self.set_coordinates(None)
 
     def lookup_public_ip(self):
         """
-        Ermittelt die öffentliche IP über ipify und ruft die Geolokationsdaten über ipinfo.io ab.
+        Ermittelt die öffentliche IP und ruft deren Geolokationsdaten wie beim IP-Lookup ab.
         """
         self.status_label.configure(text="Öffentliche IP wird ermittelt...")
-        public_ip = get_public_ip()
-        if not public_ip:
-            self.status_label.configure(text="Fehler bei der Ermittlung der öffentlichen IP.")
-            return
+        self.run_task(
+            fetch_public_ip_geolocation,
+            on_success=self.show_public_ip_result,
+            on_progress=lambda public_ip: self.status_label.configure(
+                text=f"Öffentliche IP ({public_ip}) wurde ermittelt."),
+        )
 
-        self.status_label.configure(text=f"Öffentliche IP ({public_ip}) wurde ermittelt.")
-        data = get_geolocation(public_ip)
-        if data:
-            loc = data.get("loc", "nicht verfügbar")
-            result_text = (
-                f"Öffentliche IP: {public_ip}\n"
-                f"Land: {data.get('country', 'nicht verfügbar')}\n"
-                f"Region: {data.get('region', 'nicht verfügbar')}\n"
-                f"Stadt: {data.get('city', 'nicht verfügbar')}\n"
-                f"Postleitzahl: {data.get('postal', 'nicht verfügbar')}\n"
-                f"Koordinaten (lat, lon): {loc}\n"
-            )
-            self.result_box.configure(state="normal")
-            self.result_box.delete("1.0", "end")
-            self.result_box.insert("0.0", result_text)
-            self.result_box.configure(state="disabled")
-            # Versuche, die Koordinaten zu extrahieren
-            if loc != "nicht verfügbar":
-                try:
-                    lat, lon = loc.split(',')
-                    self.current_coordinates = (float(lat), float(lon))
-                    self.map_button.configure(state="normal")
-                except Exception as e:
-                    logging.error("Fehler beim Parsen der Koordinaten: %s", e)
-                    self.map_button.configure(state="disabled")
-                    self.current_coordinates = None
-            else:
-                self.map_button.configure(state="disabled")
-                self.current_coordinates = None
-        else:
-            self.status_label.configure(text="Keine Geolokationsdaten gefunden.")
+    def show_public_ip_result(self, result):
+        public_ip, data = result
+        self.show_ip_result(data, label="Öffentliche IP")
 
     def lookup_mac(self):
         query = self.query_entry.get().strip()
-        mac_pattern = re.compile(r'^([0-9A-Fa-f]{2}[-:]){5}([0-9A-Fa-f]{2})$')
-        if not mac_pattern.match(query):
+        if not MAC_PATTERN.match(query):
             self.status_label.configure(text="Ungültiges MAC-Adressformat.")
             return
 
         self.status_label.configure(text="MAC-Lookup gestartet...")
         logging.info("Suche nach MAC-Adresse: %s", query)
+        self.run_task(
+            fetch_mac_vendor, query,
+            on_success=lambda result: self.show_mac_result(query, result),
+            on_error=lambda error: self.show_mac_error(query, error),
+        )
 
-        try:
-            response = requests.get(f"https://api.macvendors.com/{query}")
-            if response.status_code == 200:
-                vendor = response.text.strip()
-                result_text = f"MAC-Adresse: {query}\nHersteller: {vendor}"
-                self.status_label.configure(text="MAC-Lookup erfolgreich!")
-                logging.info("MAC Lookup-Ergebnis: %s", result_text)
-            else:
-                result_text = f"MAC-Adresse: {query}\nHersteller-Lookup fehlgeschlagen (Status Code: {response.status_code})"
-                self.status_label.configure(text="Fehler beim MAC-Lookup.")
-                logging.error("MAC API Fehler mit Status %s", response.status_code)
-        except Exception as e:
-            logging.error("Fehler beim MAC-Lookup: %s", e)
-            result_text = f"MAC-Adresse: {query}\nFehler beim Lookup: {e}"
+    def show_mac_result(self, query, result):
+        status_code, text = result
+        if status_code == 200:
+            result_text = f"MAC-Adresse: {query}\nHersteller: {text}"
+            self.status_label.configure(text="MAC-Lookup erfolgreich!")
+            logging.info("MAC Lookup-Ergebnis: %s", result_text)
+        else:
+            result_text = f"MAC-Adresse: {query}\nHersteller-Lookup fehlgeschlagen (Status Code: {status_code})"
             self.status_label.configure(text="Fehler beim MAC-Lookup.")
+            logging.error("MAC API Fehler mit Status %s", status_code)
+        self.set_result_text(result_text)
+        self.set_coordinates(None)
 
-        self.result_box.configure(state="normal")
-        self.result_box.delete("1.0", "end")
-        self.result_box.insert("0.0", result_text)
-        self.result_box.configure(state="disabled")
-        self.map_button.configure(state="disabled")
-        self.current_coordinates = None
+    def show_mac_error(self, query, error):
+        logging.error("Fehler beim MAC-Lookup: %s", error)
+        self.set_result_text(f"MAC-Adresse: {query}\nFehler beim Lookup: {error}")
+        self.status_label.configure(text="Fehler beim MAC-Lookup.")
+        self.set_coordinates(None)
 
-    def lookup_network_range(self):
+    def parse_network(self):
         query = self.query_entry.get().strip()
         try:
-            network = ipaddress.ip_network(query, strict=False)
-        except Exception as e:
+            return ipaddress.ip_network(query, strict=False)
+        except ValueError:
             self.status_label.configure(text="Ungültiger Netzwerkbereich. Bitte CIDR-Notation verwenden (z.B. 192.168.1.0/24).")
+            return None
+
+    def lookup_network_blocks(self):
+        """
+        Blockweiser Scan ohne Größenbeschränkung: auch /16- oder IPv6-Netze
+        kosten nur einen Lookup pro Vergabeblock.
+        """
+        network = self.parse_network()
+        if network is None:
             return
+        self.status_label.configure(text="Blockweiser Netzwerkscan gestartet...")
+        logging.info("Scanne Netzwerk blockweise: %s", network)
+        self.set_result_text("")
+        self.set_coordinates(None)
+        self.run_task(
+            scan_network_blocks, network,
+            on_success=lambda blocks: self.status_label.configure(
+                text=f"Netzwerkscan abgeschlossen! ({blocks} Blöcke)"),
+            on_progress=self.append_network_block_result,
+            timeout=None,
+        )
 
-        if network.num_addresses > 256:
-            self.status_label.configure(text="Netzwerk zu groß zum Scannen (maximal 256 Adressen).")
+    def append_network_block_result(self, text, covered, total):
+        self.result_box.write(text)
+        self.status_label.configure(text=f"Netzwerkscan läuft... ({covered / total:.0%} abgedeckt)")
+
+    def lookup_network_range(self):
+        network = self.parse_network()
+        if network is None:
+            return
+
+        if network.num_addresses > NETWORK_SCAN_MAX_ADDRESSES:
+            self.status_label.configure(
+                text=f"Netzwerk zu groß zum Scannen aller Hosts (maximal {NETWORK_SCAN_MAX_ADDRESSES} Adressen). "
+                     f"Größere Netze bitte blockweise scannen.")
             return
 
         self.status_label.configure(text="Netzwerkscan gestartet...")
-        logging.info("Scanne Netzwerk: %s", query)
-        results_text = ""
-        for ip in network.hosts():
-            ip_str = str(ip)
-            try:
-                if ip.is_private:
-                    data = {
-                        "query": ip_str,
-                        "networkType": "Private",
-                        "country": "Lokales Netzwerk",
-                        "regionName": "Simulierte Region",
-                        "city": "Simulierte Stadt",
-                    }
-                else:
-                    response = requests.get(f"http://ip-api.com/json/{ip_str}")
-                    if response.status_code != 200:
-                        data = {"query": ip_str, "status": "fail", "message": "HTTP Fehler"}
-                    else:
-                        data = response.json()
-                if data.get("status", "success") != "success":
-                    results_text += f"IP: {ip_str} - Lookup fehlgeschlagen ({data.get('message', 'Unbekannter Fehler')})\n"
-                else:
-                    results_text += (f"IP: {data.get('query', ip_str)}, Land: {data.get('country', 'Nicht verfügbar')}, "
-                                     f"Region: {data.get('regionName', 'Nicht verfügbar')}, Stadt: {data.get('city', 'Nicht verfügbar')}\n")
-            except Exception as ex:
-                results_text += f"IP: {ip_str} - Exception: {ex}\n"
-
-        self.result_box.configure(state="normal")
-        self.result_box.delete("1.0", "end")
-        self.result_box.insert("0.0", results_text)
-        self.result_box.configure(state="disabled")
-        self.status_label.configure(text="Netzwerkscan abgeschlossen!")
-        self.map_button.configure(state="disabled")
-        self.current_coordinates = None
+        logging.info("Scanne Netzwerk: %s", network)
+        self.set_result_text("")
+        self.set_coordinates(None)
+        self.run_task(
+            scan_network_range, network,
+            on_success=self.show_network_range_result,
+            on_progress=self.append_network_range_result,
+            timeout=None,
+        )
+
+    def append_network_range_result(self, text, done, total):
+        # Ergebnisse blockweise anhängen, sobald sie eintreffen.
+        self.result_box.write(text)
+        self.status_label.configure(text=f"Netzwerkscan läuft... ({done}/{total})")
+
+    def show_network_range_result(self, done):
+        self.status_label.configure(text=f"Netzwerkscan abgeschlossen! ({done} Adressen)")
+
+    def import_bulk_file(self):
+        """
+        Liest eine Text-/CSV-Datei mit gemischten IP-, Netzwerk- und MAC-Adressen
+        ein und schreibt die Ergebnisse fortlaufend in eine Ergebnisdatei.
+        """
+        path = fd.askopenfilename(
+            title="Datei mit IP-, Netzwerk- oder MAC-Adressen auswählen",
+            filetypes=[("Text/CSV", "*.txt *.csv"), ("Alle Dateien", "*.*")],
+        )
+        if not path:
+            return
+        basename = os.path.splitext(os.path.basename(path))[0]
+        output_path = fd.asksaveasfilename(
+            title="Ergebnisse speichern unter",
+            initialdir=os.path.dirname(path),
+            initialfile=f"{basename}_ergebnisse.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not output_path:
+            return
+
+        logging.info("Importiere %s nach %s", path, output_path)
+        self.status_label.configure(text="Import gestartet...")
+        self.set_result_text("")
+        self.set_coordinates(None)
+        self.progress_bar.set(0)
+        self.progress_bar.grid()
+        self.run_task(
+            import_file, path, output_path,
+            on_success=lambda stats: self.show_import_result(output_path, stats),
+            on_error=self.on_import_error,
+            on_progress=self.show_import_progress,
+            timeout=None,
+        )
+
+    def show_import_progress(self, stats):
+        # Die Ergebnisse landen in der Datei; hier nur Kennzahlen anzeigen.
+        if stats["fraction"] is not None:
+            self.progress_bar.set(stats["fraction"])
+        text = (f"Import läuft... {stats['rows']} Ergebnisse ({stats['failed']} fehlgeschlagen), "
+                f"{stats['rate']:.1f} Zeilen/s")
+        if stats["eta"] is not None:
+            text += f", Restzeit ca. {format_duration(stats['eta'])}"
+        self.status_label.configure(text=text)
+
+    def show_import_result(self, output_path, stats):
+        self.progress_bar.grid_remove()
+        self.status_label.configure(text=f"Import abgeschlossen! ({stats['rows']} Ergebnisse)")
+        self.set_result_text(
+            f"Ergebnisdatei: {output_path}\n"
+            f"Eingelesene Zeilen: {stats['lines']}\n"
+            f"Abgefragte Adressen: {stats['entries']}\n"
+            f"Übersprungene Duplikate: {stats['duplicates']}\n"
+            f"Ungültige Einträge: {stats['invalid']}\n"
+            f"Ergebnisse: {stats['rows']} ({stats['failed']} fehlgeschlagen)\n"
+            f"Dauer: {format_duration(stats['elapsed'])} ({stats['rate']:.1f} Zeilen/s)\n"
+        )
+
+    def on_import_error(self, error):
+        self.progress_bar.grid_remove()
+        if isinstance(error, OSError):
+            self.status_label.configure(text=f"Fehler beim Import: {error}")
+        else:
+            self.on_lookup_error(error)
 
     def show_map_window(self):
         if not self.current_coordinates:
@@ -313,34 +479,37 @@ class GeolocationFrame(ctk.CTkFrame):
         url_label = ctk.CTkLabel(frame, text=interactive_url, fg_color="transparent")
         url_label.pack(pady=5)
 
-        static_map_url = (f"http://staticmap.openstreetmap.de/staticmap.php?center={lat},{lon}"
-                          f"&zoom=14&size=600x400&markers={lat},{lon},red")
-        try:
-            response = requests.get(static_map_url)
-            if response.status_code == 200:
-                image_data = response.content
-                image = Image.open(io.BytesIO(image_data))
-                image = image.resize((600, 400))
-                photo = ImageTk.PhotoImage(image)
-                image_label = ctk.CTkLabel(frame, image=photo)
-                image_label.image = photo  # Referenz halten
-                image_label.pack(pady=10)
+        # Platzhalter in Kartengröße, bis das Kartenbild im Hintergrund geladen wurde
+        width, height = MAP_IMAGE_SIZE
+        placeholder = tk.PhotoImage(master=map_window, width=width, height=height)
+        placeholder.put("#d9d9d9", to=(0, 0, width, height))
+        image_label = ctk.CTkLabel(frame, image=placeholder, text="Kartenbild wird geladen...", compound="center")
+        image_label.image = placeholder  # Referenz halten
+        image_label.pack(pady=10)
+
+        def show_image(photo):
+            image_label.configure(image=photo, text="")
+            image_label.image = photo  # Referenz halten
+
+        def show_error(error):
+            if isinstance(error, MapImageError):
+                image_label.configure(text=str(error))
             else:
-                error_label = ctk.CTkLabel(frame, text="Kartenbild konnte nicht geladen werden.")
-                error_label.pack(pady=10)
-        except Exception as e:
-            logging.error("Fehler beim Laden des Kartenbildes: %s", e)
-            error_label = ctk.CTkLabel(frame, text="Fehler beim Laden des Kartenbildes.")
-            error_label.pack(pady=10)
+                logging.error("Fehler beim Laden des Kartenbildes: %s", error)
+                image_label.configure(text="Fehler beim Laden des Kartenbildes.")
+
+        # Bereits geladene Karten (auch für nahe Standorte) kommen aus dem Cache.
+        handle = get_map_image_service().request(lat, lon, owner=image_label, on_ready=show_image,
+                                                 on_error=show_error)
+        if handle is not None:
+            map_window.bind("<Destroy>", lambda event: handle.cancel(), add="+")
 
     def reset_fields(self):
+        self.cancel_lookup()
         self.query_entry.delete(0, "end")
         self.status_label.configure(text="")
-        self.result_box.configure(state="normal")
-        self.result_box.delete("1.0", "end")
-        self.result_box.configure(state="disabled")
-        self.map_button.configure(state="disabled")
-        self.current_coordinates = None
+        self.set_result_text("")
+        self.set_coordinates(None)
 
 # Für Testzwecke: Einfaches Hauptfenster erstellen
 if __name__ == "__main__":
@@ -348,4 +517,4 @@ if __name__ == "__main__":
     app.title("Geolocation & Netzwerk-Suche")
     frame = GeolocationFrame(app)
     frame.pack(fill="both", expand=True)
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -2,18 +2,30 @@
 import customtkinter as ctk
 import logging
 import webbrowser
-import csv
-from difflib import SequenceMatcher
 
-# Versuche, das Modul für Google-Suche zu importieren.
-# Falls nicht vorhanden, werden simulierte Treffer verwendet.
-try:
-    from googlesearch import search
-except ImportError:
-    search = None
+from config.app_config import SEARCH_RESULTS_PAGE_SIZE
+from services.export import available_compressions, available_formats, export_filename, export_rows
+from services.ranking import RankingIndex, rank_results
+from services.search_pipeline import run_search_pipeline
+from services.settings_store import get_settings_store
+from services.task_executor import get_executor
+from ui_components.custom_widgets import LogConsole, VirtualList
 
-logging.basicConfig(level=logging.INFO, 
-                    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+# Suchquellen: (Name in der Pipeline, Statusmeldung beim Start, Präfix im Suchprotokoll)
+SEARCH_SOURCES = [
+    ("internal", "Interne Datenbank wird durchsucht...", "Internes Ergebnis"),
+    ("web", "Web-Suchmaschinenabfrage startet...", "Web-Ergebnis"),
+    ("social", "Soziale Netzwerke werden durchsucht...", "Soziales Ergebnis"),
+    ("extended", "Erweiterte Quellen werden durchsucht...", "Erweitertes Ergebnis"),
+]
+SOURCE_LABELS = {name: prefix for name, _, prefix in SEARCH_SOURCES}
+# Statische Vorschläge für die Autovervollständigung des Vornamens
+FIRST_NAME_SUGGESTIONS = ["Max", "Moritz", "Maria", "John", "Anna"]
+# Filterstufen des Suchprotokolls
+LOG_LEVELS = {"Alle": logging.DEBUG, "Meldungen": logging.INFO, "Warnungen": logging.WARNING, "Fehler": logging.ERROR}
+# Eintrag im Komprimierungsmenü für unkomprimierte Exporte
+NO_COMPRESSION = "keine"
 
 class NameSearchFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -21,6 +33,7 @@ class NameSearchFrame(ctk.CTkFrame):
         # Gesamt-Layout über grid; Padding wird in den grid()-Aufrufen gesetzt.
         self.grid_columnconfigure(0, weight=1)
         self.current_font_size = 22  # Ausgangswert für Überschriften
+        self.tooltips = []  # Werden beim Verlassen des Tabs ausgeblendet
         
         # Header-Bereich (enthält Titel, Dark Mode Umschalter, Feedback-Button & Schriftgrößen-Schieber)
         self.header_frame = ctk.CTkFrame(self)
@@ -53,30 +66,31 @@ class NameSearchFrame(ctk.CTkFrame):
         # Vorname (als CTkComboBox für Autovervollständigung; statische Vorschläge)
         self.first_label = ctk.CTkLabel(self.input_frame, text="Vorname:", font=("Helvetica", 14))
         self.first_label.grid(row=0, column=0, sticky="w", padx=(10,5), pady=5)
-        self.first_entry = ctk.CTkComboBox(self.input_frame, values=["Max", "Moritz", "Maria", "John", "Anna"])
+        self.first_entry = ctk.CTkComboBox(self.input_frame, values=FIRST_NAME_SUGGESTIONS)
         self.first_entry.grid(row=0, column=1, sticky="ew", padx=(0,10), pady=5)
-        ToolTip(self.first_entry, "Bitte geben Sie den Vornamen ein. Vorschläge: Max, Moritz, Maria, John, Anna.")
+        self.tooltips.append(ToolTip(self.first_entry,
+                                     "Bitte geben Sie den Vornamen ein. Vorschläge: Max, Moritz, Maria, John, Anna."))
         
         # Nachname
         self.last_label = ctk.CTkLabel(self.input_frame, text="Nachname:", font=("Helvetica", 14))
         self.last_label.grid(row=1, column=0, sticky="w", padx=(10,5), pady=5)
         self.last_entry = ctk.CTkEntry(self.input_frame)
         self.last_entry.grid(row=1, column=1, sticky="ew", padx=(0,10), pady=5)
-        ToolTip(self.last_entry, "Bitte geben Sie den Nachnamen ein.")
+        self.tooltips.append(ToolTip(self.last_entry, "Bitte geben Sie den Nachnamen ein."))
         
         # Aliase
         self.alias_label = ctk.CTkLabel(self.input_frame, text="Aliase (kommagetrennt):", font=("Helvetica", 14))
         self.alias_label.grid(row=2, column=0, sticky="w", padx=(10,5), pady=5)
         self.alias_entry = ctk.CTkEntry(self.input_frame)
         self.alias_entry.grid(row=2, column=1, sticky="ew", padx=(0,10), pady=5)
-        ToolTip(self.alias_entry, "Mehrere Aliase bitte mit Komma trennen.")
+        self.tooltips.append(ToolTip(self.alias_entry, "Mehrere Aliase bitte mit Komma trennen."))
         
         # Zusätzliche Schlagwörter
         self.extra_label = ctk.CTkLabel(self.input_frame, text="Zusätzliche Schlagwörter:", font=("Helvetica", 14))
         self.extra_label.grid(row=3, column=0, sticky="w", padx=(10,5), pady=5)
         self.extra_entry = ctk.CTkEntry(self.input_frame)
         self.extra_entry.grid(row=3, column=1, sticky="ew", padx=(0,10), pady=5)
-        ToolTip(self.extra_entry, "Weitere Suchbegriffe hinzufügen.")
+        self.tooltips.append(ToolTip(self.extra_entry, "Weitere Suchbegriffe hinzufügen."))
         
         # Filter & Optionen (Checkbuttons)
         self.filter_frame = ctk.CTkFrame(self)
@@ -101,13 +115,16 @@ class NameSearchFrame(ctk.CTkFrame):
         # Button-Bereich (Suche starten und Reset)
         self.button_frame = ctk.CTkFrame(self)
         self.button_frame.grid(row=3, column=0, sticky="ew", padx=20, pady=10)
-        self.button_frame.grid_columnconfigure((0, 1), weight=1)
+        self.button_frame.grid_columnconfigure((0, 1, 2), weight=1)
         self.search_button = ctk.CTkButton(self.button_frame, text="Suche starten",
                                            command=self.perform_search, corner_radius=8)
         self.search_button.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
         self.reset_button = ctk.CTkButton(self.button_frame, text="Reset",
                                           command=self.reset_fields, corner_radius=8)
         self.reset_button.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
+        self.cancel_button = ctk.CTkButton(self.button_frame, text="Abbrechen", state="disabled",
+                                           command=self.cancel_search, corner_radius=8)
+        self.cancel_button.grid(row=0, column=2, padx=10, pady=5, sticky="ew")
         
         # Fortschritts- und Statusbereich
         self.progress_frame = ctk.CTkFrame(self)
@@ -121,21 +138,38 @@ class NameSearchFrame(ctk.CTkFrame):
         # Terminal (Protokollierung der Suche)
         self.terminal_label = ctk.CTkLabel(self, text="Suchprotokoll", font=("Helvetica", 16, "bold"))
         self.terminal_label.grid(row=5, column=0, sticky="w", padx=20, pady=(10,5))
-        self.terminal_box = ctk.CTkTextbox(self, height=150)
+        self.log_level_var = ctk.StringVar(value="Alle")
+        self.log_level_menu = ctk.CTkOptionMenu(self, values=list(LOG_LEVELS), variable=self.log_level_var,
+                                                command=lambda name: self.terminal_box.set_level(LOG_LEVELS[name]))
+        self.log_level_menu.grid(row=5, column=0, sticky="e", padx=20, pady=(10,5))
+        self.terminal_box = LogConsole(self, height=150)
         self.terminal_box.grid(row=6, column=0, padx=20, pady=(0,10), sticky="nsew")
-        self.terminal_box.configure(state="disabled")
         
-        # Ergebnisse-Bereich (scrollbarer Frame)
+        # Ergebnisse-Bereich (virtualisierte Liste: nur sichtbare Zeilen werden gezeichnet)
         self.results_label = ctk.CTkLabel(self, text="Ergebnisse", font=("Helvetica", 18, "bold"))
         self.results_label.grid(row=7, column=0, sticky="w", padx=20, pady=(10,5))
-        self.results_frame = ctk.CTkScrollableFrame(self, height=200)
-        self.results_frame.grid(row=8, column=0, padx=20, pady=(0,10), sticky="nsew")
+        self.results_list = VirtualList(self, height=200, format_row=self.format_result_row,
+                                        on_select=lambda pair: self.open_detail_overlay(pair[0]),
+                                        on_end=self.show_more_results)
+        self.results_list.grid(row=8, column=0, padx=20, pady=(0,10), sticky="nsew")
         self.grid_rowconfigure(8, weight=1)
         
-        # Export-Button für CSV-Export
-        self.export_button = ctk.CTkButton(self, text="Ergebnisse exportieren", 
+        # Export-Bereich: Format, Komprimierung und Export-Button (läuft im Hintergrund)
+        self.export_frame = ctk.CTkFrame(self)
+        self.export_frame.grid(row=9, column=0, padx=20, pady=(0,10), sticky="ew")
+        self.export_frame.grid_columnconfigure(2, weight=1)
+        self.export_format_var = ctk.StringVar(value="csv")
+        self.export_format_menu = ctk.CTkOptionMenu(self.export_frame, values=available_formats(),
+                                                    variable=self.export_format_var)
+        self.export_format_menu.grid(row=0, column=0, padx=(10,5), pady=5)
+        self.export_compression_var = ctk.StringVar(value=NO_COMPRESSION)
+        self.export_compression_menu = ctk.CTkOptionMenu(
+            self.export_frame, variable=self.export_compression_var,
+            values=[compression or NO_COMPRESSION for compression in available_compressions()])
+        self.export_compression_menu.grid(row=0, column=1, padx=5, pady=5)
+        self.export_button = ctk.CTkButton(self.export_frame, text="Ergebnisse exportieren",
                                            command=self.export_results, corner_radius=8)
-        self.export_button.grid(row=9, column=0, padx=20, pady=(0,10), sticky="ew")
+        self.export_button.grid(row=0, column=2, padx=(5,10), pady=5, sticky="ew")
         
         # Notification-Bereich (für temporäre Meldungen)
         self.notification_label = ctk.CTkLabel(self, text="", font=("Helvetica", 14))
@@ -143,11 +177,53 @@ class NameSearchFrame(ctk.CTkFrame):
         
         # Liste zur Speicherung der Suchergebnisse
         self.search_results = []
+        # Relevanzindex über alle Ergebnisse; jedes Ergebnis wird nur einmal aufbereitet
+        self.ranking = RankingIndex()
+        # Anzahl der angezeigten besten Ergebnisse; wächst beim Scrollen ans Listenende
+        self.results_limit = SEARCH_RESULTS_PAGE_SIZE
+        # Laufende Suche im Hintergrund (TaskHandle) und Stand der Quellen
+        self.search_task = None
+        self.search_query = ""
+        self.sources_total = 0
+        self.sources_finished = 0
+        # Laufender Export im Hintergrund (TaskHandle)
+        self.export_task = None
         
         # Detail-Overlay (für Detailansicht eines Ergebnisses; zunächst verborgen)
         self.detail_overlay = ctk.CTkFrame(self, fg_color="#1a1a1a")
         self.detail_overlay.place_forget()
 
+        # Einstellungen aus dem gemeinsamen Speicher übernehmen und Änderungen live folgen
+        self.settings_store = get_settings_store()
+        for key in ("font_size", "auto_complete_enabled"):
+            self.on_setting_changed(key, self.settings_store.get(key))
+        self.unsubscribe_settings = self.settings_store.subscribe(
+            self.on_setting_changed, keys=("font_size", "auto_complete_enabled"))
+
+    # ------------------------- Lebenszyklus (FrameManager) -------------------------
+    def on_hide(self):
+        # Ohne <Leave>-Ereignis würden offene Tooltips sonst über dem neuen Tab stehen bleiben.
+        for tooltip in self.tooltips:
+            tooltip.hidetip()
+
+    def destroy(self):
+        self.unsubscribe_settings()
+        super().destroy()
+
+    def on_setting_changed(self, key, value):
+        if key == "font_size":
+            for label in (self.first_label, self.last_label, self.alias_label, self.extra_label,
+                          self.status_label, self.notification_label):
+                label.configure(font=("Helvetica", value))
+        elif key == "auto_complete_enabled":
+            self.first_entry.configure(values=FIRST_NAME_SUGGESTIONS if value else [])
+
+    def on_evict(self):
+        self.stop_search()
+        if self.export_task is not None:
+            self.export_task.cancel()
+            self.export_task = None
+
     # ------------------------- UI Callback-Methoden -------------------------
     def toggle_mode(self):
         # Umschalter: Dark Mode aktivieren, wenn True; sonst Light Mode.
@@ -172,15 +248,19 @@ class NameSearchFrame(ctk.CTkFrame):
         step(0, start_rel_y)
 
     def show_notification(self, message, duration=3000):
+        if not self.settings_store.get("notifications_enabled"):
+            return
         self.notification_label.configure(text=message)
         self.after(duration, lambda: self.notification_label.configure(text=""))
 
     def perform_search(self):
-        # Suchprotokoll und Ergebnisse leeren
+        # Eine noch laufende Suche abbrechen, Suchprotokoll und Ergebnisse leeren
+        self.stop_search()
         self.clear_terminal()
-        for widget in self.results_frame.winfo_children():
-            widget.destroy()
+        self.results_list.clear()
         self.search_results = []
+        self.ranking.clear()
+        self.results_limit = SEARCH_RESULTS_PAGE_SIZE
         self.progress_bar.set(0)
         self.status_label.configure(text="Suche wird gestartet...")
         self.update_terminal("Starte Suche ...")
@@ -203,131 +283,97 @@ class NameSearchFrame(ctk.CTkFrame):
             search_query += " " + extra
         self.update_terminal(f"Suche nach: {search_query}")
         
-        # Filter-Aufgaben (simulierte Tasks) basierend auf den Checkbuttons
-        tasks = []
-        if self.var_internal.get():
-            tasks.append(("internal", "Interne Datenbank wird durchsucht...", 800))
-        if self.var_web.get():
-            tasks.append(("web", "Web-Suchmaschinenabfrage startet...", 1000))
-        if self.var_social.get():
-            tasks.append(("social", "Soziale Netzwerke werden durchsucht...", 800))
-        if self.var_extended.get():
-            tasks.append(("extended", "Erweiterte Quellen werden durchsucht...", 800))
-        if not tasks:
+        # Alle ausgewählten Quellen werden gleichzeitig abgefragt
+        sources = []
+        variables = {"internal": self.var_internal, "web": self.var_web,
+                     "social": self.var_social, "extended": self.var_extended}
+        for name, message, _ in SEARCH_SOURCES:
+            if variables[name].get():
+                sources.append(name)
+                self.update_terminal(message)
+        if not sources:
             self.update_terminal("Es wurden keine Filter ausgewählt!")
             self.status_label.configure(text="Abbruch: Keine Filter.")
             return
-        
-        self.simulate_tasks(0, tasks, search_query)
 
-    def simulate_tasks(self, index, tasks, query):
-        if index < len(tasks):
-            task_type, message, delay = tasks[index]
-            self.update_terminal(message)
-            self.after(delay, lambda: self.process_task(task_type, query, index, tasks))
-        else:
-            # Alle Tasks abgeschlossen, Ergebnisse sortieren und anzeigen
-            sorted_results = self.sort_results_by_accuracy(query, self.search_results)
-            self.show_search_results(sorted_results)
-            self.update_terminal("Suche abgeschlossen.")
-            self.status_label.configure(text="Suche abgeschlossen.")
-            self.progress_bar.set(1.0)
-
-    def process_task(self, task_type, query, index, tasks):
-        if task_type == "internal":
-            res1 = {
-                "url": f"https://internal.example.com/profil/{query.replace(' ', '_')}",
-                "source": "Interne Datenbank",
-                "description": "Ergebnis aus der PeopleFinder-Datenbank."
-            }
-            res2 = {
-                "url": f"https://social.internal.com/user/{query.replace(' ', '')}",
-                "source": "Interne Datenbank",
-                "description": "Ergebnis aus der SocialSphere-Datenbank."
-            }
-            self.search_results.extend([res1, res2])
-        elif task_type == "web":
-            if search is not None:
-                try:
-                    for url in search(query, num=5, stop=5, pause=1):
-                        res = {
-                            "url": url,
-                            "source": "Web-Suche",
-                            "description": "Ergebnis der Suchmaschinenabfrage."
-                        }
-                        self.search_results.append(res)
-                        self.update_terminal(f"Web-Ergebnis: {url}")
-                except Exception as e:
-                    self.update_terminal(f"Fehler bei Web-Suche: {e}")
-                    logging.error("Web-Suche Fehler: %s", e)
-            else:
-                simulated = [
-                    f"https://example.com/profil/{query.replace(' ', '_')}",
-                    f"https://news.example.com/articles/{query.replace(' ', '-')}"
-                ]
-                for url in simulated:
-                    res = {
-                        "url": url,
-                        "source": "Web-Suche (simuliert)",
-                        "description": "Simuliertes Web-Ergebnis."
-                    }
-                    self.search_results.append(res)
-                    self.update_terminal(f"Simuliertes Web-Ergebnis: {url}")
-        elif task_type == "social":
-            simulated_social = [
-                f"https://twitter.com/{query.replace(' ', '')}",
-                f"https://linkedin.com/in/{query.replace(' ', '-')}"
-            ]
-            for url in simulated_social:
-                res = {
-                    "url": url,
-                    "source": "Soziale Netzwerke",
-                    "description": "Simuliertes Ergebnis aus sozialen Netzwerken."
-                }
-                self.search_results.append(res)
-                self.update_terminal(f"Soziales Ergebnis: {url}")
-        elif task_type == "extended":
-            simulated_extended = [
-                f"https://scholarly.example.com/article/{query.replace(' ', '_')}",
-                f"https://press.example.com/mitteilung/{query.replace(' ', '-')}"
-            ]
-            for url in simulated_extended:
-                res = {
-                    "url": url,
-                    "source": "Erweiterte Quelle",
-                    "description": "Ergebnis aus erweiterten Quellen (wissenschaftliche Artikel, Pressemitteilungen)."
-                }
-                self.search_results.append(res)
-                self.update_terminal(f"Erweitertes Ergebnis: {url}")
-        
-        total = len(tasks)
-        self.progress_bar.set((index + 1) / total)
-        self.simulate_tasks(index + 1, tasks, query)
+        self.search_query = search_query
+        self.sources_total = len(sources)
+        self.sources_finished = 0
+        self.status_label.configure(text=f"Suche läuft (0/{self.sources_total} Quellen)...")
+        self.cancel_button.configure(state="normal")
+        # Jede Quelle hat ihr eigenes Zeitlimit in der Pipeline.
+        self.search_task = get_executor().submit(
+            run_search_pipeline, search_query, sources,
+            owner=self,
+            on_progress=self.on_search_progress,
+            on_success=lambda _: self.finish_search(),
+            on_error=self.on_search_error,
+            timeout=None,
+        )
 
-    def compute_relevance(self, query, text):
-        return SequenceMatcher(None, query.lower(), text.lower()).ratio()
+    def on_search_progress(self, kind, source, payload):
+        if kind == "results":
+            self.search_results.extend(payload)
+            self.ranking.add(payload)
+            for res in payload:
+                self.update_terminal(f"{SOURCE_LABELS[source]}: {res['url']}", logging.DEBUG)
+            # Bei jedem neuen Block neu bewerten, damit die Liste immer sortiert ist.
+            # Nur die besten results_limit Ergebnisse werden ausgewählt (Heap statt
+            # Sortierung aller Ergebnisse); weitere folgen beim Scrollen.
+            self.show_search_results(self.ranking.rank(self.search_query, k=self.results_limit))
+            return
+        if kind == "timeout":
+            self.update_terminal(f"Zeitüberschreitung bei Quelle: {SOURCE_LABELS[source]}", logging.WARNING)
+        elif kind == "error":
+            self.update_terminal(f"Fehler bei Quelle {SOURCE_LABELS[source]}: {payload}", logging.ERROR)
+            logging.error("Suchquelle %s Fehler: %s", source, payload)
+        self.sources_finished += 1
+        self.progress_bar.set(self.sources_finished / self.sources_total)
+        self.status_label.configure(text=f"Suche läuft ({self.sources_finished}/{self.sources_total} Quellen)...")
+
+    def finish_search(self):
+        self.search_task = None
+        self.cancel_button.configure(state="disabled")
+        if not self.search_results:
+            self.show_search_results([])
+        self.update_terminal("Suche abgeschlossen.")
+        self.status_label.configure(text="Suche abgeschlossen.")
+        self.progress_bar.set(1.0)
+
+    def on_search_error(self, error):
+        self.search_task = None
+        self.cancel_button.configure(state="disabled")
+        self.update_terminal(f"Fehler bei der Suche: {error}", logging.ERROR)
+        logging.error("Suche Fehler: %s", error)
+        self.status_label.configure(text="Fehler bei der Suche.")
+
+    def stop_search(self):
+        if self.search_task is not None:
+            self.search_task.cancel()
+            self.search_task = None
+        self.cancel_button.configure(state="disabled")
+
+    def cancel_search(self):
+        if self.search_task is not None:
+            self.stop_search()
+            self.update_terminal("Suche abgebrochen.")
+            self.status_label.configure(text="Suche abgebrochen.")
+
+    def show_more_results(self):
+        # Ans Listenende gescrollt: die nächste Seite der Rangliste anzeigen.
+        if len(self.ranking) > self.results_limit:
+            self.results_limit += SEARCH_RESULTS_PAGE_SIZE
+            self.show_search_results(self.ranking.rank(self.search_query, k=self.results_limit))
 
     def sort_results_by_accuracy(self, query, results):
-        scored_results = []
-        for res in results:
-            combined_text = res["url"] + " " + res["source"] + " " + res["description"]
-            score = self.compute_relevance(query, combined_text)
-            scored_results.append((res, score))
-        scored_results.sort(key=lambda x: x[1], reverse=True)
-        return scored_results
+        return rank_results(query, results, k=SEARCH_RESULTS_PAGE_SIZE)
 
     def show_search_results(self, sorted_results):
-        for widget in self.results_frame.winfo_children():
-            widget.destroy()
-        if not sorted_results:
-            no_result = ctk.CTkLabel(self.results_frame, text="Keine Ergebnisse gefunden.")
-            no_result.pack(padx=5, pady=5)
-            return
-        for res, score in sorted_results:
-            txt = f"{res['url']} (Relevanz: {score:.2f})"
-            button = ctk.CTkButton(self.results_frame, text=txt, anchor="w",
-                                   command=lambda r=res: self.open_detail_overlay(r), corner_radius=8)
-            button.pack(padx=5, pady=5, fill="x")
+        self.results_list.set_items(sorted_results)
+
+    def format_result_row(self, pair):
+        res, score = pair
+        return f"{res['url']} (Relevanz: {score:.2f})"
 
     def open_detail_overlay(self, result):
         # Öffnet ein Overlay (im Hauptfenster) mit Detailinformationen.
@@ -415,31 +461,46 @@ class NameSearchFrame(ctk.CTkFrame):
             self.feedback_overlay.destroy()
 
     def export_results(self):
+        # Ein zweiter Klick während des Exports bricht ihn ab.
+        if self.export_task is not None:
+            self.export_task.cancel()
+            self.finish_export("Export abgebrochen.")
+            return
         if not self.search_results:
             self.update_terminal("Keine Ergebnisse zum Exportieren vorhanden.")
             return
-        filename = "name_search_results.csv"
-        try:
-            with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-                fieldnames = ["url", "source", "description"]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                for res in self.search_results:
-                    writer.writerow(res)
-            self.update_terminal(f"Ergebnisse wurden erfolgreich nach {filename} exportiert.")
-        except Exception as e:
-            self.update_terminal(f"Fehler beim Exportieren: {e}")
-
-    def update_terminal(self, message):
-        self.terminal_box.configure(state="normal")
-        self.terminal_box.insert("end", message + "\n")
-        self.terminal_box.see("end")
-        self.terminal_box.configure(state="disabled")
+        fmt = self.export_format_var.get()
+        compression = self.export_compression_var.get()
+        compression = None if compression == NO_COMPRESSION else compression
+        filename = export_filename("name_search_results", fmt, compression)
+        self.update_terminal(f"Export nach {filename} gestartet...")
+        self.export_button.configure(text="Export abbrechen")
+        # Kopie der Liste, da während des Exports weitere Ergebnisse eintreffen können.
+        self.export_task = get_executor().submit(
+            export_rows, list(self.search_results), filename, fmt, compression, ["url", "source", "description"],
+            owner=self,
+            on_progress=self.on_export_progress,
+            on_success=lambda path: self.finish_export(f"Ergebnisse wurden erfolgreich nach {path} exportiert."),
+            on_error=lambda e: self.finish_export(f"Fehler beim Exportieren: {e}"),
+            timeout=None,
+        )
+
+    def on_export_progress(self, written, total):
+        self.progress_bar.set(written / total)
+        self.status_label.configure(text=f"Export: {written}/{total} Zeilen")
+
+    def finish_export(self, message):
+        self.export_task = None
+        self.export_button.configure(text="Ergebnisse exportieren")
+        self.status_label.configure(text="")
+        self.update_terminal(message)
+
+    def update_terminal(self, message, level=logging.INFO):
+        # Gepuffert: das Textfeld wird höchstens einmal pro Flush-Intervall neu gezeichnet.
+        self.terminal_box.write(message, level)
 
     def clear_terminal(self):
-        self.terminal_box.configure(state="normal")
-        self.terminal_box.delete("1.0", "end")
-        self.terminal_box.configure(state="disabled")
+        self.terminal_box.clear()
 
     def reset_fields(self):
         self.first_entry.set("")  # Bei CTkComboBox
@@ -447,11 +508,13 @@ class NameSearchFrame(ctk.CTkFrame):
         self.alias_entry.delete(0, "end")
         self.extra_entry.delete(0, "end")
         self.status_label.configure(text="")
+        self.stop_search()
         self.clear_terminal()
-        for widget in self.results_frame.winfo_children():
-            widget.destroy()
+        self.results_list.clear()
         self.progress_bar.set(0)
         self.search_results = []
+        self.ranking.clear()
+        self.results_limit = SEARCH_RESULTS_PAGE_SIZE
         self.detail_overlay.place_forget()
         self.show_notification("Felder wurden zurückgesetzt.")
 
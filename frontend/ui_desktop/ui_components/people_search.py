@@ -1,15 +1,20 @@
 import customtkinter as ctk
 import tkinter.filedialog as fd
+import ipaddress
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+from config.app_config import TASK_TIMEOUT_SECONDS
+from services.geo_providers import GeolocationLookupError
+from services.geolocation_engine import lookup_ip
+from services.task_executor import get_executor
+
 
 class PeopleSearchFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         self.configure(fg_color="transparent")
         self.pack(fill="both", expand=True)
+        self.geo_task = None  # Running geolocation lookup (TaskHandle)
         
         # Create a Tabview to separate search features
         self.tabview = ctk.CTkTabview(self, width=700)
@@ -81,7 +86,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Searching for: {first} {last} | Aliases: {aliases}"
         logging.info(msg)
         self.name_status.configure(text="Search initiated... Check console for details")
-        print(msg)
         
     def reset_name_fields(self):
         self.first_entry.delete(0, "end")
@@ -117,7 +121,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Looking up email: {email}"
         logging.info(msg)
         self.email_status.configure(text="Lookup initiated... Check console for details")
-        print(msg)
     
     def reset_email_fields(self):
         self.email_entry.delete(0, "end")
@@ -151,7 +154,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Looking up phone: {phone}"
         logging.info(msg)
         self.phone_status.configure(text="Lookup initiated... Check console for details")
-        print(msg)
     
     def reset_phone_fields(self):
         self.phone_entry.delete(0, "end")
@@ -185,7 +187,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Searching social media for: {username}"
         logging.info(msg)
         self.social_status.configure(text="Search initiated... Check console for details")
-        print(msg)
     
     def reset_social_fields(self):
         self.username_entry.delete(0, "end")
@@ -219,7 +220,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Looking up business: {business}"
         logging.info(msg)
         self.business_status.configure(text="Lookup initiated... Check console for details")
-        print(msg)
     
     def reset_business_fields(self):
         self.business_entry.delete(0, "end")
@@ -253,7 +253,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Checking criminal record for: {name}"
         logging.info(msg)
         self.criminal_status.configure(text="Check initiated... Check console for details")
-        print(msg)
     
     def reset_criminal_fields(self):
         self.criminal_name_entry.delete(0, "end")
@@ -284,7 +283,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
             msg = f"Performing facial recognition on: {filename}"
             logging.info(msg)
             self.facial_status.configure(text="Recognition initiated... Check console for details")
-            print(msg)
     
     # -------------------------
     # Tab: Dark Web Monitoring
@@ -306,7 +304,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = "Dark web monitoring initiated."
         logging.info(msg)
         self.darkweb_status.configure(text="Monitoring initiated... Check console for details")
-        print(msg)
     
     # -------------------------
     # Tab: Geolocation
@@ -332,13 +329,45 @@ class PeopleSearchFrame(ctk.CTkFrame):
         self.geo_status.grid(row=3, column=0, columnspan=2, pady=5)
     
     def perform_geolocation_lookup(self):
-        ip = self.ip_entry.get()
-        msg = f"Looking up geolocation for IP: {ip}"
-        logging.info(msg)
-        self.geo_status.configure(text="Lookup initiated... Check console for details")
-        print(msg)
+        ip = self.ip_entry.get().strip()
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError:
+            self.geo_status.configure(text="Invalid IP address.")
+            return
+        logging.info("Looking up geolocation for IP: %s", ip)
+        self.geo_status.configure(text="Lookup initiated...")
+        # Same engine as GeolocationFrame, so identical in-flight lookups share one provider call.
+        if self.geo_task is not None:
+            self.geo_task.cancel()
+        self.geo_task = get_executor().submit(
+            lambda ctx: lookup_ip(ip, wait=ctx.wait),
+            owner=self,
+            on_success=self.show_geolocation_result,
+            on_error=self.show_geolocation_error,
+            timeout=TASK_TIMEOUT_SECONDS,
+        )
+
+    def show_geolocation_result(self, data):
+        self.geo_task = None
+        self.geo_status.configure(
+            text=f"{data.get('query', '')}: {data.get('city', 'N/A')}, {data.get('regionName', 'N/A')}, "
+                 f"{data.get('country', 'N/A')} ({data.get('lat', 'N/A')}, {data.get('lon', 'N/A')})")
+
+    def show_geolocation_error(self, error):
+        self.geo_task = None
+        if isinstance(error, GeolocationLookupError):
+            self.geo_status.configure(text=str(error))
+        elif isinstance(error, TimeoutError):
+            self.geo_status.configure(text="Lookup timed out.")
+        else:
+            logging.error("Geolocation lookup failed: %s", error)
+            self.geo_status.configure(text="Lookup failed.")
     
     def reset_geolocation_fields(self):
+        if self.geo_task is not None:
+            self.geo_task.cancel()
+            self.geo_task = None
         self.ip_entry.delete(0, "end")
         self.geo_status.configure(text="")
     
@@ -370,7 +399,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Looking up vehicle: {vehicle}"
         logging.info(msg)
         self.vehicle_status.configure(text="Lookup initiated... Check console for details")
-        print(msg)
     
     def reset_vehicle_fields(self):
         self.vehicle_entry.delete(0, "end")
@@ -404,7 +432,6 @@ class PeopleSearchFrame(ctk.CTkFrame):
         msg = f"Correlating alias: {alias}"
         logging.info(msg)
         self.alias_status.configure(text="Correlation initiated... Check console for details")
-        print(msg)
     
     def reset_alias_fields(self):
         self.alias_correlation_entry.delete(0, "end")
@@ -2,7 +2,6 @@
 import customtkinter as ctk
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 class PhoneLookupFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -32,7 +31,6 @@ class PhoneLookupFrame(ctk.CTkFrame):
         msg = f"Looking up phone: {phone}"
         logging.info(msg)
         self.status_label.configure(text="Lookup initiated... Check console")
-        print(msg)
     
     def reset_fields(self):
         self.phone_entry.delete(0, "end")
@@ -4,8 +4,6 @@ import tkinter.messagebox as mb
 import logging
 import random
 
-# Configure logging for the module.
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class SecurityFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -1,60 +1,19 @@
 # ui_components/settings.py
 import customtkinter as ctk
 import json
-import os
+import logging
 from tkinter import colorchooser, filedialog
 
+from services.settings_store import get_settings_store
+
 class SettingsFrame(ctk.CTkFrame):
-    def __init__(self, master, settings_file="settings.json", **kwargs):
+    def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
-        self.settings_file = settings_file
-        self.settings = self.load_settings()
+        # Gemeinsamer Einstellungsspeicher: Änderungen sehen alle Frames sofort,
+        # gespeichert wird verzögert im Hintergrund.
+        self.store = get_settings_store()
         self.build_ui()
 
-    def load_settings(self):
-        """
-        Lädt die Einstellungen aus einer JSON-Datei.
-        Falls diese nicht existieren oder ein Fehler auftritt, werden Standardwerte verwendet.
-        """
-        default_settings = {
-            "appearance_mode": "Light",          # "Light" oder "Dark"
-            "font_size": 14,
-            "auto_complete_enabled": True,
-            "show_advanced_filters": False,
-            "custom_primary_color": "#0078D7",     # Default Primärfarbe
-            "custom_accent_color": "#00B4FF",      # Default Akzentfarbe
-            "auto_dark_mode": False,               # Automatische Dark/Light Umschaltung
-            "selected_language": "de",             # z. B. "de" oder "en"
-            "layout_spacing": 10,                  # Abstand (in Pixel) für das Layout
-            "log_level": "INFO",                   # Log-Level: "INFO", "DEBUG", "ERROR"
-            "notifications_enabled": True,
-            "sound_enabled": True
-        }
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, "r", encoding="utf-8") as f:
-                    settings = json.load(f)
-                    # Fehlende Schlüssel mit Standardwerten auffüllen
-                    for key, value in default_settings.items():
-                        if key not in settings:
-                            settings[key] = value
-                    return settings
-            except Exception as e:
-                print("Fehler beim Laden der Einstellungen:", e)
-                return default_settings
-        else:
-            return default_settings
-
-    def save_settings(self):
-        """
-        Speichert die aktuellen Einstellungen in der JSON-Datei.
-        """
-        try:
-            with open(self.settings_file, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print("Fehler beim Speichern der Einstellungen:", e)
-
     def build_ui(self):
         """
         Baut die Benutzeroberfläche für die Einstellungen inklusive all der erweiterten Features auf.
@@ -71,10 +30,10 @@ class SettingsFrame(ctk.CTkFrame):
         mode_label = ctk.CTkLabel(self, text="Erscheinungsbild:")
         mode_label.grid(row=row, column=0, sticky="w", padx=20, pady=(5, 0))
         row += 1
-        self.appearance_var = ctk.StringVar(value=self.settings.get("appearance_mode", "Light"))
+        self.appearance_var = ctk.StringVar(value=self.store.get("appearance_mode", "System"))
         self.mode_optionmenu = ctk.CTkOptionMenu(
             self,
-            values=["Light", "Dark"],
+            values=["System", "Light", "Dark"],
             variable=self.appearance_var,
             command=self.change_appearance
         )
@@ -86,12 +45,12 @@ class SettingsFrame(ctk.CTkFrame):
         font_label.grid(row=row, column=0, sticky="w", padx=20, pady=(10, 0))
         row += 1
         self.font_slider = ctk.CTkSlider(self, from_=10, to=30, number_of_steps=21, command=self.update_font_size)
-        self.font_slider.set(self.settings.get("font_size", 14))
+        self.font_slider.set(self.store.get("font_size", 14))
         self.font_slider.grid(row=row, column=0, padx=20, pady=5, sticky="ew")
         row += 1
 
         # Autovervollständigung aktivieren
-        self.auto_complete_var = ctk.BooleanVar(value=self.settings.get("auto_complete_enabled", True))
+        self.auto_complete_var = ctk.BooleanVar(value=self.store.get("auto_complete_enabled", True))
         self.autocomplete_checkbox = ctk.CTkCheckBox(
             self,
             text="Autovervollständigung aktivieren",
@@ -102,7 +61,7 @@ class SettingsFrame(ctk.CTkFrame):
         row += 1
 
         # Erweiterte Filter anzeigen
-        self.adv_filters_var = ctk.BooleanVar(value=self.settings.get("show_advanced_filters", False))
+        self.adv_filters_var = ctk.BooleanVar(value=self.store.get("show_advanced_filters", False))
         self.adv_filters_checkbox = ctk.CTkCheckBox(
             self,
             text="Erweiterte Filter anzeigen",
@@ -118,7 +77,7 @@ class SettingsFrame(ctk.CTkFrame):
         row += 1
         self.primary_color_button = ctk.CTkButton(
             self,
-            text=f"Primärfarbe: {self.settings.get('custom_primary_color')}",
+            text=f"Primärfarbe: {self.store.get('custom_primary_color')}",
             command=self.choose_primary_color, 
             corner_radius=8
         )
@@ -131,7 +90,7 @@ class SettingsFrame(ctk.CTkFrame):
         row += 1
         self.accent_color_button = ctk.CTkButton(
             self,
-            text=f"Akzentfarbe: {self.settings.get('custom_accent_color')}",
+            text=f"Akzentfarbe: {self.store.get('custom_accent_color')}",
             command=self.choose_accent_color,
             corner_radius=8
         )
@@ -139,7 +98,7 @@ class SettingsFrame(ctk.CTkFrame):
         row += 1
 
         # Automatische Dark/Light Mode Umschaltung
-        self.auto_mode_var = ctk.BooleanVar(value=self.settings.get("auto_dark_mode", False))
+        self.auto_mode_var = ctk.BooleanVar(value=self.store.get("auto_dark_mode", False))
         self.auto_mode_checkbox = ctk.CTkCheckBox(
             self,
             text="Automatische Dark/Light Umschaltung aktivieren",
@@ -153,7 +112,7 @@ class SettingsFrame(ctk.CTkFrame):
         language_label = ctk.CTkLabel(self, text="Sprache:")
         language_label.grid(row=row, column=0, sticky="w", padx=20, pady=(10, 0))
         row += 1
-        self.language_var = ctk.StringVar(value=self.settings.get("selected_language", "de"))
+        self.language_var = ctk.StringVar(value=self.store.get("selected_language", "de"))
         self.language_optionmenu = ctk.CTkOptionMenu(
             self,
             values=["de", "en"],
@@ -168,7 +127,7 @@ class SettingsFrame(ctk.CTkFrame):
         spacing_label.grid(row=row, column=0, sticky="w", padx=20, pady=(10, 0))
         row += 1
         self.layout_slider = ctk.CTkSlider(self, from_=0, to=30, number_of_steps=31, command=self.update_layout_spacing)
-        self.layout_slider.set(self.settings.get("layout_spacing", 10))
+        self.layout_slider.set(self.store.get("layout_spacing", 10))
         self.layout_slider.grid(row=row, column=0, padx=20, pady=5, sticky="ew")
         row += 1
 
@@ -176,7 +135,7 @@ class SettingsFrame(ctk.CTkFrame):
         log_level_label = ctk.CTkLabel(self, text="Log Level:")
         log_level_label.grid(row=row, column=0, sticky="w", padx=20, pady=(10, 0))
         row += 1
-        self.log_level_var = ctk.StringVar(value=self.settings.get("log_level", "INFO"))
+        self.log_level_var = ctk.StringVar(value=self.store.get("log_level", "INFO"))
         self.log_level_optionmenu = ctk.CTkOptionMenu(
             self,
             values=["INFO", "DEBUG", "ERROR"],
@@ -187,7 +146,7 @@ class SettingsFrame(ctk.CTkFrame):
         row += 1
 
         # Benachrichtigungen aktivieren
-        self.notifications_var = ctk.BooleanVar(value=self.settings.get("notifications_enabled", True))
+        self.notifications_var = ctk.BooleanVar(value=self.store.get("notifications_enabled", True))
         self.notifications_checkbox = ctk.CTkCheckBox(
             self,
             text="Benachrichtigungen aktivieren",
@@ -198,7 +157,7 @@ class SettingsFrame(ctk.CTkFrame):
         row += 1
 
         # Sound aktivieren
-        self.sound_var = ctk.BooleanVar(value=self.settings.get("sound_enabled", True))
+        self.sound_var = ctk.BooleanVar(value=self.store.get("sound_enabled", True))
         self.sound_checkbox = ctk.CTkCheckBox(
             self,
             text="Sound aktivieren",
@@ -230,67 +189,55 @@ class SettingsFrame(ctk.CTkFrame):
 
     # ------------------------- Callback-Methoden -------------------------
     def change_appearance(self, value):
-        self.settings["appearance_mode"] = value
+        self.store.set("appearance_mode", value)
         ctk.set_appearance_mode(value)
-        self.save_settings()
 
     def update_font_size(self, value):
         try:
             font_size = int(round(float(value)))
-            self.settings["font_size"] = font_size
-            self.save_settings()
+            self.store.set("font_size", font_size)
         except Exception as e:
-            print("Fehler beim Aktualisieren der Schriftgröße:", e)
+            logging.error("Fehler beim Aktualisieren der Schriftgröße: %s", e)
 
     def update_auto_complete(self):
-        self.settings["auto_complete_enabled"] = self.auto_complete_var.get()
-        self.save_settings()
+        self.store.set("auto_complete_enabled", self.auto_complete_var.get())
 
     def update_adv_filters(self):
-        self.settings["show_advanced_filters"] = self.adv_filters_var.get()
-        self.save_settings()
+        self.store.set("show_advanced_filters", self.adv_filters_var.get())
 
     def choose_primary_color(self):
         color = colorchooser.askcolor(title="Wähle Primärfarbe")
         if color[1]:
-            self.settings["custom_primary_color"] = color[1]
+            self.store.set("custom_primary_color", color[1])
             self.primary_color_button.configure(text=f"Primärfarbe: {color[1]}")
-            self.save_settings()
 
     def choose_accent_color(self):
         color = colorchooser.askcolor(title="Wähle Akzentfarbe")
         if color[1]:
-            self.settings["custom_accent_color"] = color[1]
+            self.store.set("custom_accent_color", color[1])
             self.accent_color_button.configure(text=f"Akzentfarbe: {color[1]}")
-            self.save_settings()
 
     def update_auto_mode(self):
-        self.settings["auto_dark_mode"] = self.auto_mode_var.get()
-        self.save_settings()
+        self.store.set("auto_dark_mode", self.auto_mode_var.get())
 
     def update_language(self, value):
-        self.settings["selected_language"] = value
-        self.save_settings()
+        self.store.set("selected_language", value)
 
     def update_layout_spacing(self, value):
         try:
             spacing = int(round(float(value)))
-            self.settings["layout_spacing"] = spacing
-            self.save_settings()
+            self.store.set("layout_spacing", spacing)
         except Exception as e:
-            print("Fehler beim Aktualisieren des Layout-Abstands:", e)
+            logging.error("Fehler beim Aktualisieren des Layout-Abstands: %s", e)
 
     def update_log_level(self, value):
-        self.settings["log_level"] = value
-        self.save_settings()
+        self.store.set("log_level", value)
 
     def update_notifications(self):
-        self.settings["notifications_enabled"] = self.notifications_var.get()
-        self.save_settings()
+        self.store.set("notifications_enabled", self.notifications_var.get())
 
     def update_sound(self):
-        self.settings["sound_enabled"] = self.sound_var.get()
-        self.save_settings()
+        self.store.set("sound_enabled", self.sound_var.get())
 
     def backup_settings(self):
         backup_file = filedialog.asksaveasfilename(
@@ -301,10 +248,10 @@ class SettingsFrame(ctk.CTkFrame):
         if backup_file:
             try:
                 with open(backup_file, "w", encoding="utf-8") as f:
-                    json.dump(self.settings, f, indent=4)
-                print("Backup erfolgreich erstellt.")
+                    json.dump(self.store.all(), f, indent=4)
+                logging.info("Backup erfolgreich erstellt.")
             except Exception as e:
-                print("Fehler beim Erstellen des Backups:", e)
+                logging.error("Fehler beim Erstellen des Backups: %s", e)
 
     def restore_settings(self):
         backup_file = filedialog.askopenfilename(
@@ -315,55 +262,41 @@ class SettingsFrame(ctk.CTkFrame):
             try:
                 with open(backup_file, "r", encoding="utf-8") as f:
                     restored = json.load(f)
-                self.settings = restored
+                self.store.replace(restored)
                 self.update_ui_from_settings()
-                self.save_settings()
-                print("Einstellungen wurden wiederhergestellt.")
+                logging.info("Einstellungen wurden wiederhergestellt.")
             except Exception as e:
-                print("Fehler beim Wiederherstellen der Einstellungen:", e)
+                logging.error("Fehler beim Wiederherstellen der Einstellungen: %s", e)
 
     def reset_settings(self):
         # Zurücksetzen auf Standardwerte
-        self.settings = {
-            "appearance_mode": "Light",
-            "font_size": 14,
-            "auto_complete_enabled": True,
-            "show_advanced_filters": False,
-            "custom_primary_color": "#0078D7",
-            "custom_accent_color": "#00B4FF",
-            "auto_dark_mode": False,
-            "selected_language": "de",
-            "layout_spacing": 10,
-            "log_level": "INFO",
-            "notifications_enabled": True,
-            "sound_enabled": True
-        }
+        self.store.reset()
         self.update_ui_from_settings()
-        self.save_settings()
 
     def on_save(self):
-        self.save_settings()
-        print("Einstellungen wurden gespeichert.")
+        # Ausstehende Änderungen sofort schreiben statt nach der Verzögerung
+        self.store.flush()
+        logging.info("Einstellungen wurden gespeichert.")
 
     def update_ui_from_settings(self):
         """
         Aktualisiert alle UI-Elemente mit den aktuellen Einstellungen.
         """
-        self.appearance_var.set(self.settings.get("appearance_mode", "Light"))
-        self.mode_optionmenu.set(self.settings.get("appearance_mode", "Light"))
-        self.font_slider.set(self.settings.get("font_size", 14))
-        self.auto_complete_var.set(self.settings.get("auto_complete_enabled", True))
-        self.adv_filters_var.set(self.settings.get("show_advanced_filters", False))
-        self.primary_color_button.configure(text=f"Primärfarbe: {self.settings.get('custom_primary_color')}")
-        self.accent_color_button.configure(text=f"Akzentfarbe: {self.settings.get('custom_accent_color')}")
-        self.auto_mode_var.set(self.settings.get("auto_dark_mode", False))
-        self.language_var.set(self.settings.get("selected_language", "de"))
-        self.language_optionmenu.set(self.settings.get("selected_language", "de"))
-        self.layout_slider.set(self.settings.get("layout_spacing", 10))
-        self.log_level_var.set(self.settings.get("log_level", "INFO"))
-        self.log_level_optionmenu.set(self.settings.get("log_level", "INFO"))
-        self.notifications_var.set(self.settings.get("notifications_enabled", True))
-        self.sound_var.set(self.settings.get("sound_enabled", True))
+        self.appearance_var.set(self.store.get("appearance_mode", "System"))
+        self.mode_optionmenu.set(self.store.get("appearance_mode", "System"))
+        self.font_slider.set(self.store.get("font_size", 14))
+        self.auto_complete_var.set(self.store.get("auto_complete_enabled", True))
+        self.adv_filters_var.set(self.store.get("show_advanced_filters", False))
+        self.primary_color_button.configure(text=f"Primärfarbe: {self.store.get('custom_primary_color')}")
+        self.accent_color_button.configure(text=f"Akzentfarbe: {self.store.get('custom_accent_color')}")
+        self.auto_mode_var.set(self.store.get("auto_dark_mode", False))
+        self.language_var.set(self.store.get("selected_language", "de"))
+        self.language_optionmenu.set(self.store.get("selected_language", "de"))
+        self.layout_slider.set(self.store.get("layout_spacing", 10))
+        self.log_level_var.set(self.store.get("log_level", "INFO"))
+        self.log_level_optionmenu.set(self.store.get("log_level", "INFO"))
+        self.notifications_var.set(self.store.get("notifications_enabled", True))
+        self.sound_var.set(self.store.get("sound_enabled", True))
 
 # ------------------------- Test / Beispiel -------------------------
 if __name__ == "__main__":
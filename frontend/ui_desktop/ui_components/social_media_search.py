@@ -2,7 +2,6 @@
 import customtkinter as ctk
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 class SocialMediaSearchFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -32,7 +31,6 @@ class SocialMediaSearchFrame(ctk.CTkFrame):
         msg = f"Searching social media for: {username}"
         logging.info(msg)
         self.status_label.configure(text="Search initiated... Check console")
-        print(msg)
     
     def reset_fields(self):
         self.username_entry.delete(0, "end")
@@ -5,8 +5,6 @@ import tkinter.messagebox as mb
 import logging
 import random
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class WebScrapingFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):